@@ -1,10 +1,10 @@
 import streamlit as st
-import json
 import os
 import pandas as pd
 import plotly.express as px
 from brain import ApexBrain
 from voz import ApexVoz
+from repository import get_repositorio
 
 # --- CONFIGURAÇÃO DA PÁGINA ---
 st.set_page_config(
@@ -39,16 +39,15 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- CONEXÃO REAL COM OS DADOS (ZOHO) ---
-@st.cache_data(ttl=60) # Atualiza o cache a cada minuto
+# Sem st.cache_data: o repositório já guarda o snapshot entre os reruns e
+# troca sozinho, em segundo plano, quando a sync grava um novo
 def carregar_dados_reais():
-    caminho = "db_projetos.json"
-    if os.path.exists(caminho):
-        try:
-            with open(caminho, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return []
-    return []
+    repositorio = get_repositorio()
+    repositorio.observar()  # Só liga na primeira vez
+    try:
+        return repositorio.projetos(com_tarefas=False)  # O painel não mostra tarefas
+    except ValueError:
+        return ()
 
 # --- INTERFACE DO APEX ---
 def acionar_apex():
@@ -65,7 +64,7 @@ def acionar_apex():
 
 # --- CARREGAMENTO ---
 dados = carregar_dados_reais()
-df = pd.DataFrame(dados)
+df = pd.DataFrame(list(dados))
 
 # Renderização do Dashboard
 st.title("📟 CENTRAL DE PROJETOS [ANIMATI]")
@@ -98,7 +97,7 @@ if not df.empty:
     fig.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', font_color="#FFF", showlegend=False)
     st.plotly_chart(fig, use_container_width=True)
 else:
-    st.error("⚠️ Ficheiro db_projetos.json não encontrado ou vazio.")
+    st.error("⚠️ Snapshot de projetos (db_projetos) não encontrado ou vazio.")
 
 # --- BARRA LATERAL FUTURISTA ---
 with st.sidebar:
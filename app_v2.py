@@ -1,6 +1,6 @@
 import streamlit as st
-import json
 import os
+import sqlite3
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
@@ -15,6 +15,11 @@ except ImportError:
     VERSAO_BRAIN = "V1"
 
 from voz import ApexVoz
+from repository import get_repositorio
+from project_analytics import get_colunas_tarefas
+from tracker import obter_comparativo
+from database import DatabaseManager
+from note_queue import get_fila_notas
 
 # --- CONFIGURAÇÃO DA PÁGINA ---
 st.set_page_config(
@@ -91,28 +96,29 @@ if 'brain' not in st.session_state:
     st.session_state['modo_voz'] = False
 
 # --- CONEXÃO REAL COM OS DADOS ---
-@st.cache_data(ttl=60)
+# Sem st.cache_data: o repositório já guarda o snapshot entre os reruns e
+# troca sozinho, em segundo plano, quando a sync grava um novo
 def carregar_dados_reais():
-    caminho = "db_projetos.json"
-    if os.path.exists(caminho):
-        try:
-            with open(caminho, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return []
-    return []
+    repositorio = get_repositorio()
+    repositorio.observar()  # Só liga na primeira vez
+    try:
+        return repositorio.projetos(com_tarefas=False)  # O painel não mostra tarefas
+    except ValueError:
+        return ()
 
-@st.cache_data(ttl=300)
+@st.cache_resource
+def banco_memoria():
+    """Um DatabaseManager para o app todo (mantém a conexão de cada thread entre os reruns)"""
+    return DatabaseManager()
+
+# Sem st.cache_data: é uma consulta indexada só, e a nota salva na conversa
+# aparece já no próximo rerun
 def carregar_memoria():
-    """Carrega anotações do gestor"""
-    caminho = "db_memoria.json"
-    if os.path.exists(caminho):
-        try:
-            with open(caminho, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except:
-            return {}
-    return {}
+    """Carrega anotações do gestor (o mesmo banco onde o Brain grava)"""
+    try:
+        return banco_memoria().buscar_notas_projetos()
+    except sqlite3.Error:
+        return {}
 
 # --- FUNÇÕES DE INTERAÇÃO ---
 def processar_comando_texto(comando):
@@ -175,7 +181,7 @@ def processar_comando_voz():
 
 # --- CARREGAMENTO DE DADOS ---
 dados = carregar_dados_reais()
-df = pd.DataFrame(dados)
+df = pd.DataFrame(list(dados))
 memoria = carregar_memoria()
 
 # --- LAYOUT PRINCIPAL ---
@@ -267,9 +273,40 @@ with tab1:
         if not criticos.empty:
             criticos_display = criticos[['name', 'percent_complete', 'status']].copy()
             criticos_display.columns = ['Projeto', 'Conclusão (%)', 'Status']
+            if 'fatos' in criticos:
+                # Etapa e atraso já calculados na sync (project_facts.py)
+                fatos = criticos['fatos'].map(lambda f: f if isinstance(f, dict) else {})
+                criticos_display['Etapa'] = fatos.map(lambda f: f.get('fase_cronograma') or f.get('fase_atual'))
+                criticos_display['Dias de atraso'] = fatos.map(lambda f: f.get('dias_atraso', 0))
             st.dataframe(criticos_display, use_container_width=True, height=300)
         else:
             st.success("✅ Nenhum projeto crítico! Todos acima de 30%")
+
+        # Atrasos e estagnação: colunas NumPy das tarefas (project_analytics), remontadas só a cada sync
+        st.markdown("---")
+        st.subheader("⏰ Atrasos e Estagnação")
+        colunas_tarefas = get_colunas_tarefas()
+        hoje = datetime.now()
+        vencidas = colunas_tarefas.vencidas(hoje)
+        atrasados = colunas_tarefas.resumo_por_projeto(vencidas, hoje)
+        estagnados, _ = obter_comparativo()
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("🔴 Tarefas Vencidas", len(vencidas))
+        col2.metric("🏗️ Projetos com Atraso", len(atrasados))
+        col3.metric("📅 Maior Atraso", f"{atrasados[0]['dias_atraso']}d" if atrasados else "0d")
+        col4.metric("⏸️ Estagnados", len(estagnados))
+
+        if atrasados:
+            atrasados_display = pd.DataFrame([{
+                'Projeto': r['projeto'],
+                'Vencidas': r['vencidas'],
+                'Dias de atraso': r['dias_atraso'],
+                'Travado em': r['lista_bloqueando'],
+            } for r in atrasados[:10]])
+            st.dataframe(atrasados_display, use_container_width=True, height=300)
+        else:
+            st.success("✅ Nenhuma tarefa vencida!")
             
     else:
         st.error("⚠️ Nenhum dado de projeto encontrado. Execute `python zoho_sync.py` primeiro.")
@@ -365,6 +402,7 @@ with tab4:
         - **Versão:** {VERSAO_BRAIN}
         - **Projetos Carregados:** {len(dados)}
         - **Anotações:** {sum(len(notas) for notas in memoria.values())}
+        - **Anotações aguardando gravação:** {get_fila_notas().pendentes()}
         - **Histórico Chat:** {len(st.session_state['historico_chat'])} mensagens
         """)
         
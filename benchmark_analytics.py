@@ -0,0 +1,133 @@
+"""
+Benchmark das análises de atraso/estagnação (project_analytics.py)
+Gera um portfólio sintético no formato da sync, grava a base SQLite e mede
+o que o relatório semanal e o dashboard calculam (vencidas numa data,
+dias de atraso, resumo por projeto e o comparativo de percentuais) em duas
+formas:
+- laço em Python sobre o snapshot, convertendo cada data com strptime
+  (como o relatório fazia)
+- colunas NumPy (project_analytics), com a carga das colunas à parte
+  (ela acontece uma vez por sync)
+Confere que as duas chegam ao mesmo resultado.
+
+Uso: python benchmark_analytics.py [--projetos 10000] [--tarefas 50] [--repeticoes 5]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, datetime
+from benchmark_snapshot import montar_portfolio
+from project_analytics import ColunasTarefas, comparar_percentuais
+from project_db import ProjectDB, STATUS_FECHADOS, FORMATOS_DATA_ZOHO
+
+
+def cronometrar(funcao, repeticoes):
+    """(mediana em milissegundos, resultado da última chamada)"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos), resultado
+
+
+def parse_data_zoho(data_str):
+    """A conversão que o relatório fazia em cada tarefa"""
+    if not data_str:
+        return None
+    for fmt in FORMATOS_DATA_ZOHO:
+        try:
+            return datetime.strptime(data_str, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def resumo_python(portfolio, hoje):
+    """{id do projeto: (vencidas, dias de atraso da mais antiga)} com o laço por tarefa"""
+    limite = datetime.combine(hoje, datetime.min.time())
+    resumo = {}
+    for p in portfolio:
+        vencidas, mais_antiga = 0, None
+        for t in p["tasks"]:
+            if str(t.get("status", "")).lower() in STATUS_FECHADOS:
+                continue
+            data_fim = parse_data_zoho(t.get("end_date"))
+            if data_fim and data_fim < limite:
+                vencidas += 1
+                if mais_antiga is None or data_fim < mais_antiga:
+                    mais_antiga = data_fim
+        if vencidas:
+            resumo[p["id"]] = (vencidas, (hoje - mais_antiga.date()).days)
+    return resumo
+
+
+def resumo_numpy(colunas, hoje):
+    return {r["projeto_id"]: (r["vencidas"], r["dias_atraso"])
+            for r in colunas.resumo_por_projeto(colunas.vencidas(hoje), hoje)}
+
+
+def comparativo_python(projetos, historico):
+    """O laço que o tracker fazia"""
+    estagnados, evoluiram = [], []
+    for p in projetos:
+        dados_antigos = historico.get(str(p.get("id")))
+        if dados_antigos:
+            atual, anterior = int(p.get("percent_complete", 0)), int(dados_antigos.get("percent", 0))
+            if atual == anterior:
+                estagnados.append({"nome": p.get("name"), "percent": atual})
+            else:
+                evoluiram.append({"nome": p.get("name"), "antes": anterior, "agora": atual,
+                                  "delta": atual - anterior})
+    return estagnados, evoluiram
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Análises de atraso: laço em Python x NumPy")
+    parser.add_argument("--projetos", type=int, default=10000)
+    parser.add_argument("--tarefas", type=int, default=50)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"🧪 Gerando {args.projetos} projetos x ~{args.tarefas} tarefas...")
+    portfolio = montar_portfolio(args.projetos, args.tarefas)
+    print(f"   {sum(len(p['tasks']) for p in portfolio)} tarefas no total")
+
+    hoje = date(2025, 3, 31)
+    rnd = random.Random(5)
+    cabecalhos = [{k: v for k, v in p.items() if k != "tasks"} for p in portfolio]
+    historico = {str(p["id"]): {"percent": rnd.choice([int(p.get("percent_complete") or 0), rnd.randint(0, 100)])}
+                 for p in cabecalhos if rnd.random() < 0.9}
+
+    with tempfile.TemporaryDirectory() as pasta:
+        base = ProjectDB(os.path.join(pasta, "db_projetos.sqlite"))
+        base.reconstruir(portfolio)
+
+        carga, colunas = cronometrar(lambda: ColunasTarefas(*base.tarefas_em_colunas()), args.repeticoes)
+        print(f"   Colunas NumPy carregadas da base em {carga:.0f} ms (uma vez por sync)\n")
+
+        t_py, r_py = cronometrar(lambda: resumo_python(portfolio, hoje), 1)
+        t_np, r_np = cronometrar(lambda: resumo_numpy(colunas, hoje), args.repeticoes)
+        t_so, vencidas = cronometrar(lambda: colunas.vencidas(hoje), args.repeticoes)
+        assert r_py == r_np, "os resumos de vencidas não batem"
+
+        c_py, comp_py = cronometrar(lambda: comparativo_python(cabecalhos, historico), args.repeticoes)
+        c_np, comp_np = cronometrar(lambda: comparar_percentuais(cabecalhos, historico), args.repeticoes)
+        assert comp_py == comp_np, "os comparativos de percentual não batem"
+
+    print(f"{'análise':>36} | {'Python (ms)':>11} | {'NumPy (ms)':>10}")
+    print(f"{'vencidas + atraso por projeto':>36} | {t_py:>11.0f} | {t_np:>10.1f}")
+    print(f"{'só o conjunto de vencidas':>36} | {'':>11} | {t_so:>10.1f}")
+    print(f"{'comparativo de percentuais':>36} | {c_py:>11.1f} | {c_np:>10.1f}")
+    print(f"\n   {len(vencidas)} tarefas vencidas em {hoje:%d/%m/%Y} em {len(r_np)} projetos")
+    print(f"   {len(comp_np[0])} projetos estagnados, {len(comp_np[1])} evoluíram")
+    print(f"\n📉 Resumo de vencidas {t_py / t_np:.0f}x mais rápido que o laço "
+          f"(com a carga das colunas: {t_py / (t_np + carga):.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
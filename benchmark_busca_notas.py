@@ -0,0 +1,150 @@
+"""
+Benchmark da busca nas anotações (FTS5 em database.py)
+Gera notas sintéticas espalhadas por vários projetos (vocabulário com cauda
+longa e poucos termos do domínio por nota, como anotações reais) e mede uma pergunta do
+tipo "onde anotei sobre o servidor da Unimed?" de três formas:
+- ler todas as notas e filtrar em Python (o que mandar tudo para o prompt exige)
+- LIKE na tabela (o que buscar_nas_notas faz sem FTS5; sem ranking, só as mais novas)
+- índice FTS5 com ranking bm25 (buscar_nas_notas)
+Mede também o custo de manter o índice: gravações por segundo com os triggers
+e o tempo para indexar um banco antigo inteiro ('rebuild').
+
+Uso: python benchmark_busca_notas.py [--notas 100000] [--projetos 2000] [--consultas 200]
+"""
+
+import argparse
+import itertools
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from database import DatabaseManager, termos_busca
+from name_index import normalizar
+
+PALAVRAS = ("servidor backup migração PACS laudo integração HL7 treinamento cliente reunião contrato "
+            "virada homologação VPN firewall certificado impressora worklist DICOM storage licença "
+            "atraso cronograma TI diretoria faturamento acesso senha rede link banco replicação "
+            "agenda médico radiologia tomografia ressonância ultrassom modalidade usuário suporte").split()
+CLIENTES = ("Unimed Hospital Clínica Laboratório Instituto Centro Imagem Diagnóstico Santa Casa "
+            "São Lucas Vida Saúde Regional Municipal").split()
+PERGUNTAS = ("onde anotei sobre o servidor da Unimed?", "migração do PACS", "certificado da VPN",
+             "o que eu anotei do treinamento de radiologia", "licença do storage", "senha do firewall")
+
+
+def gerar_vocabulario(quantidade, rnd):
+    """Palavras inventadas (sílabas), para o texto ter a cauda longa de um texto de verdade"""
+    silabas = [c + v for c in "bcdfglmnprstv" for v in "aeiou"]
+    return list(dict.fromkeys("".join(rnd.choices(silabas, k=rnd.randint(2, 4))) for _ in range(quantidade)))
+
+
+# Mais frequentes primeiro (Zipf); as do fim aparecem em poucas notas
+VOCABULARIO = gerar_vocabulario(8000, random.Random(1))
+
+
+def gerar_notas(quantidade, projetos, semente=3):
+    """Notas com palavras comuns em distribuição de Zipf e 1 a 3 termos do domínio cada"""
+    rnd = random.Random(semente)
+    nomes = [f"{1000 + i} - {rnd.choice(CLIENTES)} {rnd.choice(CLIENTES)}" for i in range(projetos)]
+    comuns = VOCABULARIO
+    pesos = list(itertools.accumulate(1 / (posicao + 1) for posicao in range(len(comuns))))
+    for i in range(quantidade):
+        p = rnd.randrange(projetos)
+        palavras = rnd.choices(comuns, cum_weights=pesos, k=rnd.randint(5, 20)) + rnd.sample(PALAVRAS, rnd.randint(1, 3))
+        rnd.shuffle(palavras)
+        yield str(1000 + p), nomes[p], " ".join(palavras), f"{i % 28 + 1:02d}/10/2026 10:00"
+
+
+def mediana_ms(funcao, argumentos):
+    tempos = []
+    for arg in argumentos:
+        inicio = time.perf_counter()
+        resultado = funcao(arg)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos), resultado
+
+
+def filtrar_em_python(conn, pergunta):
+    """Todas as notas para a memória e um filtro por palavra (sem ranking)"""
+    termos = termos_busca(pergunta)
+    todas, alguma = [], []
+    for projeto_id, projeto, data, nota in conn.execute(
+            "SELECT projeto_id, projeto_nome, data_registro, nota FROM memorias_projetos ORDER BY id DESC"):
+        texto = normalizar(f"{nota} {projeto}")
+        casadas = sum(t in texto for t in termos)
+        if casadas == len(termos):
+            todas.append((projeto_id, projeto, data, nota))
+        elif casadas:
+            alguma.append((projeto_id, projeto, data, nota))
+    return (todas or alguma)[:10]
+
+
+def buscar_com_like(conn, pergunta):
+    """O que buscar_nas_notas faz sem FTS5: todas as palavras, senão alguma; as mais novas primeiro"""
+    termos = termos_busca(pergunta)
+    for juncao in (" AND ", " OR ")[:len(termos)]:
+        filtro = juncao.join("(nota LIKE ? OR projeto_nome LIKE ?)" for _ in termos)
+        linhas = conn.execute(f"SELECT projeto_id, projeto_nome, data_registro, nota FROM memorias_projetos "
+                              f"WHERE {filtro} ORDER BY id DESC LIMIT 10",
+                              [f"%{t}%" for t in termos for _ in range(2)]).fetchall()
+        if linhas:
+            return linhas
+    return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Busca nas anotações: Python x LIKE x FTS5")
+    parser.add_argument("--notas", type=int, default=100000)
+    parser.add_argument("--projetos", type=int, default=2000)
+    parser.add_argument("--consultas", type=int, default=200)
+    parser.add_argument("--gravacoes", type=int, default=2000)
+    args = parser.parse_args()
+    perguntas = [PERGUNTAS[i % len(PERGUNTAS)] for i in range(args.consultas)]
+    raras = [f"onde anotei sobre {palavra}?" for palavra in VOCABULARIO[-args.consultas:]]
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "memoria.db")
+        # Banco "antigo": só a tabela de notas, preenchida de uma vez
+        conn = sqlite3.connect(caminho)
+        conn.execute('''
+            CREATE TABLE memorias_projetos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, projeto_id TEXT NOT NULL,
+                projeto_nome TEXT NOT NULL, nota TEXT NOT NULL, data_registro TEXT NOT NULL
+            )
+        ''')
+        conn.executemany("INSERT INTO memorias_projetos (projeto_id, projeto_nome, nota, data_registro) "
+                         "VALUES (?, ?, ?, ?)", gerar_notas(args.notas, args.projetos))
+        conn.commit()
+        print(f"🧪 {args.notas} notas em {args.projetos} projetos, {args.consultas} consultas\n")
+
+        t_py, _ = mediana_ms(lambda p: filtrar_em_python(conn, p), perguntas[:max(1, args.consultas // 20)])
+        t_like, _ = mediana_ms(lambda p: buscar_com_like(conn, p), perguntas[:max(1, args.consultas // 5)])
+        r_like, _ = mediana_ms(lambda p: buscar_com_like(conn, p), raras[:max(1, args.consultas // 5)])
+        conn.close()
+
+        inicio = time.perf_counter()
+        db = DatabaseManager(caminho)  # Primeira abertura: cria o índice e indexa o que já existe
+        indexar = time.perf_counter() - inicio
+        t_fts, achados = mediana_ms(db.buscar_nas_notas, perguntas)
+        r_fts, _ = mediana_ms(db.buscar_nas_notas, raras)
+
+        rnd = random.Random(11)
+        inicio = time.perf_counter()
+        for i in range(args.gravacoes):
+            db.salvar_nota(str(1000 + rnd.randrange(args.projetos)), "Projeto", f"servidor novo {i}")
+        gravacoes = args.gravacoes / (time.perf_counter() - inicio)
+
+    print(f"{'forma':>28} | {'assunto comum (ms)':>18} | {'palavra rara (ms)':>17}")
+    print(f"{'todas as notas + Python':>28} | {t_py:>18.1f} | {'':>17}")
+    print(f"{'LIKE na tabela':>28} | {t_like:>18.2f} | {r_like:>17.2f}")
+    print(f"{'FTS5 (buscar_nas_notas)':>28} | {t_fts:>18.2f} | {r_fts:>17.2f}")
+    print(f"\n   Indexar o banco existente: {indexar:.1f} s (uma vez)")
+    print(f"   Gravações com o índice em dia: {gravacoes:.0f} notas/s")
+    print(f"   Melhor trecho de '{perguntas[-1]}': {achados[0]['projeto']} -> {achados[0]['trecho']}" if achados else "")
+    print(f"\n📉 FTS5 {t_py / t_fts:.0f}x mais rápido que ler tudo; contra o LIKE, {t_like / t_fts:.1f}x em assunto "
+          f"comum (o LIKE para nas 10 mais novas) e {r_like / r_fts:.0f}x em palavra rara (o LIKE varre a tabela)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark do banco de memórias (database.py)
+Compara o DatabaseManager antigo (cada chamada roda o CREATE TABLE com commit
+e depois abre outra conexão para o trabalho de verdade) com o atual (uma
+conexão por thread, WAL, esquema conferido uma vez por processo):
+- gravações de nota por segundo
+- leituras de notas de um projeto por segundo (o que _processar_consulta faz
+  para cada projeto citado)
+- leituras por segundo com várias threads ao mesmo tempo (execuções do Streamlit)
+- notas dos 10 projetos de um prompt: uma consulta por projeto (antes) x
+  buscar_notas_projetos numa consulta só (depois)
+
+Uso: python benchmark_database.py [--notas 2000] [--leituras 5000] [--threads 4]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+from database import DatabaseManager
+
+
+class DatabaseManagerAntigo:
+    """O DatabaseManager de antes, sem mudanças, para comparação"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._criar_tabelas()
+
+    def _conectar(self):
+        return sqlite3.connect(self.db_path)
+
+    def _criar_tabelas(self):
+        conn = self._conectar()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS memorias_projetos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                projeto_id TEXT NOT NULL,
+                projeto_nome TEXT NOT NULL,
+                nota TEXT NOT NULL,
+                data_registro TEXT NOT NULL
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    def salvar_nota(self, projeto_id, projeto_nome, nota):
+        self._criar_tabelas()
+        conn = self._conectar()
+        conn.execute('''
+            INSERT INTO memorias_projetos (projeto_id, projeto_nome, nota, data_registro)
+            VALUES (?, ?, ?, ?)
+        ''', (str(projeto_id), projeto_nome, nota, datetime.now().strftime("%d/%m/%Y %H:%M")))
+        conn.commit()
+        conn.close()
+        return True
+
+    def buscar_notas_projeto(self, projeto_id):
+        self._criar_tabelas()
+        conn = self._conectar()
+        resultados = conn.execute('''
+            SELECT data_registro, nota FROM memorias_projetos
+            WHERE projeto_id = ?
+            ORDER BY id DESC
+        ''', (str(projeto_id),)).fetchall()
+        conn.close()
+        return [f"[{linha[0]}] {linha[1]}" for linha in resultados]
+
+
+def por_segundo(funcao, vezes):
+    inicio = time.perf_counter()
+    for i in range(vezes):
+        funcao(i)
+    return vezes / (time.perf_counter() - inicio)
+
+
+def leituras_em_threads(db, projetos, leituras, threads):
+    """Leituras por segundo somando todas as threads"""
+    def trabalho(semente):
+        rnd = random.Random(semente)
+        for _ in range(leituras // threads):
+            db.buscar_notas_projeto(rnd.choice(projetos))
+
+    grupo = [threading.Thread(target=trabalho, args=(i,)) for i in range(threads)]
+    inicio = time.perf_counter()
+    for t in grupo:
+        t.start()
+    for t in grupo:
+        t.join()
+    return (leituras // threads) * threads / (time.perf_counter() - inicio)
+
+
+def medir(db, projetos, args):
+    rnd = random.Random(7)
+    escrita = por_segundo(lambda i: db.salvar_nota(rnd.choice(projetos), "Projeto", f"Nota de teste {i}"), args.notas)
+    leitura = por_segundo(lambda i: db.buscar_notas_projeto(rnd.choice(projetos)), args.leituras)
+    paralela = leituras_em_threads(db, projetos, args.leituras, args.threads)
+    if hasattr(db, "buscar_notas_projetos"):
+        prompt = por_segundo(lambda i: db.buscar_notas_projetos(rnd.sample(projetos, 10)), args.leituras // 10)
+    else:
+        prompt = por_segundo(lambda i: [db.buscar_notas_projeto(p) for p in rnd.sample(projetos, 10)],
+                             args.leituras // 10)
+    return escrita, leitura, paralela, prompt
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banco de memórias: conexão por chamada x conexão por thread")
+    parser.add_argument("--notas", type=int, default=2000)
+    parser.add_argument("--leituras", type=int, default=5000)
+    parser.add_argument("--projetos", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+    projetos = [str(1000 + i) for i in range(args.projetos)]
+
+    with tempfile.TemporaryDirectory() as pasta:
+        antes = medir(DatabaseManagerAntigo(os.path.join(pasta, "antigo.db")), projetos, args)
+        depois = medir(DatabaseManager(os.path.join(pasta, "atual.db")), projetos, args)
+
+    print(f"🧪 {args.notas} notas em {args.projetos} projetos, {args.leituras} leituras ({args.threads} threads na última)\n")
+    print(f"{'operação':>24} | {'antes (op/s)':>12} | {'depois (op/s)':>13} | {'ganho':>6}")
+    operacoes = ("gravar nota", "ler notas do projeto", f"ler em {args.threads} threads", "notas de 10 projetos")
+    for nome, a, d in zip(operacoes, antes, depois):
+        print(f"{nome:>24} | {a:>12.0f} | {d:>13.0f} | {d / a:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Benchmark da busca aproximada de nomes (name_index.IndiceNomes.parecidos/resolver)
+Mistura projetos-alvo com nomes de verdade no meio de milhares de projetos
+inventados e pergunta por eles do jeito que o reconhecimento de voz costuma
+entregar ("rivelari", "santa caza", "cardio senter").
+
+Mede, para cada tamanho de portfólio:
+- acerto: resolver() (o que o roteador usa) devolve só o projeto certo,
+  e o projeto certo está entre os 5 primeiros de parecidos()
+- o que só a busca exata (buscar) acharia com a mesma frase
+- latência por pergunta e tempo de montagem do índice
+e compara com a força bruta do difflib sobre todos os nomes.
+
+Uso: python benchmark_fuzzy.py [--projetos 1000 5000 20000] [--repeticoes 50]
+"""
+
+import argparse
+import difflib
+import random
+import statistics
+import time
+from name_index import IndiceNomes, normalizar
+
+ALVOS = ["Unimed", "Hospital São Lucas", "Rivelare", "Clínica Vida", "Santa Casa", "Imagem Total",
+         "Diagnóstico Sul", "Radiologia Norte", "Cardio Center", "Hospital Regional",
+         "Hospital Santa Mônica", "Clínica Bem Estar", "Laboratório Exame", "Policlínica Central",
+         "Instituto do Coração", "Oncoclínica Vale", "Centro Médico Quixadá", "Hemocentro Oeste",
+         "Maternidade Esperança", "Neurocenter", "Ortopedia Gaúcha", "Clínica Schmitt"]
+
+# (o que a voz entregou, projeto que o usuário quis dizer)
+OUVIDOS_ERRADO = [
+    ("como está a unimedi", "Unimed"),
+    ("status do ospital são lukas", "Hospital São Lucas"),
+    ("fase do rivelari", "Rivelare"),
+    ("rivelláre atrasou", "Rivelare"),
+    ("clinica vidas", "Clínica Vida"),
+    ("anote na santa caza", "Santa Casa"),
+    ("imajem total", "Imagem Total"),
+    ("diaguinostico sul", "Diagnóstico Sul"),
+    ("radiolojia norti", "Radiologia Norte"),
+    ("cardio senter", "Cardio Center"),
+    ("cardiocenter", "Cardio Center"),
+    ("hospital rejional", "Hospital Regional"),
+    ("santa monika", "Hospital Santa Mônica"),
+    ("clinica ben estar", "Clínica Bem Estar"),
+    ("laboratorio ezame", "Laboratório Exame"),
+    ("poli clinica central", "Policlínica Central"),
+    ("instituto do corassão", "Instituto do Coração"),
+    ("onco clinica vale", "Oncoclínica Vale"),
+    ("centro medico quichada", "Centro Médico Quixadá"),
+    ("emocentro oeste", "Hemocentro Oeste"),
+    ("maternidade esperanssa", "Maternidade Esperança"),
+    ("neuro center", "Neurocenter"),
+    ("ortopedia gaucha", "Ortopedia Gaúcha"),
+    ("clinica chimit", "Clínica Schmitt"),
+]
+
+_TIPOS = ["Hospital", "Clínica", "Laboratório", "Centro Médico", "Instituto", "Radiologia", "Grupo", ""]
+_SILABAS = ["ba", "ca", "da", "fe", "gu", "la", "ma", "ne", "pi", "ro", "sa", "ta", "vi", "ze",
+            "lo", "mi", "nor", "tel", "sul", "ran", "bel", "cor", "tin", "val"]
+
+
+def montar_nomes(n_projetos, semente=7):
+    """Portfólio de nomes: os ALVOS espalhados no meio de nomes inventados"""
+    rnd = random.Random(semente)
+    nomes = []
+    while len(nomes) < n_projetos - len(ALVOS):
+        inventado = "".join(rnd.choice(_SILABAS) for _ in range(rnd.randint(2, 4))).capitalize()
+        nome = f"{rnd.choice(_TIPOS)} {inventado}".strip()
+        if nome not in ALVOS:
+            nomes.append(nome)
+    for alvo in ALVOS:
+        nomes.insert(rnd.randrange(len(nomes) + 1), alvo)
+    return [{"id": str(i), "name": f"{1000 + i} - {nome}"} for i, nome in enumerate(nomes)]
+
+
+def termos_da_frase(frase):
+    """Mesmo filtro do roteador do brain: palavras com mais de 3 letras"""
+    return [p for p in frase.lower().split() if len(p) > 3] or [frase.lower()]
+
+
+def forca_bruta(projetos, termos, limite=5):
+    """Referência: difflib palavra a palavra contra todos os nomes"""
+    notas = []
+    for projeto in projetos:
+        palavras = normalizar(projeto["name"]).split()
+        nota = statistics.mean(max(difflib.SequenceMatcher(None, normalizar(t), p).ratio() for p in palavras)
+                               for t in termos)
+        notas.append((nota, projeto["id"]))
+    notas.sort(reverse=True)
+    return [proj_id for _, proj_id in notas[:limite]]
+
+
+def cronometrar(funcao, repeticoes):
+    """Mediana em milissegundos"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def medir(n_projetos, repeticoes):
+    projetos = montar_nomes(n_projetos)
+    id_alvo = {p["name"].split(" - ", 1)[1]: p["id"] for p in projetos if p["name"].split(" - ", 1)[1] in ALVOS}
+
+    inicio = time.perf_counter()
+    indice = IndiceNomes(projetos)
+    montagem = (time.perf_counter() - inicio) * 1000
+
+    exato = certeiro = top5 = 0
+    latencias = []
+    for frase, alvo in OUVIDOS_ERRADO:
+        termos = termos_da_frase(frase)
+        certo = id_alvo[alvo]
+        exato += indice.buscar(termos) == [certo]
+        certeiro += indice.resolver(termos) == [certo]
+        top5 += certo in [proj_id for proj_id, _ in indice.parecidos(termos)]
+        latencias.append(cronometrar(lambda: indice.parecidos(termos), repeticoes))
+
+    # Força bruta só numa amostra: é lenta demais para rodar a lista toda em 20k
+    amostra = OUVIDOS_ERRADO[:3]
+    bruta = statistics.median(cronometrar(lambda: forca_bruta(projetos, termos_da_frase(frase)), 1)
+                              for frase, _ in amostra)
+    return {
+        "montagem": montagem, "exato": exato, "certeiro": certeiro, "top5": top5,
+        "latencia": statistics.median(latencias), "pior": max(latencias), "bruta": bruta,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Busca aproximada de nomes de projeto")
+    parser.add_argument("--projetos", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--repeticoes", type=int, default=50)
+    args = parser.parse_args()
+
+    total = len(OUVIDOS_ERRADO)
+    print(f"🧪 {total} frases mal ouvidas, {len(ALVOS)} projetos-alvo no meio do portfólio\n")
+    print(f"{'projetos':>8} | {'índice (ms)':>11} | {'busca exata':>11} | {'resolver certo':>14} | "
+          f"{'no top 5':>8} | {'mediana (ms)':>12} | {'pior (ms)':>9} | {'difflib (ms)':>12}")
+    for n in args.projetos:
+        r = medir(n, args.repeticoes)
+        print(f"{n:>8} | {r['montagem']:>11.0f} | {r['exato']:>5}/{total:<5} | {r['certeiro']:>6}/{total:<7} | "
+              f"{r['top5']:>3}/{total:<4} | {r['latencia']:>12.3f} | {r['pior']:>9.3f} | {r['bruta']:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark do formato do snapshot: JSON x binário compacto (.apx)
+Gera um portfólio sintético já no formato limpo da sync e mede tamanho,
+tempo de gravação e tempo de carga de cada formato.
+
+Depois compara, no binário, o repositório com todas as tarefas em memória
+contra cabeçalhos + tarefas sob demanda (o que os brains usam): tempo de
+partida, memória residente e custo de pedir um projeto com tarefas.
+
+Uso: python benchmark_snapshot.py [--projetos 5000] [--tarefas 150] [--repeticoes 3] [--consultas 500]
+"""
+
+import argparse
+import gc
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from config import Config
+from repository import ProjectRepository
+from snapshot import abrir_escritor, carregar_projetos
+from zoho_fake import gerar_portfolio
+from zoho_sync import ZohoSync
+
+
+def montar_portfolio(n_projetos, n_tarefas):
+    """Projetos como o ZohoSync grava (cabeçalho limpo + tarefas só com os campos usados)"""
+    brutos, tarefas = gerar_portfolio(n_projetos, n_tarefas, variacao=0.5)
+    portfolio = []
+    for proj in brutos:
+        limpo = ZohoSync._montar_projeto(None, proj)
+        limpo["tasks"] = [ZohoSync._limpar_tarefa(t) for t in tarefas[proj["id"]]]
+        portfolio.append(limpo)
+    return portfolio
+
+
+def medir(caminho, portfolio, repeticoes):
+    inicio = time.perf_counter()
+    with abrir_escritor(caminho) as escritor:
+        for projeto in portfolio:
+            escritor.escrever(projeto)
+    gravacao = time.perf_counter() - inicio
+
+    def melhor_carga(com_tarefas):
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            lido = carregar_projetos(caminho, com_tarefas=com_tarefas)
+            tempos.append(time.perf_counter() - inicio)
+        return lido, min(tempos)
+
+    lido, carga = melhor_carga(True)
+    assert lido == portfolio, f"{caminho}: conteúdo lido difere do gravado"
+    del lido
+    _, carga_cabecalhos = melhor_carga(False)
+    return os.path.getsize(caminho), gravacao, carga, carga_cabecalhos
+
+
+def medir_sob_demanda(caminho, ids, consultas):
+    """(partida s, memória MB, mediana ms por projeto pedido) para as duas formas de uso"""
+    rnd = random.Random(3)
+    # Perguntas repetem projetos: metade dos pedidos cai num grupo pequeno de "quentes"
+    quentes = rnd.sample(ids, min(20, len(ids)))
+    pedidos = [rnd.choice(quentes) if rnd.random() < 0.5 else rnd.choice(ids) for _ in range(consultas)]
+
+    def usar(com_tarefas, tempos):
+        repositorio = ProjectRepository(caminho)
+        repositorio.projetos(com_tarefas=com_tarefas)
+        for proj_id in pedidos:
+            inicio = time.perf_counter()
+            repositorio.por_id(proj_id)
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        return repositorio
+
+    resultados = {}
+    for nome, com_tarefas in (("tudo em memória", True), ("sob demanda", False)):
+        # Tempo e memória em passadas separadas: o tracemalloc deixa tudo bem mais lento
+        gc.collect()
+        inicio = time.perf_counter()
+        ProjectRepository(caminho).projetos(com_tarefas=com_tarefas)
+        partida = time.perf_counter() - inicio
+        tempos = []
+        usar(com_tarefas, tempos)
+
+        gc.collect()
+        tracemalloc.start()
+        repositorio = usar(com_tarefas, [])
+        memoria = tracemalloc.get_traced_memory()[0] / 1e6
+        tracemalloc.stop()
+        del repositorio
+        resultados[nome] = (partida, memoria, statistics.median(tempos), max(tempos))
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON x binário compacto do snapshot")
+    parser.add_argument("--projetos", type=int, default=5000)
+    parser.add_argument("--tarefas", type=int, default=150)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--consultas", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"🧪 Gerando {args.projetos} projetos x ~{args.tarefas} tarefas...")
+    portfolio = montar_portfolio(args.projetos, args.tarefas)
+    total_tarefas = sum(len(p["tasks"]) for p in portfolio)
+    print(f"   {total_tarefas} tarefas no total\n")
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        for nome, arquivo in (("JSON", "db_projetos.json"), ("binário", "db_projetos.apx")):
+            resultados[nome] = medir(os.path.join(pasta, arquivo), portfolio, args.repeticoes)
+        ids = [p["id"] for p in portfolio]
+        del portfolio
+        sob_demanda = medir_sob_demanda(os.path.join(pasta, "db_projetos.apx"), ids, args.consultas)
+
+    print(f"{'formato':>8} | {'tamanho (MB)':>12} | {'gravação (s)':>12} | {'carga (s)':>9} | {'só cabeçalhos (s)':>17}")
+    for nome, (tamanho, gravacao, carga, carga_cab) in resultados.items():
+        print(f"{nome:>8} | {tamanho / 1e6:>12.1f} | {gravacao:>12.2f} | {carga:>9.3f} | {carga_cab:>17.3f}")
+
+    tam_json, _, carga_json, cab_json = resultados["JSON"]
+    tam_bin, _, carga_bin, cab_bin = resultados["binário"]
+    print(f"\n📉 Arquivo {tam_json / tam_bin:.1f}x menor | carga completa {carga_json / carga_bin:.1f}x "
+          f"mais rápida | só cabeçalhos {cab_json / cab_bin:.0f}x mais rápida")
+
+    print(f"\n🗂️ Repositório no binário, {args.consultas} pedidos de projeto com tarefas "
+          f"(cache de {Config.TAREFAS_EM_MEMORIA} projetos):")
+    print(f"{'forma':>16} | {'partida (s)':>11} | {'memória (MB)':>12} | {'mediana (ms)':>12} | {'pior (ms)':>9}")
+    for nome, (partida, memoria, mediana, pior) in sob_demanda.items():
+        print(f"{nome:>16} | {partida:>11.3f} | {memoria:>12.1f} | {mediana:>12.3f} | {pior:>9.2f}")
+    tudo, demanda = sob_demanda["tudo em memória"], sob_demanda["sob demanda"]
+    print(f"\n📉 Partida {tudo[0] / demanda[0]:.0f}x mais rápida | memória {tudo[1] / demanda[1]:.0f}x menor")
+
+
+if __name__ == "__main__":
+    main()
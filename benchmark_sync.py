@@ -0,0 +1,226 @@
+"""
+Suíte de benchmark do ZohoSync contra o Zoho falso (zoho_fake.py)
+O fake roda num processo separado, então o tempo e a memória medidos aqui
+são só da sincronização.
+
+Cenários:
+  concorrencia  tempo de parede por workers x páginas em voo (a saída tem de ser idêntica)
+  completo      sync completa com OAuth e erros injetados: throughput, requests e memória
+  incremental   sync completa seguida de uma incremental com poucos projetos editados
+
+Uso: python benchmark_sync.py [concorrencia completo incremental]
+         [--projetos 200] [--tarefas 300] [--latencia 0.02] [--taxa-erro 0.01]
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+
+from config import Config
+from zoho_http import ZohoHTTP
+from zoho_scheduler import ZohoScheduler
+from zoho_sync import ZohoSync
+from zoho_token import ZohoTokenCache
+from snapshot import carregar_projetos
+
+try:
+    import resource  # Só existe no Linux/Mac
+except ImportError:
+    resource = None
+
+
+class ProcessoFake:
+    """Sobe o zoho_fake.py num processo filho e conversa com as rotas __stats/__tocar"""
+
+    def __init__(self, args):
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "zoho_fake.py")
+        self.comando = [
+            sys.executable, script,
+            "--projetos", str(args.projetos), "--tarefas", str(args.tarefas),
+            "--variacao", str(args.variacao), "--latencia", str(args.latencia),
+            "--taxa-erro", str(args.taxa_erro),
+        ]
+        if args.cota:
+            self.comando += ["--cota", str(args.cota)]
+        self.info = {}
+
+    def __enter__(self):
+        self.processo = subprocess.Popen(self.comando, stdout=subprocess.PIPE, text=True, encoding="utf-8")
+        while "OWNER_ID" not in self.info:
+            linha = self.processo.stdout.readline()
+            if not linha:
+                raise RuntimeError("zoho_fake.py não subiu")
+            if "=" in linha:
+                chave, valor = linha.strip().split("=", 1)
+                self.info[chave] = valor
+        self.raiz = self.info["BASE_URL"].split("/restapi")[0]
+        return self
+
+    def __exit__(self, *exc):
+        self.processo.terminate()
+        self.processo.wait()
+
+    def _chamar(self, metodo, rota):
+        req = urllib.request.Request(self.raiz + rota, method=metodo, data=b"" if metodo == "POST" else None)
+        with urllib.request.urlopen(req) as resp:
+            return json.loads(resp.read() or b"{}")
+
+    def estatisticas(self):
+        return self._chamar("GET", "/__stats")
+
+    def zerar(self):
+        self._chamar("POST", "/__reset_stats")
+
+    def tocar(self, n):
+        return self._chamar("POST", f"/__tocar?n={n}")
+
+
+def rodar_sync(fake, pasta, workers, em_voo, incremental=False, medir_memoria=False):
+    """Uma sync completa/incremental contra o fake. Devolve um dict de métricas."""
+    # Cota do cliente folgada: aqui se mede a sync, não o limite do Zoho real
+    # (para exercitar o 429, use --cota e o fake recusa o excesso)
+    agenda = ZohoScheduler(taxa=10000, rajada=10000, max_concorrencia=workers * em_voo, backoff_base=0.05)
+    http = ZohoHTTP(pool_maxsize=max(10, workers * em_voo), scheduler=agenda)
+    tokens = ZohoTokenCache(caminho=os.path.join(pasta, "token.json"), url_token=fake.info["TOKEN_URL"], http=http)
+    saida = os.path.join(pasta, "db_projetos.apx")
+    bot = ZohoSync(base_url=fake.info["BASE_URL"], max_workers=workers, caminho_saida=saida,
+                   http=http, tokens=tokens, paginas_em_voo=em_voo)
+
+    fake.zerar()
+    if medir_memoria:
+        tracemalloc.start()
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        bot.sync_my_data(incremental=incremental)
+    tempo = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1] if medir_memoria else None
+    if medir_memoria:
+        tracemalloc.stop()
+
+    dados = carregar_projetos(saida)
+    metricas = {
+        "tempo": tempo,
+        "projetos": len(dados),
+        "tarefas": sum(len(p["tasks"]) for p in dados),
+        "tamanho_mb": os.path.getsize(saida) / 1e6,
+        "servidor": fake.estatisticas(),
+        "http": http.estatisticas(),
+        "agenda": agenda.estatisticas(),
+        "pico_mb": pico / 1e6 if pico is not None else None,
+    }
+    http.fechar()
+    return metricas
+
+
+def imprimir_metricas(titulo, m):
+    srv = m["servidor"]
+    print(f"\n▶ {titulo}")
+    print(f"   ⏱️  {m['tempo']:.2f}s | {m['projetos']} projetos, {m['tarefas']} tarefas "
+          f"| {m['projetos'] / m['tempo']:.1f} proj/s, {m['tarefas'] / m['tempo']:.0f} tarefas/s")
+    print(f"   🌐 {srv['requests']} requests (projects={srv['por_rota'].get('projects', 0)}, "
+          f"tasks={srv['por_rota'].get('tasks', 0)}, oauth={srv['por_rota'].get('oauth', 0)}, "
+          f"401={srv['por_rota'].get('401', 0)}) | 429={srv['429']} | erros injetados={srv['erros_injetados']} "
+          f"| retentativas={m['agenda']['retentativas']}")
+    print(f"   🔌 {m['http']['conexoes_abertas']} conexões abertas, {m['http']['conexoes_reutilizadas']} reutilizadas "
+          f"| snapshot {m['tamanho_mb']:.2f} MB")
+    if m["pico_mb"] is not None:
+        print(f"   🧠 pico de memória Python (tracemalloc): {m['pico_mb']:.1f} MB")
+
+
+def cenario_concorrencia(fake, args):
+    print("\n" + "=" * 70)
+    print("📊 CONCORRÊNCIA (workers x páginas em voo)")
+    print("=" * 70)
+    print(f"{'workers':>8} | {'em voo':>6} | {'tempo (s)':>10} | {'requests':>9} | {'conexões':>9} | {'reuso':>6} | {'speedup':>8}")
+    referencia = None
+    conteudo_base = None
+    with tempfile.TemporaryDirectory() as pasta:
+        for workers, em_voo in itertools.product(args.workers, args.em_voo):
+            m = rodar_sync(fake, pasta, workers, em_voo)
+            referencia = referencia or m["tempo"]
+
+            with open(os.path.join(pasta, "db_projetos.apx"), "rb") as f:
+                conteudo = f.read()
+            conteudo_base = conteudo_base or conteudo
+            marca = "" if conteudo == conteudo_base else "  ⚠️ saída diferente!"
+
+            print(f"{workers:>8} | {em_voo:>6} | {m['tempo']:>10.2f} | {m['servidor']['requests']:>9} | "
+                  f"{m['http']['conexoes_abertas']:>9} | {m['http']['conexoes_reutilizadas']:>6} | "
+                  f"{referencia / m['tempo']:>7.1f}x{marca}")
+
+
+def cenario_completo(fake, args):
+    print("\n" + "=" * 70)
+    print("📊 SYNC COMPLETA")
+    print("=" * 70)
+    with tempfile.TemporaryDirectory() as pasta:
+        imprimir_metricas("Throughput (sem medição de memória)",
+                          rodar_sync(fake, pasta, args.workers[-1], args.em_voo[-1]))
+        imprimir_metricas("Memória (tracemalloc ligado, tempo fica mais lento)",
+                          rodar_sync(fake, pasta, args.workers[-1], args.em_voo[-1], medir_memoria=True))
+    if resource is not None:
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        fator = 1 if sys.platform == "darwin" else 1024  # Linux reporta em KB
+        print(f"\n   📈 RSS máximo do processo do benchmark: {maxrss * fator / 1e6:.1f} MB")
+
+
+def cenario_incremental(fake, args):
+    print("\n" + "=" * 70)
+    print(f"📊 INCREMENTAL ({args.editados} projetos editados entre as syncs)")
+    print("=" * 70)
+    with tempfile.TemporaryDirectory() as pasta:
+        imprimir_metricas("Sync completa (base)", rodar_sync(fake, pasta, args.workers[-1], args.em_voo[-1]))
+        imprimir_metricas("Incremental sem mudanças",
+                          rodar_sync(fake, pasta, args.workers[-1], args.em_voo[-1], incremental=True))
+        fake.tocar(args.editados)
+        imprimir_metricas(f"Incremental após editar {args.editados} projetos",
+                          rodar_sync(fake, pasta, args.workers[-1], args.em_voo[-1], incremental=True))
+
+
+CENARIOS = {
+    "concorrencia": cenario_concorrencia,
+    "completo": cenario_completo,
+    "incremental": cenario_incremental,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do ZohoSync contra o Zoho falso")
+    parser.add_argument("cenarios", nargs="*", help=f"{', '.join(CENARIOS)} (padrão: todos)")
+    parser.add_argument("--projetos", type=int, default=100)
+    parser.add_argument("--tarefas", type=int, default=250)
+    parser.add_argument("--variacao", type=float, default=0.5, help="dispersão do nº de tarefas por projeto")
+    parser.add_argument("--latencia", type=float, default=0.03, help="segundos por request")
+    parser.add_argument("--taxa-erro", type=float, default=0.0, help="fração de GETs com 503")
+    parser.add_argument("--cota", type=int, default=None, help="requests/segundo antes do 429")
+    parser.add_argument("--editados", type=int, default=3, help="projetos editados no cenário incremental")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--em-voo", type=int, nargs="+", default=[1, 2], help="páginas adiantadas por endpoint")
+    args = parser.parse_args()
+
+    cenarios = args.cenarios or list(CENARIOS)
+    desconhecidos = [c for c in cenarios if c not in CENARIOS]
+    if desconhecidos:
+        parser.error(f"cenário desconhecido: {', '.join(desconhecidos)}")
+    print("=" * 70)
+    print(f"🧪 BENCHMARK SYNC: {args.projetos} projetos x ~{args.tarefas} tarefas | latência "
+          f"{args.latencia * 1000:.0f}ms | erro {args.taxa_erro:.0%} | cota {args.cota or 'livre'}")
+    print("=" * 70)
+
+    with ProcessoFake(args) as fake:
+        Config.ZOHO_MY_USER_ID = fake.info["OWNER_ID"]
+        for nome in cenarios:
+            CENARIOS[nome](fake, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import json
 import os
+import re
 import time
 from google import genai
 from google.genai import types
@@ -8,6 +9,14 @@ from datetime import datetime
 from ferramentas import ApexFerramentas
 from router import ApexRouter
 from database import DatabaseManager # IMPORTANDO O BANCO DE DADOS
+from note_queue import get_fila_notas
+from repository import get_repositorio, com_snapshot_fixo
+from project_ranking import mais_criticos
+from query_engine import get_motor_consultas
+from brain_comum import buscar_nas_notas, com_notas, resolver_nomes
+
+# Pergunta sobre o que já foi anotado: vai direto para a busca nas anotações
+GATILHO_BUSCA_NOTAS = re.compile(r"\b(onde|o que|quando) (eu )?anotei\b|\b(busque|procure|buscar|procurar) nas (anota[cç][oõ]es|notas)\b")
 
 class ApexBrain:
     def __init__(self):
@@ -21,6 +30,7 @@ class ApexBrain:
         self.ferramentas = ApexFerramentas()
         self.router = ApexRouter()
         self.db = DatabaseManager()
+        self.fila_notas = get_fila_notas()  # Anotações gravadas em segundo plano
         
         # Diretório Físico de Projetos (Para guardar arquivos no PC)
         self.pasta_projetos = os.path.join(os.getcwd(), "Projetos_Animati")
@@ -28,7 +38,8 @@ class ApexBrain:
             os.makedirs(self.pasta_projetos)
 
         # Estados e Memórias
-        self.dados_projetos = self.carregar_dados_zoho()
+        self.carregar_dados_zoho()  # Já deixa o snapshot em cache
+        get_repositorio().observar()  # Sync nova entra sozinha, carregada em segundo plano
         self.historico_conversa = []
         self.max_historico = 10
         
@@ -50,17 +61,25 @@ Os projetos possuem 'custom_fields' que ditam o cronograma real.
 - "Data de Virada": Entrada em Produção (Go-Live).
 - "Data de Inicio da OA": Operação Assistida.
 - "Link do Google": Pasta do Drive do cliente.
+Cada projeto também traz 'fatos' já calculados na sincronização (não recalcule):
+- "fase_cronograma": etapa atual pelas datas acima. "proximo_marco": próxima etapa e data.
+- "fase_atual": lista de tarefas em execução. "tarefas_vencidas", "dias_atraso" e "lista_bloqueando": atrasos.
 
 REGRA DE RESPOSTA:
 Seja DIRETO, CONCISO e PROFISSIONAL. Não liste todas as datas se o usuário não pedir. 
-Cruze os dados: se o usuário perguntar o status, use os custom_fields para determinar a fase exata e leia as notas (MEMORIA_GESTOR) para dar o contexto humano.
+Cruze os dados: se o usuário perguntar o status, use os 'fatos' para a fase exata e os atrasos e leia as notas (MEMORIA_GESTOR) para dar o contexto humano.
 """
 
+    @property
+    def dados_projetos(self):
+        """Projetos da última sync: o repositório só relê o snapshot quando ele muda"""
+        return self.carregar_dados_zoho()
+
     def carregar_dados_zoho(self):
         try:
-            with open("db_projetos.json", "r", encoding="utf-8") as f:
-                return json.load(f)
-        except FileNotFoundError:
+            # As tarefas nunca vão para o prompt, então só os cabeçalhos
+            return get_repositorio().projetos(com_tarefas=False)
+        except ValueError:
             return []
 
     def garantir_pasta_projeto(self, nome_projeto):
@@ -90,16 +109,9 @@ Cruze os dados: se o usuário perguntar o status, use os custom_fields para dete
             contexto += f"{ator}: {msg['content'][:250]}\n"
         return contexto + "\n"
 
-    def buscar_dados_projetos(self, nomes_mencionados):
-        if not nomes_mencionados: return []
-        projetos_encontrados = []
-        for nome_busca in nomes_mencionados:
-            termo_limpo = str(nome_busca).lower()
-            for proj in self.dados_projetos:
-                if termo_limpo in proj.get("name", "").lower():
-                    if proj not in projetos_encontrados:
-                        projetos_encontrados.append(proj)
-        return projetos_encontrados
+    def buscar_dados_projetos(self, nomes_mencionados, minimo=0.0):
+        # Nomes que o roteador achou, pelo índice de nomes (mesma busca de todos os brains)
+        return resolver_nomes(nomes_mencionados, minimo=minimo, com_tarefas=False)
 
     def extrair_texto_nota(self, frase_usuario, nome_projeto_detectado):
         prompt_extracao = (
@@ -109,7 +121,8 @@ Cruze os dados: se o usuário perguntar o status, use os custom_fields para dete
         resp = self.client.models.generate_content(model=self.model_name, contents=prompt_extracao)
         return resp.text.strip()
 
-    def analisar(self, pergunta):
+    @com_snapshot_fixo  # A resposta inteira usa uma única versão do snapshot
+    def analisar(self, pergunta, consulta_local=True):
         print(f"\n🗣️ Giovani: '{pergunta}'")
         self.adicionar_ao_historico("user", pergunta)
 
@@ -129,6 +142,16 @@ Cruze os dados: se o usuário perguntar o status, use os custom_fields para dete
             else:
                 return "⚠️ Ação pendente! Por favor, responda 'Sim' para executar ou 'Não' para cancelar."
 
+        # 1.5 CONSULTA LOCAL (pergunta factual: responde direto dos dados, sem a IA)
+        local = get_motor_consultas().responder(pergunta) if consulta_local else None
+        if local:
+            self.adicionar_ao_historico("assistant", local)
+            return local
+
+        # 1.6 BUSCA NAS ANOTAÇÕES ("onde anotei sobre..."): não precisa nem do roteador
+        if GATILHO_BUSCA_NOTAS.search(pergunta.lower()):
+            return self._processar_busca_notas(pergunta)
+
         # 2. ROTEAMENTO
         decisao = self.router.classificar(pergunta)
         categoria = decisao.get("categoria", "CONVERSA")
@@ -148,23 +171,29 @@ Cruze os dados: se o usuário perguntar o status, use os custom_fields para dete
         elif categoria == "CONSULTA_ZOHO":
             return self._processar_consulta(pergunta, projetos_menc)
             
+        elif categoria == "BUSCA_MEMORIA":
+            return self._processar_busca_notas(decisao.get("termos_busca") or pergunta)
+
         elif categoria == "MEMORIA":
             if projetos_menc:
-                dados = self.buscar_dados_projetos(projetos_menc)
+                # Nome aproximado só decide sozinho com nota alta: melhor perguntar do que anotar no projeto errado
+                dados = self.buscar_dados_projetos(projetos_menc, minimo=Config.NOMES_NOTA_ESCRITA)
+                if len(dados) > 1:
+                    nomes = "\n".join(f"- {p['name']}" for p in dados)
+                    return f"Qual deles? (Diga o código):\n{nomes}"
                 if dados:
                     proj = dados[0] 
                     
-                    # 1. SOLUÇÃO DA PASTA: Garante a criação física da pasta ao anotar!
-                    self.garantir_pasta_projeto(proj['name'])
-                    
-                    # 2. SOLUÇÃO DO TRAVAMENTO: Prints de rastreio para você não ficar às cegas
-                    print(f"   ⏳ [Rastreio] Enviando nota para a API do Google resumir...")
-                    nota_limpa = self.extrair_texto_nota(pergunta, proj['name'])
+                    # Projeto identificado: confirma na hora. Pasta do projeto, resumo pela IA e
+                    # gravação no banco ficam com a fila de anotações, em segundo plano
+                    def preparar(frase, nome=proj['name']):
+                        self.garantir_pasta_projeto(nome)
+                        return self.extrair_texto_nota(frase, nome)
                     
-                    print(f"   💾 [Rastreio] Salvando no Banco de Dados: '{nota_limpa}'...")
-                    self.db.salvar_nota(proj['id'], proj['name'], nota_limpa) 
+                    self.fila_notas.anotar(proj['id'], proj['name'], pergunta, preparar=preparar)
+                    print(f"   💾 [Rastreio] Nota na fila ({self.fila_notas.pendentes()} aguardando gravação)")
                     
-                    res = f"✅ Anotação salva no banco de dados para o projeto {proj['name']} e pasta do projeto verificada/criada."
+                    res = f"✅ Anotado no projeto {proj['name']}."
                     self.adicionar_ao_historico("assistant", res)
                     return res
             return "Senhor, não consegui identificar a qual projeto essa anotação pertence."
@@ -207,36 +236,39 @@ Retorne APENAS o JSON válido."""
                 else:
                     return "❌ Senhor, a API do Google está muito instável. Não consegui formatar a ação."
 
+    def _processar_busca_notas(self, texto):
+        """Trechos das anotações (de todos os projetos) que falam do assunto, direto do índice FTS"""
+        achados = buscar_nas_notas(self.db, texto, limite=5)  # Nota recém-ditada ainda na fila também entra
+        if not achados:
+            res = "Senhor, não encontrei nenhuma anotação sobre isso."
+        else:
+            linhas = [f"- {a['projeto']} ({a['data']}): {a['trecho']}" for a in achados]
+            res = f"Encontrei {len(achados)} anotação(ões):\n" + "\n".join(linhas)
+        self.adicionar_ao_historico("assistant", res)
+        return res
+
     def _processar_consulta(self, pergunta, projetos_menc):
         dados = self.buscar_dados_projetos(projetos_menc)
         if not dados and not projetos_menc: 
-             dados = self.dados_projetos[:10]
+             dados = self.dados_projetos
+        # Só os 10 mais críticos vão para o prompt (atraso, vencidas, estagnação, Go-Live perto)
+        dados = mais_criticos(dados, 10)
 
         contexto_projetos = ""
         if dados:
-            dados_enriquecidos = []
-            for p in dados[:10]:
-                p_completo = p.copy()
-                
-                # 1. Pega as notas do Banco SQLite (A parte Humana)
-                p_completo['MEMORIA_GESTOR'] = self.db.buscar_notas_projeto(p.get('id'))
-                
-                # 2. Garante a Pasta Local (Integração com Sistema)
+            # 1. Garante a Pasta Local (Integração com Sistema)
+            for p in dados:
                 self.garantir_pasta_projeto(p.get('name'))
-                
-                # Limpa a lista de tarefas para economizar tokens (a IA vai focar nos custom_fields agora)
-                if 'tasks' in p_completo:
-                    del p_completo['tasks']
-                    
-                dados_enriquecidos.append(p_completo)
-                
+            # 2. Notas do Banco SQLite (A parte Humana), de todos os projetos numa consulta só;
+            # as tarefas saem para economizar tokens (fase e atrasos já vêm resumidos em 'fatos')
+            dados_enriquecidos = com_notas(dados, self.db, sem_tarefas=True)
             contexto_projetos = json.dumps(dados_enriquecidos, ensure_ascii=False)
         
         prompt = (
             f"{self.construir_contexto_conversa()}"
             f"DADOS DO SISTEMA (ZOHO/DB):\n{contexto_projetos}\n\n"
             f"PERGUNTA DO GESTOR: {pergunta}\n\n"
-            "Responda baseada APENAS nos dados. Use as datas dos custom_fields para inferir o status e a MEMORIA_GESTOR para o contexto da operação."
+            "Responda baseada APENAS nos dados. Use os 'fatos' (já calculados) para o status e a MEMORIA_GESTOR para o contexto da operação."
         )
         
         resp = self.client.models.generate_content(
@@ -0,0 +1,163 @@
+"""
+Peças que todos os brains dividem
+Cada brain (brain/brain_v2, brain_v2_logged, brain_v2_sem_log, brain_original)
+tem o seu prompt e o seu jeito de conversar, mas achar o projeto citado na
+pergunta e montar o contexto dos projetos (os mais críticos, com as
+anotações do gestor) é igual para todos e fica aqui, numa cópia só.
+
+    rotear(pergunta)                     -> (projetos, msg_erro, eh_escrita), o roteador dos brains
+    projeto_por_codigo(texto)            -> projeto cujo código (número no nome) aparece no texto
+    resolver_nomes(termos, minimo=0.0)   -> projetos pelo nome (exato; se não decidir, aproximado)
+    projetos_por_ids(ids)                -> projetos do repositório, na ordem dos ids
+    visao_helicoptero(projetos, db)      -> resumo dos mais críticos com as NOTAS
+    com_notas(projetos, db)              -> cópias dos projetos com a MEMORIA_GESTOR
+    notas_dos_projetos(db, ids)          -> {id: [notas]} numa consulta só
+    buscar_nas_notas(db, texto)          -> trechos das anotações sobre o assunto
+
+As leituras de notas juntam o banco com o que a fila de anotações ainda não
+gravou: a nota recém-ditada já aparece, sem esperar a gravação.
+"""
+
+from config import Config
+from database import termos_busca
+from note_queue import get_fila_notas
+from project_ranking import mais_criticos
+from query_engine import e_escrita
+from repository import get_repositorio
+
+# Pergunta sobre a carteira toda: vai para a visão geral em vez de procurar um projeto
+GATILHOS_GLOBAIS = ['quais', 'quantos', 'listar', 'relatório', 'resumo', 'todos', 'geral']
+# Palavras da frase que nunca são nome de projeto
+PALAVRAS_IGNORADAS = ['anote', 'que', 'sobre', 'projeto', 'no', 'na', 'o', 'a', 'para',
+                      'fase', 'status', 'apex', 'situacao', 'situação', 'clique',
+                      'mande', 'leia', 'email', 'whatsapp', 'mensagem']
+
+VISAO_GERAL = "VISAO_GERAL"  # rotear(): a pergunta é sobre todos os projetos
+
+
+def projetos_por_ids(ids, com_tarefas=True):
+    """Projetos do repositório para os ids achados no índice de nomes (com_tarefas=True
+    carrega as tarefas só deles, que ficam no cache dos projetos recentes)"""
+    repositorio = get_repositorio()
+    return [p for p in (repositorio.por_id(i, com_tarefas=com_tarefas) for i in ids) if p is not None]
+
+
+def projeto_por_codigo(texto, com_tarefas=True):
+    """Primeiro projeto cujo código aparece como número solto no texto, ou None"""
+    indice = get_repositorio().indice_nomes()
+    for num in (p for p in texto.lower().split() if p.isdigit()):
+        for proj in projetos_por_ids(indice.por_codigo(num)[:1], com_tarefas):
+            return proj
+    return None
+
+
+def resolver_nomes(termos, minimo=0.0, com_tarefas=True):
+    """Projetos pelo nome: exata primeiro; se não decidir, a aproximada cobre nomes mal
+    entendidos pela voz. `minimo`: nota para a aproximada decidir sozinha (ao anotar,
+    Config.NOMES_NOTA_ESCRITA: melhor perguntar do que anotar no projeto errado)"""
+    if not termos:
+        return []
+    return projetos_por_ids(get_repositorio().indice_nomes().resolver(termos, minimo=minimo), com_tarefas)
+
+
+def rotear(pergunta, com_tarefas=True):
+    """Identifica os projetos mencionados. Devolve (projetos, msg_erro, eh_escrita):
+        pergunta global (quais, quantos...)  -> (VISAO_GERAL, None, False)
+        código ou nome de um projeto só      -> ([projeto], None, eh_escrita)
+        vários projetos                      -> (projetos, "Qual deles?...", eh_escrita)
+        anotação sem projeto                 -> (None, "Qual projeto?...", False)
+        nenhum projeto                       -> (None, None, False)"""
+    pergunta_limpa = pergunta.lower()
+    modo_escrita = e_escrita(pergunta_limpa)  # O mesmo gatilho que barra o motor de consultas
+
+    if not modo_escrita and any(gatilho in pergunta_limpa for gatilho in GATILHOS_GLOBAIS):
+        return VISAO_GERAL, None, False
+
+    proj = projeto_por_codigo(pergunta_limpa, com_tarefas)
+    if proj is not None:
+        return [proj], None, modo_escrita
+
+    termos = [p for p in pergunta_limpa.split() if len(p) > 3 and p not in PALAVRAS_IGNORADAS]
+    minimo = Config.NOMES_NOTA_ESCRITA if modo_escrita else 0.0
+    projetos_encontrados = resolver_nomes(termos, minimo, com_tarefas)
+
+    if len(projetos_encontrados) == 1:
+        return projetos_encontrados, None, modo_escrita
+    if len(projetos_encontrados) > 1:
+        nomes = "\n".join(f"- {p['name']}" for p in projetos_encontrados)
+        return projetos_encontrados, f"Qual deles? (Diga o código):\n{nomes}", modo_escrita
+    if modo_escrita:
+        return None, "Qual projeto? Diga o nome ou código.", False
+    return None, None, False
+
+
+def _com_nao_gravadas(ler_banco):
+    """(ler_banco(), notas ainda na fila) sem repetir nem perder nota: se um lote chegou
+    ao banco entre as duas leituras, lê de novo (gravações são raras, não passa de 3)"""
+    fila = get_fila_notas()
+    for _ in range(3):
+        marca, nao_gravadas = fila.nao_gravadas()
+        do_banco = ler_banco()
+        if fila.lotes_gravados == marca:
+            break
+    return do_banco, nao_gravadas
+
+
+def notas_dos_projetos(db, ids):
+    """{id: [notas]} dos projetos, numa consulta só ao banco de anotações, mais novas
+    primeiro (as que a fila ainda não gravou na frente)"""
+    notas, nao_gravadas = _com_nao_gravadas(lambda: db.buscar_notas_projetos(ids))
+    ids = {str(i) for i in ids}
+    for projeto_id, _, texto, data in reversed(nao_gravadas):  # Da mais antiga para a mais nova
+        if projeto_id in ids:
+            notas.setdefault(projeto_id, []).insert(0, f"[{data}] {texto}")
+    return notas
+
+
+def buscar_nas_notas(db, texto, limite=5):
+    """db.buscar_nas_notas ([{"projeto_id", "projeto", "data", "trecho"}]) com as notas
+    ainda na fila que têm todas as palavras na frente (são as mais novas)"""
+    achados, nao_gravadas = _com_nao_gravadas(lambda: db.buscar_nas_notas(texto, limite=limite))
+    termos = termos_busca(texto)
+    if not termos:
+        return achados
+    novas = [{"projeto_id": projeto_id, "projeto": projeto, "data": data, "trecho": nota}
+             for projeto_id, projeto, nota, data in nao_gravadas
+             if all(t in " ".join(termos_busca(f"{projeto} {nota}")) for t in termos)]
+    return (novas + achados)[:limite]
+
+
+def com_notas(projetos, db, sem_tarefas=False):
+    """Cópias dos projetos com as anotações do gestor em MEMORIA_GESTOR (o contexto
+    humano do prompt). sem_tarefas=True tira a lista de tarefas (fase e atrasos já
+    vêm resumidos em 'fatos')."""
+    notas = notas_dos_projetos(db, [p.get('id') for p in projetos])
+    enriquecidos = []
+    for p in projetos:
+        p_completo = p.copy()
+        p_completo['MEMORIA_GESTOR'] = notas.get(str(p.get('id')), [])
+        if sem_tarefas:
+            p_completo.pop('tasks', None)
+        enriquecidos.append(p_completo)
+    return enriquecidos
+
+
+def visao_helicoptero(projetos, db, k=15):
+    """Resumo de cada um dos k projetos mais críticos (atraso, vencidas, estagnação,
+    Go-Live perto: só eles cabem no prompt), com as anotações em NOTAS"""
+    projetos = mais_criticos(projetos, k)
+    notas = notas_dos_projetos(db, [p['id'] for p in projetos])
+    dados = []
+    for p in projetos:
+        fatos = p.get('fatos') or {}  # Calculados na sync (project_facts.py)
+        dados.append({
+            "id": p['id'],
+            "name": p['name'],
+            "percent": p['percent_complete'],
+            "fase_real": fatos.get('fase_atual') or "Indefinida",
+            "fase_cronograma": fatos.get('fase_cronograma'),
+            "tarefas_vencidas": fatos.get('tarefas_vencidas', 0),
+            "dias_atraso": fatos.get('dias_atraso', 0),
+            "NOTAS": notas.get(str(p['id']), []),
+        })
+    return dados
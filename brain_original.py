@@ -1,11 +1,16 @@
 import json
-import os
 import time
 from google import genai
 from google.genai import types
 from config import Config
 from datetime import datetime
 from ferramentas import ApexFerramentas  # <--- NOVA IMPORTAÇÃO
+from repository import get_repositorio, com_snapshot_fixo
+from database import DatabaseManager
+from migrar_memoria import migrar
+from note_queue import get_fila_notas
+from query_engine import get_motor_consultas
+from brain_comum import VISAO_GERAL, com_notas, projeto_por_codigo, rotear, visao_helicoptero
 
 class ApexBrain:
     def __init__(self):
@@ -14,12 +19,14 @@ class ApexBrain:
         
         self.client = genai.Client(api_key=Config.GEMINI_KEY)
         self.model_name = "gemini-flash-latest" 
-        self.arquivo_memoria = "db_memoria.json"
+        self.db = DatabaseManager()  # Anotações: o mesmo banco de todos os brains
+        self.fila_notas = get_fila_notas()  # ...gravadas em segundo plano
         self.cache_nota_pendente = None 
         
         # Carrega dados
-        self.dados_projetos = self.carregar_dados_zoho()
-        self.memoria_local = self.carregar_memoria_local()
+        self.carregar_dados_zoho()  # Já deixa o snapshot em cache
+        get_repositorio().observar()  # Sync nova entra sozinha, carregada em segundo plano
+        migrar(db=self.db)  # db_memoria.json antigo entra no banco (uma vez só)
         
         # Inicializa os "Braços"
         self.ferramentas = ApexFerramentas() # <--- INICIALIZAÇÃO DOS BRAÇOS
@@ -60,41 +67,25 @@ class ApexBrain:
             "- Pedido de Ação/E-mail? -> Responda em JSON."
         )
 
+    @property
+    def dados_projetos(self):
+        """Projetos da última sync: o repositório só relê o snapshot quando ele muda"""
+        return self.carregar_dados_zoho()
+
     def carregar_dados_zoho(self):
         try:
-            with open("db_projetos.json", "r", encoding="utf-8") as f:
-                return json.load(f)
-        except FileNotFoundError:
+            # Só os cabeçalhos: as tarefas vêm sob demanda, só dos projetos citados (brain_comum)
+            return get_repositorio().projetos(com_tarefas=False)
+        except ValueError:
             return []
 
-    def carregar_memoria_local(self):
-        if not os.path.exists(self.arquivo_memoria):
-            with open(self.arquivo_memoria, "w", encoding="utf-8") as f:
-                json.dump({}, f)
-            return {}  
-        try:
-            with open(self.arquivo_memoria, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return {}
-
-    def salvar_memoria(self, projeto_id, nota):
+    def salvar_memoria(self, projeto_id, nota, projeto_nome=None, resumir=False):
+        # Confirma na hora: o resumo pela IA (resumir=True) e a gravação no banco
+        # ficam com a fila de anotações, em segundo plano (note_queue.py)
         projeto_id = str(projeto_id)
-        if not os.path.exists(self.arquivo_memoria):
-             with open(self.arquivo_memoria, "w", encoding="utf-8") as f:
-                json.dump({}, f)
-
-        timestamp = datetime.now().strftime("%d/%m")
-        nova_entrada = f"[{timestamp}] {nota}"
-        
-        if projeto_id not in self.memoria_local:
-            self.memoria_local[projeto_id] = []
-        
-        self.memoria_local[projeto_id].append(nova_entrada)
-        
-        with open(self.arquivo_memoria, "w", encoding="utf-8") as f:
-            json.dump(self.memoria_local, f, indent=4, ensure_ascii=False)
-        
+        nome = projeto_nome or f"Projeto {projeto_id}"
+        preparar = (lambda frase: self.extrair_texto_nota(frase, nome)) if resumir else None
+        self.fila_notas.anotar(projeto_id, nome, nota, preparar=preparar)
         return f"Anotado no projeto {projeto_id}."
 
     def extrair_texto_nota(self, frase_usuario, nome_projeto_detectado):
@@ -108,103 +99,52 @@ class ApexBrain:
         return resp.text.strip()
 
     def roteador_inteligente(self, pergunta):
-        pergunta_limpa = pergunta.lower()
-        
-        gatilhos_escrita = ['anote', 'lembre', 'adicionar nota', 'gravar', 'registre']
-        modo_escrita = any(g in pergunta_limpa for g in gatilhos_escrita)
-
-        gatilhos_globais = ['quais', 'quantos', 'listar', 'relatório', 'resumo', 'todos', 'geral']
-        
-        if any(gatilho in pergunta_limpa for gatilho in gatilhos_globais) and not modo_escrita:
-             return self.gerar_visao_helicoptero(self.dados_projetos), None, False
-
-        numeros = [p for p in pergunta_limpa.split() if p.isdigit()]
-        for num in numeros:
-            for proj in self.dados_projetos:
-                if num in proj.get("name", ""):
-                    return [proj], None, modo_escrita
-
-        palavras_ignoradas = ['anote', 'que', 'sobre', 'projeto', 'no', 'na', 'o', 'a', 'para', 'fase', 'status', 'apex', 'situacao', 'situação', 'clique', 'mande', 'leia']
-        termos = [p for p in pergunta_limpa.split() if len(p) > 3 and p not in palavras_ignoradas]
-        
-        projetos_encontrados = []
-        if termos:
-            for proj in self.dados_projetos:
-                if any(t in proj.get("name", "").lower() for t in termos):
-                    projetos_encontrados.append(proj)
-
-        if len(projetos_encontrados) == 1:
-            return projetos_encontrados, None, modo_escrita
-        elif len(projetos_encontrados) > 1:
-            nomes = "\n".join([f"- {p['name']}" for p in projetos_encontrados])
-            return projetos_encontrados, f"Qual deles? (Diga o código):\n{nomes}", modo_escrita
-        
-        if modo_escrita:
-            return None, "Qual projeto? Diga o nome ou código.", False
-            
-        # Se não achou projeto específico, retorna visão geral (útil se for pergunta de e-mail/ação)
-        return self.gerar_visao_helicoptero(self.dados_projetos), None, False
+        projetos, msg_erro, eh_escrita = rotear(pergunta)
+        if projetos == VISAO_GERAL or (projetos is None and msg_erro is None):
+            # Global, ou nenhum projeto específico: visão geral (útil se for pergunta de e-mail/ação)
+            return self.gerar_visao_helicoptero(self.dados_projetos), None, False
+        return projetos, msg_erro, eh_escrita
 
     def gerar_visao_helicoptero(self, lista):
-        dados = []
-        for p in lista:
-            notas = self.memoria_local.get(str(p['id']), [])
-            fase = "Indefinida"
-            for t in p.get("tasks", []):
-                status = str(t.get("status", "")).lower()
-                if status not in ["completed", "concluído", "cancelled", "fechado"]:
-                    fase = t.get("tasklist", "Geral")
-                    break
-            
-            dados.append({
-                "id": p['id'],
-                "name": p['name'],
-                "percent": p['percent_complete'],
-                "fase_real": fase,
-                "NOTAS": notas 
-            })
-        return dados
+        return visao_helicoptero(lista, self.db)
 
-    def analisar(self, pergunta):
+    @com_snapshot_fixo  # A resposta inteira usa uma única versão do snapshot
+    def analisar(self, pergunta, consulta_local=True):
         if not self.dados_projetos: return "Sem dados."
 
         print(f"\n🧠 Processando...")
 
         # 1. Lógica de Memória Pendente (Prioridade)
         if self.cache_nota_pendente:
-            numeros = [p for p in pergunta.split() if p.isdigit()]
-            for num in numeros:
-                for proj in self.dados_projetos:
-                    if num in proj.get("name", ""):
-                        res = self.salvar_memoria(proj['id'], self.cache_nota_pendente)
-                        self.cache_nota_pendente = None
-                        return res
+            proj = projeto_por_codigo(pergunta)
+            if proj is not None:
+                res = self.salvar_memoria(proj['id'], self.cache_nota_pendente, proj['name'], resumir=True)
+                self.cache_nota_pendente = None
+                return res
             self.cache_nota_pendente = None
             return "Operação cancelada. Código não reconhecido."
 
+        # 1.5 Consulta local (pergunta factual: responde direto dos dados, sem a IA)
+        local = get_motor_consultas().responder(pergunta) if consulta_local else None
+        if local:
+            return local
+
         # 2. Roteamento (Identifica Projetos Envolvidos)
         projetos_alvo, msg_erro, eh_escrita = self.roteador_inteligente(pergunta)
         
         if msg_erro:
             if eh_escrita and isinstance(projetos_alvo, list):
-                texto_nota = self.extrair_texto_nota(pergunta, "Múltiplos")
-                self.cache_nota_pendente = texto_nota
+                self.cache_nota_pendente = pergunta  # Resumida pela IA depois, já com o projeto escolhido
                 return msg_erro 
             return msg_erro
 
         if eh_escrita:
-            nota_limpa = self.extrair_texto_nota(pergunta, projetos_alvo[0]['name'])
-            return self.salvar_memoria(projetos_alvo[0]['id'], nota_limpa)
+            return self.salvar_memoria(projetos_alvo[0]['id'], pergunta, projetos_alvo[0]['name'], resumir=True)
 
         # 3. Preparação do Prompt (Leitura ou Ação)
-        dados_enriquecidos = []
         # Limita quantidade para não estourar tokens se for lista geral
         lista_para_contexto = projetos_alvo[:15] if isinstance(projetos_alvo, list) else projetos_alvo
-        
-        for p in lista_para_contexto:
-            p_completo = p.copy()
-            p_completo['MEMORIA_GESTOR'] = self.memoria_local.get(str(p.get('id')), [])
-            dados_enriquecidos.append(p_completo)
+        dados_enriquecidos = com_notas(lista_para_contexto, self.db)
 
         contexto = json.dumps(dados_enriquecidos, ensure_ascii=False)
         
@@ -4,7 +4,6 @@ Versão com monitoramento completo de erros e eventos
 """
 
 import json
-import os
 import time
 import traceback
 from google import genai
@@ -13,6 +12,12 @@ from config import Config
 from datetime import datetime
 from ferramentas import ApexFerramentas
 from logger import get_logger
+from repository import get_repositorio, com_snapshot_fixo
+from database import DatabaseManager
+from migrar_memoria import migrar
+from note_queue import get_fila_notas
+from query_engine import get_motor_consultas
+from brain_comum import VISAO_GERAL, com_notas, projeto_por_codigo, rotear, visao_helicoptero
 
 # Inicializa logger
 log = get_logger("brain_v2")
@@ -34,18 +39,21 @@ class ApexBrain:
             self.model_name = "gemini-flash-latest"
             log.info(f"Modelo AI: {self.model_name}")
             
-            self.arquivo_memoria = "db_memoria.json"
+            self.db = DatabaseManager()  # Anotações: o mesmo banco de todos os brains
+            self.fila_notas = get_fila_notas()  # ...gravadas em segundo plano
             self.cache_nota_pendente = None 
             
             # Carrega dados
             log.debug("Carregando dados do Zoho Projects...")
-            self.dados_projetos = self.carregar_dados_zoho()
+            self._versao_snapshot = False  # Ainda não olhou o snapshot
             log.info(f"✅ Projetos carregados: {len(self.dados_projetos)}")
+            get_repositorio().observar()  # Sync nova entra sozinha, carregada em segundo plano
             
-            log.debug("Carregando memória local (anotações)...")
-            self.memoria_local = self.carregar_memoria_local()
-            total_notas = sum(len(v) for v in self.memoria_local.values())
-            log.info(f"✅ Anotações carregadas: {total_notas} em {len(self.memoria_local)} projetos")
+            log.debug("Conferindo o banco de anotações...")
+            migrados = migrar(db=self.db)  # db_memoria.json antigo entra no banco (uma vez só)
+            if migrados:
+                log.info(f"📦 {migrados} anotações migradas do db_memoria.json")
+            log.info(f"✅ Anotações no banco: {self.db.total_notas()}")
             
             # Inicializa as "Ferramentas"
             log.debug("Inicializando módulo de ferramentas...")
@@ -135,47 +143,33 @@ Se o usuário disser "anote que...", "lembre que...", "registre que...":
 3. Confirme a anotação de forma breve
 """
 
+    @property
+    def dados_projetos(self):
+        """Projetos da última sync: o repositório só relê o snapshot quando ele muda"""
+        return self.carregar_dados_zoho()
+
     def carregar_dados_zoho(self):
-        """Carrega projetos do arquivo JSON"""
+        """Projetos do snapshot via repositório (só relê o arquivo quando muda)"""
+        repositorio = get_repositorio()
         try:
-            caminho = "db_projetos.json"
-            if not os.path.exists(caminho):
-                log.warning(f"Arquivo {caminho} não encontrado")
-                return []
-                
-            with open(caminho, "r", encoding="utf-8") as f:
-                dados = json.load(f)
-                log.debug(f"Arquivo {caminho} lido com sucesso: {len(dados)} projetos")
-                return dados
-                
-        except json.JSONDecodeError as e:
-            log.error(f"Erro ao decodificar JSON de {caminho}", exception=e)
+            # Só os cabeçalhos: as tarefas vêm sob demanda, só dos projetos citados (brain_comum)
+            dados = repositorio.projetos(com_tarefas=False)
+            versao = repositorio.assinatura()
+            if versao != self._versao_snapshot:
+                if versao is None:
+                    log.warning("Snapshot de projetos não encontrado")
+                else:
+                    log.debug(f"Snapshot {versao[0]} carregado: {len(dados)} projetos")
+                self._versao_snapshot = versao
+            return dados
+
+        except ValueError as e:
+            log.error("Erro ao decodificar o snapshot de projetos", exception=e)
             return []
         except Exception as e:
             log.error(f"Erro inesperado ao carregar dados do Zoho", exception=e)
             return []
 
-    def carregar_memoria_local(self):
-        """Carrega anotações do gestor"""
-        try:
-            if not os.path.exists(self.arquivo_memoria):
-                log.debug(f"Arquivo de memória não existe, criando novo: {self.arquivo_memoria}")
-                with open(self.arquivo_memoria, "w", encoding="utf-8") as f:
-                    json.dump({}, f)
-                return {}
-                
-            with open(self.arquivo_memoria, "r", encoding="utf-8") as f:
-                dados = json.load(f)
-                log.debug(f"Memória carregada: {len(dados)} projetos com anotações")
-                return dados
-                
-        except json.JSONDecodeError as e:
-            log.error("Erro ao decodificar memória JSON", exception=e)
-            return {}
-        except Exception as e:
-            log.error("Erro ao carregar memória local", exception=e)
-            return {}
-
     def adicionar_ao_historico(self, role, content):
         """Adiciona mensagem ao histórico de conversa"""
         try:
@@ -218,29 +212,19 @@ Se o usuário disser "anote que...", "lembre que...", "registre que...":
             log.error("Erro ao construir contexto conversacional", exception=e)
             return ""
 
-    def salvar_memoria(self, projeto_id, nota):
-        """Salva anotação sobre um projeto"""
+    def salvar_memoria(self, projeto_id, nota, projeto_nome=None, resumir=False):
+        """Enfileira a anotação e confirma na hora; o resumo pela IA (resumir=True) e a
+        gravação no banco ficam com a fila de anotações, em segundo plano"""
         try:
             projeto_id = str(projeto_id)
-            log.info(f"Salvando anotação no projeto {projeto_id}")
+            nome = projeto_nome or f"Projeto {projeto_id}"
+            log.info(f"Anotação na fila para o projeto {projeto_id}")
             log.debug(f"Nota: {nota}")
             
-            if not os.path.exists(self.arquivo_memoria):
-                with open(self.arquivo_memoria, "w", encoding="utf-8") as f:
-                    json.dump({}, f)
-
-            timestamp = datetime.now().strftime("%d/%m")
-            nova_entrada = f"[{timestamp}] {nota}"
-            
-            if projeto_id not in self.memoria_local:
-                self.memoria_local[projeto_id] = []
-            
-            self.memoria_local[projeto_id].append(nova_entrada)
-            
-            with open(self.arquivo_memoria, "w", encoding="utf-8") as f:
-                json.dump(self.memoria_local, f, indent=4, ensure_ascii=False)
+            preparar = (lambda frase: self.extrair_texto_nota(frase, nome)) if resumir else None
+            self.fila_notas.anotar(projeto_id, nome, nota, preparar=preparar)
             
-            log.info(f"✅ Anotação salva com sucesso no projeto {projeto_id}")
+            log.info(f"✅ Anotação aceita ({self.fila_notas.pendentes()} aguardando gravação)")
             return f"✅ Anotado no projeto {projeto_id}."
             
         except Exception as e:
@@ -270,92 +254,35 @@ Se o usuário disser "anote que...", "lembre que...", "registre que...":
             return frase_usuario  # Fallback: usa a frase original
 
     def roteador_inteligente(self, pergunta):
-        """Identifica projetos mencionados"""
+        """Identifica projetos mencionados (brain_comum.rotear)"""
         try:
             log.debug(f"Roteando pergunta: {pergunta[:100]}")
-            pergunta_limpa = pergunta.lower()
-            
-            # Detecta modo de escrita
-            gatilhos_escrita = ['anote', 'lembre', 'adicionar nota', 'gravar', 'registre']
-            modo_escrita = any(g in pergunta_limpa for g in gatilhos_escrita)
-            
-            if modo_escrita:
-                log.debug("Modo ESCRITA detectado")
+            projetos, msg_erro, eh_escrita = rotear(pergunta)
 
-            # Detecta consultas globais
-            gatilhos_globais = ['quais', 'quantos', 'listar', 'relatório', 'resumo', 'todos', 'geral']
-            
-            if any(gatilho in pergunta_limpa for gatilho in gatilhos_globais) and not modo_escrita:
+            if projetos == VISAO_GERAL:
                 log.info("Consulta GLOBAL detectada")
                 return self.gerar_visao_helicoptero(self.dados_projetos), None, False
-
-            # Busca por número de projeto
-            numeros = [p for p in pergunta_limpa.split() if p.isdigit()]
-            log.debug(f"Números encontrados: {numeros}")
-            
-            for num in numeros:
-                for proj in self.dados_projetos:
-                    if num in proj.get("name", ""):
-                        log.info(f"Projeto identificado por número: {proj.get('name')}")
-                        return [proj], None, modo_escrita
-
-            # Busca por palavras-chave
-            palavras_ignoradas = ['anote', 'que', 'sobre', 'projeto', 'no', 'na', 'o', 'a', 'para', 
-                                  'fase', 'status', 'apex', 'situacao', 'situação', 'clique', 
-                                  'mande', 'leia', 'email', 'whatsapp', 'mensagem']
-            termos = [p for p in pergunta_limpa.split() if len(p) > 3 and p not in palavras_ignoradas]
-            
-            log.debug(f"Termos de busca: {termos}")
-            
-            projetos_encontrados = []
-            if termos:
-                for proj in self.dados_projetos:
-                    if any(t in proj.get("name", "").lower() for t in termos):
-                        projetos_encontrados.append(proj)
-
-            if len(projetos_encontrados) == 1:
-                log.info(f"Projeto único identificado: {projetos_encontrados[0].get('name')}")
-                return projetos_encontrados, None, modo_escrita
-            elif len(projetos_encontrados) > 1:
-                log.warning(f"Múltiplos projetos encontrados: {len(projetos_encontrados)}")
-                nomes = "\n".join([f"- {p['name']}" for p in projetos_encontrados])
-                return projetos_encontrados, f"Qual deles? (Diga o código):\n{nomes}", modo_escrita
-            
-            if modo_escrita:
+            if eh_escrita:
+                log.debug("Modo ESCRITA detectado")
+            if msg_erro and projetos:
+                log.warning(f"Múltiplos projetos encontrados: {len(projetos)}")
+            elif msg_erro:
                 log.warning("Modo escrita sem projeto identificado")
-                return None, "Qual projeto? Diga o nome ou código.", False
-            
-            log.debug("Nenhum projeto específico identificado")
-            return None, None, False
+            elif projetos:
+                log.info(f"Projeto identificado: {projetos[0].get('name')}")
+            else:
+                log.debug("Nenhum projeto específico identificado")
+            return projetos, msg_erro, eh_escrita
             
         except Exception as e:
             log.error("Erro no roteador inteligente", exception=e)
             return None, "Erro ao identificar projeto", False
 
     def gerar_visao_helicoptero(self, lista):
-        """Gera visão geral dos projetos"""
+        """Gera visão geral dos projetos (os mais críticos, brain_comum.visao_helicoptero)"""
         try:
             log.debug(f"Gerando visão geral de {len(lista)} projetos")
-            dados = []
-            
-            for p in lista[:15]:
-                notas = self.memoria_local.get(str(p['id']), [])
-                fase = "Indefinida"
-                
-                for t in p.get("tasks", []):
-                    status = str(t.get("status", "")).lower()
-                    if status not in ["completed", "concluído", "cancelled", "fechado"]:
-                        fase = t.get("tasklist", "Geral")
-                        break
-                
-                dados.append({
-                    "id": p['id'],
-                    "name": p['name'],
-                    "percent": p['percent_complete'],
-                    "fase_real": fase,
-                    "NOTAS": notas 
-                })
-            
+            dados = visao_helicoptero(lista, self.db)
             log.debug(f"Visão geral gerada: {len(dados)} projetos processados")
             return dados
             
@@ -363,7 +290,8 @@ Se o usuário disser "anote que...", "lembre que...", "registre que...":
             log.error("Erro ao gerar visão helicoptero", exception=e)
             return []
 
-    def analisar(self, pergunta):
+    @com_snapshot_fixo  # A resposta inteira usa uma única versão do snapshot
+    def analisar(self, pergunta, consulta_local=True):
         """Método principal - COM LOGGING COMPLETO"""
         log.info("━"*70)
         log.info("NOVA SOLICITAÇÃO RECEBIDA")
@@ -384,16 +312,13 @@ Se o usuário disser "anote que...", "lembre que...", "registre que...":
             # 1. Lógica de Memória Pendente
             if self.cache_nota_pendente:
                 log.debug(f"Processando nota pendente: {self.cache_nota_pendente}")
-                numeros = [p for p in pergunta.split() if p.isdigit()]
-                
-                for num in numeros:
-                    for proj in self.dados_projetos:
-                        if num in proj.get("name", ""):
-                            res = self.salvar_memoria(proj['id'], self.cache_nota_pendente)
-                            self.cache_nota_pendente = None
-                            self.adicionar_ao_historico("assistant", res)
-                            log.info("Nota pendente salva")
-                            return res
+                proj = projeto_por_codigo(pergunta)
+                if proj is not None:
+                    res = self.salvar_memoria(proj['id'], self.cache_nota_pendente, proj['name'], resumir=True)
+                    self.cache_nota_pendente = None
+                    self.adicionar_ao_historico("assistant", res)
+                    log.info("Nota pendente salva")
+                    return res
                 
                 self.cache_nota_pendente = None
                 msg = "Operação cancelada. Código não reconhecido."
@@ -401,6 +326,13 @@ Se o usuário disser "anote que...", "lembre que...", "registre que...":
                 log.warning("Código não reconhecido, nota cancelada")
                 return msg
 
+            # 1.5 Consulta local (pergunta factual: responde direto dos dados, sem a IA)
+            local = get_motor_consultas().responder(pergunta) if consulta_local else None
+            if local:
+                log.info("Respondida localmente, sem chamar a IA")
+                self.adicionar_ao_historico("assistant", local)
+                return local
+
             # 2. Roteamento
             log.debug("Iniciando roteamento...")
             projetos_alvo, msg_erro, eh_escrita = self.roteador_inteligente(pergunta)
@@ -408,8 +340,7 @@ Se o usuário disser "anote que...", "lembre que...", "registre que...":
             if msg_erro:
                 log.warning(f"Erro no roteamento: {msg_erro}")
                 if eh_escrita and isinstance(projetos_alvo, list):
-                    texto_nota = self.extrair_texto_nota(pergunta, "Múltiplos")
-                    self.cache_nota_pendente = texto_nota
+                    self.cache_nota_pendente = pergunta  # Resumida pela IA depois, já com o projeto escolhido
                     self.adicionar_ao_historico("assistant", msg_erro)
                     return msg_erro 
                 self.adicionar_ao_historico("assistant", msg_erro)
@@ -417,8 +348,7 @@ Se o usuário disser "anote que...", "lembre que...", "registre que...":
 
             if eh_escrita:
                 log.info("Processando anotação...")
-                nota_limpa = self.extrair_texto_nota(pergunta, projetos_alvo[0]['name'])
-                res = self.salvar_memoria(projetos_alvo[0]['id'], nota_limpa)
+                res = self.salvar_memoria(projetos_alvo[0]['id'], pergunta, projetos_alvo[0]['name'], resumir=True)
                 self.adicionar_ao_historico("assistant", res)
                 return res
 
@@ -428,15 +358,10 @@ Se o usuário disser "anote que...", "lembre que...", "registre que...":
             
             contexto_projetos = ""
             if projetos_alvo:
-                dados_enriquecidos = []
                 lista_para_contexto = projetos_alvo[:10] if isinstance(projetos_alvo, list) else projetos_alvo
                 
                 log.debug(f"Enriquecendo {len(lista_para_contexto) if isinstance(lista_para_contexto, list) else 1} projeto(s)")
-                
-                for p in lista_para_contexto:
-                    p_completo = p.copy()
-                    p_completo['MEMORIA_GESTOR'] = self.memoria_local.get(str(p.get('id')), [])
-                    dados_enriquecidos.append(p_completo)
+                dados_enriquecidos = com_notas(lista_para_contexto, self.db)
 
                 contexto_projetos = f"\n--- DADOS DOS PROJETOS RELEVANTES ---\n{json.dumps(dados_enriquecidos, ensure_ascii=False)}\n"
                 log.debug(f"Contexto de projetos: {len(contexto_projetos)} chars")
@@ -12,7 +12,39 @@ class Config:
     ZOHO_REFRESH_TOKEN = os.getenv("ZOHO_REFRESH_TOKEN")
     ZOHO_PORTAL_ID = os.getenv("ZOHO_PORTAL_ID")
     ZOHO_MY_USER_ID = os.getenv("ZOHO_MY_USER_ID")
-    
+    ZOHO_TOKEN_URL = os.getenv("ZOHO_TOKEN_URL", "https://accounts.zoho.com/oauth/v2/token")
+    # Cache do access token compartilhado entre processos (brain, relatórios, sync)
+    ZOHO_TOKEN_CACHE = os.getenv("ZOHO_TOKEN_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".zoho_token.json"))
+    ZOHO_TOKEN_MARGEM = int(os.getenv("ZOHO_TOKEN_MARGEM", "300")) # Renova 5 min antes de expirar
+    ZOHO_SYNC_WORKERS = int(os.getenv("ZOHO_SYNC_WORKERS", "8")) # Downloads de tarefas em paralelo
+    ZOHO_PAGINAS_EM_VOO = int(os.getenv("ZOHO_PAGINAS_EM_VOO", "2")) # Páginas adiantadas por endpoint (só quando o task_count da listagem mostra que existem)
+    ZOHO_CHECKPOINT_VALIDADE_HORAS = float(os.getenv("ZOHO_CHECKPOINT_VALIDADE_HORAS", "12")) # --resume só dentro desse prazo
+    # Cota do Zoho Projects (documentado: 100 requests a cada 2 minutos por usuário)
+    ZOHO_REQ_POR_SEGUNDO = float(os.getenv("ZOHO_REQ_POR_SEGUNDO", str(100 / 120)))
+    ZOHO_REQ_RAJADA = int(os.getenv("ZOHO_REQ_RAJADA", "100"))
+    ZOHO_MAX_TENTATIVAS = int(os.getenv("ZOHO_MAX_TENTATIVAS", "6"))
+    ZOHO_BACKOFF_BASE = float(os.getenv("ZOHO_BACKOFF_BASE", "1"))   # segundos
+    ZOHO_BACKOFF_MAX = float(os.getenv("ZOHO_BACKOFF_MAX", "120"))   # segundos
+    ZOHO_HTTP_TIMEOUT_CONEXAO = float(os.getenv("ZOHO_HTTP_TIMEOUT_CONEXAO", "5"))   # segundos
+    ZOHO_HTTP_TIMEOUT_LEITURA = float(os.getenv("ZOHO_HTTP_TIMEOUT_LEITURA", "30"))  # segundos
+    # Snapshot dos projetos: binário compacto (.apx) ou JSON (se o caminho terminar em .json)
+    SNAPSHOT_PROJETOS = os.getenv("SNAPSHOT_PROJETOS", "db_projetos.apx")
+    SNAPSHOT_JSON = os.getenv("SNAPSHOT_JSON", "db_projetos.json") # Legado / exportação
+    SNAPSHOT_EXPORTAR_JSON = os.getenv("SNAPSHOT_EXPORTAR_JSON", "false").lower() in ("1", "true", "sim")
+    SQLITE_PROJETOS = os.getenv("SQLITE_PROJETOS", "db_projetos.sqlite") # Projetos/tarefas indexados (gerado na sync)
+    SNAPSHOT_OBSERVAR_SEGUNDOS = float(os.getenv("SNAPSHOT_OBSERVAR_SEGUNDOS", "5")) # Brain em execução confere se houve sync nova
+    TAREFAS_EM_MEMORIA = int(os.getenv("TAREFAS_EM_MEMORIA", "64")) # Projetos com a lista de tarefas mantida em memória (LRU)
+    FATOS_JANELA_DIAS = int(os.getenv("FATOS_JANELA_DIAS", "31")) # Dias sem sync em que os fatos ainda andam no calendário
+    NOMES_NOTA_ESCRITA = float(os.getenv("NOMES_NOTA_ESCRITA", "0.8")) # Nota mínima do nome aproximado para anotar sem perguntar o projeto
+    CONSULTAS_LOCAIS = os.getenv("CONSULTAS_LOCAIS", "true").lower() in ("1", "true", "sim") # Perguntas factuais respondidas sem a IA
+    CONSULTAS_MAX_PALAVRAS = int(os.getenv("CONSULTAS_MAX_PALAVRAS", "25")) # Acima disso não é pergunta falada: vai direto para a IA
+    CONSULTAS_REGISTRO = os.getenv("CONSULTAS_REGISTRO", "logs/consultas.log") # LOCAL/MODELO e tempo de cada pergunta, sem o texto (python query_engine.py relatorio)
+    CONSULTAS_REGISTRO_MAX_KB = int(os.getenv("CONSULTAS_REGISTRO_MAX_KB", "512")) # Acima disso o registro vira .1 e começa outro
+    MEMORIA_COMPACTAR_A_CADA = int(os.getenv("MEMORIA_COMPACTAR_A_CADA", "500")) # Notas gravadas entre compactações do banco de anotações
+    NOTAS_LOTE = int(os.getenv("NOTAS_LOTE", "50")) # Anotações gravadas por transação pela fila em segundo plano
+    NOTAS_ESPERA_SEGUNDOS = float(os.getenv("NOTAS_ESPERA_SEGUNDOS", "0.5")) # Janela para juntar anotações num lote
+    NOTAS_FECHAR_TIMEOUT = float(os.getenv("NOTAS_FECHAR_TIMEOUT", "30")) # Ao sair, tempo máximo gravando as pendentes (segundos)
+
     # Dados do Gemini
     GEMINI_KEY = os.getenv("GEMINI_API_KEY")
     GMAIL_USER = os.getenv("GMAIL_USER")
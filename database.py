@@ -1,23 +1,86 @@
 import sqlite3
 import os
+import re
+import threading
+import unicodedata
 from datetime import datetime
+from config import Config
+
+# Pragmas de cada conexão nova: WAL deixa leitores e o escritor trabalharem juntos,
+# e com WAL o synchronous NORMAL continua seguro contra corrupção (só o fsync por commit sai)
+PRAGMAS = (
+    "PRAGMA busy_timeout = 5000",   # Outra thread/processo escrevendo: espera em vez de "database is locked"
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+)
+
+# Bancos cujo esquema já foi conferido neste processo (caminho absoluto)
+_esquemas_prontos = set()
+_sem_busca_textual = set()  # ...e os que ficaram sem FTS5 (SQLite compilado sem o módulo)
+_esquema_trava = threading.Lock()
+
 
 class DatabaseManager:
     def __init__(self, db_name="apex_memoria.db"):
         # Garante o caminho absoluto para o banco ficar sempre na raiz do projeto
         diretorio_atual = os.path.dirname(os.path.abspath(__file__))
         self.db_path = os.path.join(diretorio_atual, db_name)
-        self._criar_tabelas()
+        # Uma conexão aberta por thread (o Streamlit roda cada execução do script em outra thread)
+        self._local = threading.local()
+        self._gravadas = 0  # Notas gravadas desde a última compactação
+        self._compactar_trava = threading.Lock()
+        self._garantir_esquema()
 
     def _conectar(self):
-        # Conecta sempre usando o caminho absoluto
-        return sqlite3.connect(self.db_path)
+        """Conexão desta thread, aberta uma vez e reaproveitada.
+        Se o arquivo do banco sumiu ou foi trocado, reabre (e recria o esquema)."""
+        try:
+            inode = os.stat(self.db_path).st_ino
+        except FileNotFoundError:
+            inode = None
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and inode is not None and inode == self._local.inode:
+            return conn
+
+        if conn is not None:
+            conn.close()
+        if inode is None:
+            with _esquema_trava:
+                _esquemas_prontos.discard(self.db_path)
+        self._garantir_esquema()
+        conn = sqlite3.connect(self.db_path)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        self._local.conn = conn
+        self._local.inode = os.stat(self.db_path).st_ino
+        return conn
+
+    def fechar(self):
+        """Fecha a conexão desta thread (a próxima chamada abre outra)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
 
-    def _criar_tabelas(self):
+    def _garantir_esquema(self, forcar=False):
+        """Cria tabelas/índices e liga o WAL uma única vez por processo"""
+        with _esquema_trava:
+            if self.db_path in _esquemas_prontos and not forcar:
+                return
+            conn = sqlite3.connect(self.db_path)
+            try:
+                conn.execute("PRAGMA journal_mode = WAL")  # Fica gravado no arquivo
+                self._criar_tabelas(conn)
+                conn.commit()
+            finally:
+                conn.close()
+            _esquemas_prontos.add(self.db_path)
+
+    def _criar_tabelas(self, conn):
         """Cria as tabelas caso não existam"""
-        conn = self._conectar()
         cursor = conn.cursor()
-        
+        existentes = {linha[0] for linha in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS memorias_projetos (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -27,42 +90,217 @@ class DatabaseManager:
                 data_registro TEXT NOT NULL
             )
         ''')
-        
-        conn.commit()
-        conn.close()
+
+        # Notas de um projeto, mais novas primeiro, sem varrer a tabela nem ordenar à parte
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_memorias_projeto
+            ON memorias_projetos (projeto_id, id)
+        ''')
+
+        # Busca textual (FTS5) nas notas, mantida em dia por triggers
+        try:
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS memorias_busca USING fts5(
+                    nota, projeto_nome,
+                    content='memorias_projetos', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+            ''')
+        except sqlite3.OperationalError:
+            _sem_busca_textual.add(self.db_path)  # Sem FTS5: buscar_nas_notas cai no LIKE
+            return
+        _sem_busca_textual.discard(self.db_path)
+        cursor.executescript('''
+            CREATE TRIGGER IF NOT EXISTS memorias_busca_inserir AFTER INSERT ON memorias_projetos BEGIN
+                INSERT INTO memorias_busca (rowid, nota, projeto_nome) VALUES (new.id, new.nota, new.projeto_nome);
+            END;
+            CREATE TRIGGER IF NOT EXISTS memorias_busca_apagar AFTER DELETE ON memorias_projetos BEGIN
+                INSERT INTO memorias_busca (memorias_busca, rowid, nota, projeto_nome)
+                VALUES ('delete', old.id, old.nota, old.projeto_nome);
+            END;
+            CREATE TRIGGER IF NOT EXISTS memorias_busca_atualizar AFTER UPDATE ON memorias_projetos BEGIN
+                INSERT INTO memorias_busca (memorias_busca, rowid, nota, projeto_nome)
+                VALUES ('delete', old.id, old.nota, old.projeto_nome);
+                INSERT INTO memorias_busca (rowid, nota, projeto_nome) VALUES (new.id, new.nota, new.projeto_nome);
+            END;
+        ''')
+        if not {"memorias_projetos", "memorias_busca"} <= existentes:
+            # Índice novo (banco de antes da busca) ou tabela recriada: indexa o que já existe
+            cursor.execute("INSERT INTO memorias_busca (memorias_busca) VALUES ('rebuild')")
+
+    def _executar(self, operacao):
+        """Roda operacao(conn). Se a tabela sumiu (deleção acidental, banco trocado com o
+        Streamlit aberto), recria o esquema e tenta de novo uma vez."""
+        try:
+            return operacao(self._conectar())
+        except sqlite3.OperationalError as e:
+            if "no such table" not in str(e):
+                raise
+            self._garantir_esquema(forcar=True)
+            return operacao(self._conectar())
 
     def salvar_nota(self, projeto_id, projeto_nome, nota):
-        # BLINDAGEM DUPLA: Garante que a tabela existe antes de inserir 
-        # (Protege contra deleção acidental e cache do Streamlit)
-        self._criar_tabelas()
-        
-        conn = self._conectar()
-        cursor = conn.cursor()
         data_atual = datetime.now().strftime("%d/%m/%Y %H:%M")
-        
-        cursor.execute('''
-            INSERT INTO memorias_projetos (projeto_id, projeto_nome, nota, data_registro)
-            VALUES (?, ?, ?, ?)
-        ''', (str(projeto_id), projeto_nome, nota, data_atual))
-        
-        conn.commit()
-        conn.close()
-        return True
-
-    def buscar_notas_projeto(self, projeto_id):
-        # BLINDAGEM DUPLA: Garante que a tabela existe antes de buscar
-        self._criar_tabelas()
-        
+        return self.salvar_notas([(projeto_id, projeto_nome, nota, data_atual)]) == 1
+
+    def salvar_notas(self, registros):
+        """Grava um lote [(projeto_id, projeto_nome, nota, data_registro)] numa transação só
+        (tudo ou nada). Retorna quantas notas gravou."""
+        registros = [(str(p), nome, nota, data) for p, nome, nota, data in registros]
+
+        def inserir(conn):
+            with conn:  # Commit no fim (rollback se der erro)
+                conn.executemany('''
+                    INSERT INTO memorias_projetos (projeto_id, projeto_nome, nota, data_registro)
+                    VALUES (?, ?, ?, ?)
+                ''', registros)
+            return len(registros)
+
+        gravadas = self._executar(inserir)
+        self._contar_gravadas(gravadas)
+        return gravadas
+
+    def importar_notas(self, registros):
+        """Grava de uma vez (uma transação) [(projeto_id, projeto_nome, nota, data_registro)],
+        na ordem dada. Pula a nota que o projeto já tem com o mesmo texto e data, para a
+        importação poder rodar de novo sem duplicar. Retorna quantas entraram."""
+        registros = [(str(p), nome, nota, data) for p, nome, nota, data in registros]
+
+        def importar(conn):
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")  # Ninguém grava entre a conferência e o INSERT
+                existentes = set(conn.execute(
+                    "SELECT projeto_id, nota, data_registro FROM memorias_projetos").fetchall())
+                novos = []
+                for registro in registros:
+                    chave = (registro[0], registro[2], registro[3])
+                    if chave not in existentes:
+                        existentes.add(chave)
+                        novos.append(registro)
+                conn.executemany('''
+                    INSERT INTO memorias_projetos (projeto_id, projeto_nome, nota, data_registro)
+                    VALUES (?, ?, ?, ?)
+                ''', novos)
+            return len(novos)
+
+        importados = self._executar(importar)
+        self._contar_gravadas(importados)
+        return importados
+
+    def total_notas(self):
+        return self._executar(lambda conn: conn.execute("SELECT COUNT(*) FROM memorias_projetos").fetchone()[0])
+
+    def _contar_gravadas(self, quantidade):
+        with self._compactar_trava:
+            self._gravadas += quantidade
+            if self._gravadas < Config.MEMORIA_COMPACTAR_A_CADA:
+                return
+            self._gravadas = 0
+        self.compactar()
+
+    def compactar(self):
+        """Compactação periódica: as notas só crescem no fim da tabela, então o que
+        acumula é o log do WAL e os segmentos do índice de busca. Junta os segmentos
+        num só e devolve o WAL para o arquivo principal, zerando o -wal."""
         conn = self._conectar()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT data_registro, nota FROM memorias_projetos
-            WHERE projeto_id = ?
-            ORDER BY id DESC
-        ''', (str(projeto_id),))
-        
-        resultados = cursor.fetchall()
-        conn.close()
-        
-        return [f"[{linha[0]}] {linha[1]}" for linha in resultados]
\ No newline at end of file
+        if self.db_path not in _sem_busca_textual:
+            with conn:
+                conn.execute("INSERT INTO memorias_busca (memorias_busca) VALUES ('optimize')")
+        # Com outra conexão lendo no meio, o checkpoint faz o que dá e o resto fica para a próxima
+        return conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+
+    def buscar_notas_projeto(self, projeto_id, limite=None):
+        return self.buscar_notas_projetos([projeto_id], limite).get(str(projeto_id), [])
+
+    def buscar_notas_projetos(self, projeto_ids=None, limite=None):
+        """{projeto_id: ["[data] nota", ...]} de vários projetos numa consulta só, notas mais
+        novas primeiro. projeto_ids None = todos os projetos com nota; `limite` = notas por
+        projeto. Projeto sem nota fica fora do dict."""
+        filtro, parametros = "", []
+        if projeto_ids is not None:
+            parametros = list(dict.fromkeys(str(p) for p in projeto_ids))
+            if not parametros:
+                return {}
+            filtro = f"WHERE projeto_id IN ({', '.join('?' * len(parametros))})"
+        consulta = f"SELECT projeto_id, data_registro, nota, id FROM memorias_projetos {filtro}"
+        if limite is not None:
+            # Numera as notas de cada projeto na ordem do índice e corta em `limite`
+            consulta = f'''
+                SELECT projeto_id, data_registro, nota, id FROM (
+                    SELECT projeto_id, data_registro, nota, id,
+                           ROW_NUMBER() OVER (PARTITION BY projeto_id ORDER BY id DESC) AS ordem
+                    FROM memorias_projetos {filtro}
+                ) WHERE ordem <= ?
+            '''
+            parametros.append(int(limite))
+
+        def buscar(conn):
+            return conn.execute(consulta + " ORDER BY projeto_id, id DESC", parametros).fetchall()
+
+        notas = {}
+        for projeto_id, data_registro, nota, _ in self._executar(buscar):
+            notas.setdefault(projeto_id, []).append(f"[{data_registro}] {nota}")
+        return notas
+
+    def buscar_nas_notas(self, texto, limite=10):
+        """Notas de todos os projetos que falam de `texto`, mais relevantes primeiro:
+        [{"projeto_id", "projeto", "data", "trecho"}]. Acento e maiúscula não importam;
+        cada palavra também casa como prefixo ("servid" acha "servidor"). Notas com todas
+        as palavras vêm antes; só sem nenhuma assim, valem as que têm alguma."""
+        termos = termos_busca(texto)
+        if not termos:
+            return []
+
+        if self.db_path in _sem_busca_textual:
+            parametros = [f"%{t}%" for t in termos for _ in range(2)] + [int(limite)]
+
+            def buscar(conn):
+                # Sem ranking: as mais novas, primeiro com todas as palavras e depois com alguma
+                for juncao in (" AND ", " OR ")[:len(termos)]:
+                    filtro = juncao.join("(nota LIKE ? OR projeto_nome LIKE ?)" for _ in termos)
+                    linhas = conn.execute(f'''
+                        SELECT projeto_id, projeto_nome, data_registro, nota FROM memorias_projetos
+                        WHERE {filtro} ORDER BY id DESC LIMIT ?
+                    ''', parametros).fetchall()
+                    if linhas:
+                        return linhas
+                return []
+        else:
+            def buscar(conn):
+                # Primeiro as notas com todas as palavras; só se não houver, qualquer uma delas
+                # (o OR casa muito mais notas e todas passam pelo ranking)
+                for juncao in (" AND ", " OR ")[:len(termos)]:
+                    # bm25: nota pesa mais que o nome do projeto; empate fica com a nota mais nova
+                    linhas = conn.execute('''
+                        SELECT m.projeto_id, m.projeto_nome, m.data_registro,
+                               snippet(memorias_busca, 0, '', '', '…', 16)
+                        FROM memorias_busca
+                        JOIN memorias_projetos m ON m.id = memorias_busca.rowid
+                        WHERE memorias_busca MATCH ?
+                        ORDER BY bm25(memorias_busca, 1.0, 0.5), m.id DESC
+                        LIMIT ?
+                    ''', (juncao.join(f'"{t}"*' for t in termos), int(limite))).fetchall()
+                    if linhas:
+                        return linhas
+                return []
+
+        return [{"projeto_id": projeto_id, "projeto": projeto, "data": data, "trecho": trecho}
+                for projeto_id, projeto, data, trecho in self._executar(buscar)]
+
+
+# Palavras da própria pergunta ("onde anotei sobre...") que não ajudam a achar a nota
+PALAVRAS_IGNORADAS_BUSCA = {
+    "onde", "anotei", "anotou", "anotamos", "anotado", "anotada", "anotacao", "anotacoes", "nota", "notas",
+    "sobre", "quando", "qual", "quais", "falei", "falando", "escrevi", "registrei", "busque", "buscar",
+    "procure", "procurar", "encontre", "ache", "aquela", "aquele", "alguma", "algum", "tinha", "minhas",
+    "minha", "isso", "esse", "essa", "para", "pelo", "pela", "senhor", "apex", "projeto", "projetos",
+    "que", "com", "tem", "uma", "dos", "das", "nos", "nas", "foi", "sem",
+}
+
+
+def termos_busca(texto):
+    """Palavras de `texto` que valem para a busca (sem acento, sem as da pergunta)"""
+    texto = unicodedata.normalize("NFKD", str(texto or "").lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    palavras = re.findall(r"\w+", texto)
+    return list(dict.fromkeys(p for p in palavras if len(p) > 2 and p not in PALAVRAS_IGNORADAS_BUSCA))
@@ -1,32 +1,24 @@
-import requests
-from config import Config
+from zoho_http import get_http
+from zoho_token import get_token_cache
 
 def descobrir_portal():
     print("🔍 Investigando Portais disponíveis...")
     
-    # 1. Recuperar Token (código simplificado do zoho_sync)
-    url_token = "https://accounts.zoho.com/oauth/v2/token"
-    params = {
-        "refresh_token": Config.ZOHO_REFRESH_TOKEN,
-        "client_id": Config.ZOHO_CLIENT_ID,
-        "client_secret": Config.ZOHO_CLIENT_SECRET,
-        "grant_type": "refresh_token"
-    }
-    
+    # 1. Recuperar Token (cache compartilhado com o zoho_sync)
+    http = get_http()
     try:
-        res_token = requests.post(url_token, data=params)
-        if res_token.status_code != 200:
-            print("❌ Erro de Token:", res_token.text)
+        access_token = get_token_cache().obter()
+        if not access_token:
+            print("❌ Erro de Token: não foi possível renovar o access token")
             return
         
-        access_token = res_token.json().get("access_token")
         headers = {"Authorization": f"Bearer {access_token}"}
         
         # 2. Perguntar ao Zoho quais portais existem
         # Este endpoint não precisa de ID, ele LISTA os IDs
         url_portals = "https://projectsapi.zoho.com/restapi/portals/"
         
-        res = requests.get(url_portals, headers=headers)
+        res = http.get(url_portals, headers=headers)
         
         if res.status_code == 200:
             portals = res.json().get("portals", [])
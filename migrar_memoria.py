@@ -0,0 +1,75 @@
+"""
+Migração das anotações para um backend só (apex_memoria.db)
+Os brains antigos guardavam as notas em db_memoria.json e regravavam o
+arquivo inteiro (indent=4) a cada nota: quanto mais notas, mais cara a
+gravação, e um crash no meio do json.dump perdia tudo. O Brain V2 já usava
+o SQLite (database.py), onde cada nota é uma linha nova no fim da tabela
+(custo constante, gravada pelo WAL). Agora todos usam o SQLite; este script
+importa o JSON antigo para lá uma vez e renomeia o arquivo para
+db_memoria.json.migrado (fica de backup).
+
+Os brains chamam migrar() ao iniciar, então normalmente nem é preciso rodar à mão.
+
+Uso: python migrar_memoria.py [db_memoria.json]
+"""
+
+import json
+import os
+import re
+import sys
+from database import DatabaseManager
+from repository import get_repositorio
+
+ARQUIVO_JSON_LEGADO = "db_memoria.json"
+
+# "[18/10] Cliente pediu..." (o formato que salvar_memoria gravava)
+_NOTA_LEGADA = re.compile(r"^\[([^\]]*)\]\s*(.*)$", re.DOTALL)
+
+
+def _nome_projeto(projeto_id, nomes):
+    if projeto_id not in nomes:
+        try:
+            projeto = get_repositorio().por_id(projeto_id, com_tarefas=False)
+        except ValueError:
+            projeto = None
+        nomes[projeto_id] = projeto.get("name") if projeto else f"Projeto {projeto_id}"
+    return nomes[projeto_id]
+
+
+def ler_json_legado(caminho=ARQUIVO_JSON_LEGADO):
+    """[(projeto_id, projeto_nome, nota, data_registro)] do db_memoria.json, na ordem gravada"""
+    with open(caminho, "r", encoding="utf-8") as f:
+        memoria = json.load(f)
+    registros, nomes = [], {}
+    for projeto_id, notas in memoria.items():
+        for entrada in notas or ():
+            achado = _NOTA_LEGADA.match(str(entrada))
+            data, nota = achado.groups() if achado else ("sem data", str(entrada))
+            registros.append((str(projeto_id), _nome_projeto(str(projeto_id), nomes), nota, data))
+    return registros
+
+
+def migrar(caminho_json=ARQUIVO_JSON_LEGADO, db=None):
+    """Importa o JSON antigo para o banco (se ainda existir). Retorna quantas notas entraram."""
+    if not os.path.exists(caminho_json):
+        return 0
+    try:
+        registros = ler_json_legado(caminho_json)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Não consegui ler '{caminho_json}' para migrar as anotações: {e}")
+        return 0
+    importados = (db or DatabaseManager()).importar_notas(registros)
+    os.replace(caminho_json, caminho_json + ".migrado")  # Só depois do commit: o JSON nunca some antes
+    print(f"📦 {importados} anotações migradas de '{caminho_json}' para o banco de memórias")
+    return importados
+
+
+if __name__ == "__main__":
+    caminho = sys.argv[1] if len(sys.argv) > 1 else ARQUIVO_JSON_LEGADO
+    db = DatabaseManager()
+    antes = db.total_notas()
+    if not os.path.exists(caminho):
+        print(f"📭 '{caminho}' não existe (já migrado?). O banco tem {antes} anotações.")
+    else:
+        migrar(caminho, db)
+        print(f"✅ O banco tinha {antes} anotações e agora tem {db.total_notas()} ({db.db_path})")
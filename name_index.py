@@ -0,0 +1,264 @@
+"""
+Índice invertido dos nomes de projeto (roteamento do brain)
+Em vez de testar cada termo da pergunta contra o nome de cada projeto,
+o índice já sabe quais projetos têm cada palavra, cada trigrama e cada
+código numérico do nome. Um termo vira uma ou poucas consultas num dict.
+
+Os nomes são normalizados (minúsculas e sem acento), então "sao paulo"
+acha "São Paulo". A busca continua sendo por "contém": os trigramas só
+reduzem os candidatos, e a confirmação final é `termo in nome`.
+
+Para nomes mal ouvidos pelo reconhecimento de voz ("rivelari", "santa
+caza") há a busca aproximada: cada palavra vira uma chave fonética
+simplificada e a semelhança é a proporção de trigramas em comum (Dice).
+
+Quem monta e guarda o índice é o ProjectRepository (indice_nomes()),
+que o refaz quando o snapshot muda.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+_NAO_PALAVRA = re.compile(r"[\W_]+")
+_NUMEROS = re.compile(r"\d+")
+
+# Trocas que o reconhecimento de voz faz o tempo todo (sobre o texto já sem acento)
+_FONETICA = [
+    (re.compile(r"(.)\1+"), r"\1"),       # letras dobradas: "rivellare" -> "rivelare"
+    (re.compile(r"ph"), "f"),
+    (re.compile(r"sch|ch|sh"), "x"),
+    (re.compile(r"(?<=[aeiou])x(?=[aeiou])"), "s"),  # "exame" ~ "ezame"
+    (re.compile(r"lh"), "li"),
+    (re.compile(r"nh"), "ni"),
+    (re.compile(r"h"), ""),                 # h mudo: "ospital"
+    (re.compile(r"qu|k|c(?=[aou]|$|[^aeiou])"), "c"),
+    (re.compile(r"c(?=[ei])|z"), "s"),       # "senter", "caza"
+    (re.compile(r"g(?=[ei])"), "j"),         # "imagem" ~ "imajem"
+    (re.compile(r"gu(?=[ei])"), "g"),
+    (re.compile(r"y"), "i"),
+    (re.compile(r"w"), "v"),
+    (re.compile(r"m(?=[^aeiou]|$)"), "n"),  # "centro"/"cemtro", "unimed"/"unined"
+    (re.compile(r"e$"), "i"),               # final átono: "rivelare" ~ "rivelari"
+    (re.compile(r"o$"), "u"),
+]
+
+# Palavras da pergunta que não são nome de ninguém (só atrapalham a busca aproximada)
+_PALAVRAS_VAZIAS = {
+    "como", "esta", "estao", "qual", "quais", "onde", "quando", "sobre", "para", "pelo", "pela",
+    "isso", "esse", "essa", "este", "aquele", "aquela", "anote", "lembre", "registre", "projeto",
+    "projetos", "status", "fase", "situacao", "andamento", "cliente", "tudo", "ainda", "agora",
+}
+
+
+def normalizar(texto):
+    """Minúsculas e sem acentos: 'Reforma São João' -> 'reforma sao joao'"""
+    texto = unicodedata.normalize("NFKD", str(texto or "").lower())
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+
+def trigramas(texto):
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+@lru_cache(maxsize=65536)  # Os nomes repetem muito as mesmas palavras ("Hospital", "Clínica")
+def chave_fonetica(palavra):
+    """Forma aproximada de como a palavra soa: 'Cardio Center' e 'cardio senter' empatam"""
+    palavra = normalizar(str(palavra).lower().replace("ç", "s"))  # Sem acento o ç viraria "c"
+    for regra, troca in _FONETICA:
+        palavra = regra.sub(troca, palavra)
+    return palavra
+
+
+def _trigramas_palavra(chave):
+    # Espaços nas pontas: o começo da palavra pesa mais, e palavras curtas ainda têm trigramas
+    return trigramas(f"  {chave} ")
+
+
+class IndiceNomes:
+    """Índice dos nomes de uma versão do snapshot. Os resultados são ids
+    (str) na ordem do snapshot, como a busca linear devolvia."""
+
+    def __init__(self, projetos):
+        self._nomes = {}      # id -> nome normalizado
+        self._ordem = {}      # id -> posição no snapshot
+        self._palavras = {}   # palavra -> [ids]
+        self._codigos = {}    # número inteiro do nome -> [ids]
+        self._trigramas = {}  # trigrama -> set(ids)
+        self._foneticas = {}  # chave fonética -> [ids] (busca aproximada)
+        self._trigramas_foneticos = {}  # trigrama -> set(chaves fonéticas)
+        self._chaves_juntas = set()  # chaves que só existem como par de palavras juntas
+        inteiras = set()
+
+        for ordem, projeto in enumerate(projetos):
+            proj_id = str(projeto.get("id"))
+            if proj_id in self._ordem:
+                continue
+            nome = normalizar(projeto.get("name", ""))
+            self._nomes[proj_id] = nome
+            self._ordem[proj_id] = ordem
+            for palavra in set(_NAO_PALAVRA.split(nome)) - {""}:
+                self._palavras.setdefault(palavra, []).append(proj_id)
+            aproximaveis = self._palavras_aproximaveis(nome)
+            # Pares de palavras juntos também: a voz escreve "cardiocenter" ou "poli clinica"
+            juntas = [a + b for a, b in zip(aproximaveis, aproximaveis[1:])]
+            for chave in {chave_fonetica(p) for p in aproximaveis + juntas}:
+                self._foneticas.setdefault(chave, []).append(proj_id)
+            self._chaves_juntas.update(chave_fonetica(p) for p in juntas)
+            inteiras.update(chave_fonetica(p) for p in aproximaveis)
+            for codigo in set(_NUMEROS.findall(nome)):
+                self._codigos.setdefault(codigo, []).append(proj_id)
+            for trigrama in trigramas(nome):
+                self._trigramas.setdefault(trigrama, set()).add(proj_id)
+
+        # Uma chave que também é palavra inteira de algum nome não é "só junta"
+        self._chaves_juntas -= inteiras
+        for chave in self._foneticas:
+            for trigrama in _trigramas_palavra(chave):
+                self._trigramas_foneticos.setdefault(trigrama, set()).add(chave)
+
+    def __len__(self):
+        return len(self._nomes)
+
+    @staticmethod
+    def _palavras_aproximaveis(texto):
+        """Palavras que entram na busca aproximada (códigos e siglas curtas ficam de fora)"""
+        return [p for p in _NAO_PALAVRA.split(normalizar(texto)) if len(p) >= 3 and not p.isdigit()]
+
+    def _contem(self, termo):
+        """Ids cujo nome contém o termo (já normalizado)"""
+        if len(termo) < 3:
+            # Curto demais para trigrama: varre (raro, o roteador descarta termos curtos)
+            return {proj_id for proj_id, nome in self._nomes.items() if termo in nome}
+        if len(termo) == 3:
+            return set(self._trigramas.get(termo, ()))
+
+        candidatos = None
+        # Começa pelos trigramas mais raros: a interseção encolhe mais rápido
+        for trigrama in sorted(trigramas(termo), key=lambda t: len(self._trigramas.get(t, ()))):
+            ids = self._trigramas.get(trigrama)
+            if not ids:
+                return set()
+            candidatos = set(ids) if candidatos is None else candidatos & ids
+            if not candidatos:
+                return set()
+        # Ter todos os trigramas não garante a sequência: confirma no nome
+        return {proj_id for proj_id in candidatos if termo in self._nomes[proj_id]}
+
+    def buscar(self, termos, limite=None):
+        """Ids dos projetos cujo nome contém algum dos termos (um termo ou uma lista)"""
+        if isinstance(termos, str):
+            termos = [termos]
+        achados = set()
+        for termo in termos:
+            termo = normalizar(termo).strip()
+            if termo:
+                achados |= self._contem(termo)
+        ids = sorted(achados, key=self._ordem.__getitem__)
+        return ids[:limite] if limite else ids
+
+    def por_codigo(self, codigo):
+        """Ids do projeto pelo número no nome (ex.: '1234' de '1234 - Obra X').
+        O número exato tem prioridade; se não existir, vale quem contém os dígitos."""
+        codigo = str(codigo).strip()
+        if codigo in self._codigos:
+            return list(self._codigos[codigo])
+        return self.buscar(codigo)
+
+    def por_palavra(self, palavra):
+        """Ids cujo nome tem a palavra inteira (sem acento/maiúscula)"""
+        return list(self._palavras.get(normalizar(palavra).strip(), ()))
+
+    def _semelhantes(self, palavra, corte):
+        """{chave fonética do índice: nota} das palavras parecidas com `palavra`"""
+        chave = chave_fonetica(palavra)
+        if chave in self._foneticas:
+            return {chave: 1.0}
+        alvo = _trigramas_palavra(chave)
+        em_comum = {}
+        for trigrama in alvo:
+            for candidata in self._trigramas_foneticos.get(trigrama, ()):
+                em_comum[candidata] = em_comum.get(candidata, 0) + 1
+        notas = {}
+        for candidata, comuns in em_comum.items():
+            nota = 2 * comuns / (len(alvo) + len(candidata) + 2)  # Dice; a chave tem len+2 trigramas
+            if nota >= corte:
+                notas[candidata] = nota
+        return notas
+
+    def _melhores(self, notas, melhores=None):
+        """{id: melhor nota} a partir de {chave fonética: nota}"""
+        melhores = {} if melhores is None else melhores
+        for chave, nota in notas.items():
+            for proj_id in self._foneticas[chave]:
+                if nota > melhores.get(proj_id, 0):
+                    melhores[proj_id] = nota
+        return melhores
+
+    def parecidos(self, termos, limite=5, corte=0.5, entre=None):
+        """[(id, nota de 0 a 1)] dos projetos com nome parecido, melhores primeiro.
+        Cada palavra da pergunta vale a nota da palavra mais parecida do nome;
+        a nota do projeto é a média sobre as palavras que acharam algum parecido
+        (palavras soltas da frase que não lembram nenhum nome não puxam a nota para baixo).
+        `entre`: só esses ids entram no ranking."""
+        if isinstance(termos, str):
+            termos = [termos]
+        palavras = list(dict.fromkeys(p for termo in termos for p in self._palavras_aproximaveis(termo)
+                                      if p not in _PALAVRAS_VAZIAS))
+
+        semelhantes = {palavra: self._semelhantes(palavra, corte) for palavra in palavras}
+        por_palavra = {palavra: self._melhores(notas) for palavra, notas in semelhantes.items()}
+        # Palavra quebrada em duas ("neuro center" para "Neurocenter"): o par junto vale para
+        # as duas, mas só contra palavras inteiras do nome e só se ganhar das palavras sozinhas
+        for a, b in zip(palavras, palavras[1:]):
+            notas = {chave: nota for chave, nota in self._semelhantes(a + b, corte).items()
+                     if chave not in self._chaves_juntas
+                     and nota > max(semelhantes[a].get(chave, 0), semelhantes[b].get(chave, 0))}
+            for palavra in (a, b):
+                self._melhores(notas, por_palavra[palavra])
+
+        soma = {}  # id -> soma das melhores notas por palavra
+        usadas = 0
+        for melhores in por_palavra.values():
+            if melhores:
+                usadas += 1
+                for proj_id, nota in melhores.items():
+                    soma[proj_id] = soma.get(proj_id, 0) + nota
+
+        if not usadas:
+            return []
+        if entre is not None:
+            soma = {proj_id: total for proj_id, total in soma.items() if proj_id in entre}
+        ranking = sorted(soma.items(), key=lambda item: (-item[1], self._ordem[item[0]]))
+        return [(proj_id, round(total / usadas, 3)) for proj_id, total in ranking[:limite]]
+
+    def palpite(self, termos, limite=5, folga=0.15, minimo=0.0, entre=None):
+        """Ids pelo nome aproximado: só o primeiro quando ele tem nota `minimo` e se destaca
+        dos demais por `folga`, senão os candidatos em ordem de nota (para o "Qual deles?").
+        Um candidato só, abaixo do `minimo`, não vira resposta: devolve [].
+        `entre`: só esses ids concorrem."""
+        candidatos = self.parecidos(termos, limite=limite, entre=entre)
+        if not candidatos:
+            return []
+        if candidatos[0][1] < minimo:
+            return [proj_id for proj_id, _ in candidatos] if len(candidatos) > 1 else []
+        if len(candidatos) == 1 or candidatos[0][1] - candidatos[1][1] >= folga:
+            return [candidatos[0][0]]
+        return [proj_id for proj_id, _ in candidatos]
+
+    def resolver(self, termos, limite=5, minimo=0.0):
+        """O que o roteador usa: a busca exata; quando ela não decide (nada ou vários
+        projetos), a busca aproximada desempata ou oferece os candidatos mais parecidos.
+        `minimo` é a nota para a aproximada decidir sozinha (ex.: Config.NOMES_NOTA_ESCRITA
+        ao gravar nota: melhor perguntar do que anotar no projeto errado)"""
+        if isinstance(termos, str):
+            termos = [termos]
+        # Sem acento, "está" casaria com "Estar": palavras vazias ficam fora da busca exata também
+        exatos = self.buscar([t for t in termos if normalizar(t).strip() not in _PALAVRAS_VAZIAS])
+        if len(exatos) == 1:
+            return exatos
+        if not exatos:
+            return self.palpite(termos, limite=limite, minimo=minimo)
+        # Vários exatos: a aproximada só desempata entre eles, nunca troca por um de fora
+        palpite = self.palpite(termos, limite=limite, minimo=minimo, entre=set(exatos))
+        return palpite if len(palpite) == 1 else exatos
@@ -0,0 +1,151 @@
+"""
+Fila de anotações gravadas em segundo plano (write-behind)
+Ditar uma nota travava a resposta falada: resumo pela IA, pasta do projeto e
+gravação no banco, tudo antes do "✅ Anotado". Agora o brain só valida a nota
+(projeto identificado, texto não vazio), põe na fila e responde na hora.
+Uma thread da fila faz o resto:
+    1. preparar(texto) -> texto final (ex.: o resumo pela IA; se falhar, fica a frase ditada)
+    2. grava em lotes de até Config.NOTAS_LOTE numa transação só (DatabaseManager.salvar_notas)
+Se a gravação falha, o lote volta para a fila e é tentado de novo; ao fechar o
+processo (atexit) a fila é esvaziada antes de sair.
+
+    fila = get_fila_notas()
+    fila.anotar(proj_id, proj_nome, frase, preparar=resumir)  # Volta na hora
+    fila.pendentes()                                          # Ainda não gravadas
+    fila.nao_gravadas()                                       # Quais são (para ler sem esperar)
+    fila.esvaziar()                                           # Espera gravar tudo
+"""
+
+import atexit
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from config import Config
+from database import DatabaseManager
+
+
+class FilaNotas:
+    """Recebe notas na hora e grava em lotes numa thread própria"""
+
+    def __init__(self, db=None, lote=None, espera=None):
+        self.db = db or DatabaseManager()
+        self.lote = lote or Config.NOTAS_LOTE
+        self.espera = Config.NOTAS_ESPERA_SEGUNDOS if espera is None else espera
+        self._fila = deque()
+        self._lote_atual = []  # Tiradas da fila e ainda não confirmadas pelo banco
+        self._cond = threading.Condition()
+        self._fechada = False
+        self._pressa = False  # Alguém está esperando em esvaziar(): grava sem juntar lote
+        self.gravadas = 0
+        self.lotes_gravados = 0  # Sobe a cada lote confirmado pelo banco
+        self.falhas = 0
+        self._gravador = threading.Thread(target=self._gravar, name="fila-notas", daemon=True)
+        self._gravador.start()
+
+    def anotar(self, projeto_id, projeto_nome, texto, preparar=None):
+        """Enfileira a nota e volta na hora. `preparar(texto)` roda na thread da fila
+        antes de gravar e devolve o texto final. A data é a de agora, não a da gravação."""
+        registro = (str(projeto_id), projeto_nome, texto, datetime.now().strftime("%d/%m/%Y %H:%M"), preparar)
+        with self._cond:
+            if self._fechada:
+                raise RuntimeError("Fila de anotações já foi fechada")
+            self._fila.append(registro)
+            self._cond.notify_all()
+
+    def pendentes(self):
+        """Notas recebidas que ainda não estão no banco"""
+        with self._cond:
+            return len(self._fila) + len(self._lote_atual)
+
+    def nao_gravadas(self):
+        """(marca, [(projeto_id, projeto_nome, texto, data)]) das notas que ainda não estão
+        no banco, mais novas primeiro, sem esperar a gravação. O texto é o ditado (o resumo
+        pela IA só sai na gravação). `marca` é o lotes_gravados do momento: quem junta isto
+        com uma leitura do banco confere se um lote foi gravado no meio."""
+        with self._cond:
+            registros = self._lote_atual + list(self._fila)
+            marca = self.lotes_gravados
+        return marca, [registro[:4] for registro in reversed(registros)]
+
+    def esvaziar(self, timeout=None):
+        """Espera tudo o que já foi enfileirado chegar ao banco. False se o tempo acabou."""
+        limite = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._pressa = True
+            self._cond.notify_all()
+            while self._fila or self._lote_atual:
+                restante = None if limite is None else limite - time.monotonic()
+                if restante is not None and restante <= 0:
+                    return False
+                self._cond.wait(restante)
+        return True
+
+    def fechar(self, timeout=None):
+        """Grava o que falta e para a thread (chamado sozinho ao sair do processo)"""
+        with self._cond:
+            self._fechada = True
+            self._cond.notify_all()
+        self._gravador.join(timeout)
+        return self.pendentes() == 0
+
+    def _proximo_lote(self):
+        """Espera a primeira nota e, por até `espera` segundos, junta mais até encher o lote"""
+        with self._cond:
+            while not self._fila and not self._fechada:
+                self._cond.wait()
+            prazo = time.monotonic() + self.espera
+            while len(self._fila) < self.lote and not (self._fechada or self._pressa):
+                restante = prazo - time.monotonic()
+                if restante <= 0 or not self._cond.wait(restante):
+                    break
+            lote = [self._fila.popleft() for _ in range(min(self.lote, len(self._fila)))]
+            self._lote_atual = lote
+            self._pressa = self._pressa and bool(self._fila)
+            return lote
+
+    def _gravar(self):
+        while True:
+            lote = self._proximo_lote()
+            if not lote:
+                return  # Fechada e sem nada na fila
+            prontos = []
+            for projeto_id, projeto_nome, texto, data, preparar in lote:
+                if preparar is not None:
+                    try:
+                        texto = preparar(texto) or texto
+                    except Exception as e:
+                        print(f"⚠️ [Fila de notas] Preparo falhou, gravando a frase ditada: {e}")
+                prontos.append((projeto_id, projeto_nome, texto, data, None))
+            try:
+                self.db.salvar_notas([r[:4] for r in prontos])
+            except Exception as e:
+                # Banco ocupado/ilegível: o lote (já preparado) volta para o começo da fila
+                print(f"⚠️ [Fila de notas] Gravação falhou, tentando de novo: {e}")
+                with self._cond:
+                    self.falhas += 1
+                    self._fila.extendleft(reversed(prontos))
+                    self._lote_atual = []
+                    self._cond.notify_all()
+                time.sleep(min(5.0, 0.2 * self.falhas))
+                continue
+            with self._cond:
+                self.gravadas += len(prontos)
+                self.lotes_gravados += 1
+                self._lote_atual = []
+                self._cond.notify_all()
+
+
+# Singleton global: os brains e o dashboard dividem a mesma fila (e a mesma thread)
+_fila_instance = None
+_fila_trava = threading.Lock()
+
+def get_fila_notas():
+    """Retorna a fila de anotações do processo"""
+    global _fila_instance
+    with _fila_trava:
+        if _fila_instance is None:
+            _fila_instance = FilaNotas()
+            # Nada ditado fica para trás ao sair (com limite, se o banco não responder)
+            atexit.register(_fila_instance.fechar, Config.NOTAS_FECHAR_TIMEOUT)
+    return _fila_instance
@@ -0,0 +1,150 @@
+"""
+Análises de atraso e estagnação em colunas NumPy
+O relatório semanal e o dashboard fazem sempre as mesmas perguntas sobre
+todas as tarefas: quais estão vencidas, há quantos dias, quais projetos
+estão mais atrasados, quem parou de andar. Em vez de um laço em Python por
+tarefa, as tarefas da base SQLite (project_db) viram colunas NumPy uma vez
+por sync, com as datas já convertidas, e cada pergunta vira poucas
+operações vetorizadas sobre as colunas inteiras.
+
+    colunas = get_colunas_tarefas()
+    vencidas = colunas.vencidas(hoje)              # índices, mais atrasadas primeiro
+    colunas.dias_atraso(vencidas, hoje)            # dias de atraso de cada uma
+    colunas.resumo_por_projeto(vencidas, hoje)     # um resumo por projeto, mais atrasado primeiro
+    comparar_percentuais(projetos, historico)      # (estagnados, evoluiram), como o tracker devolve
+"""
+
+import gc
+import os
+import threading
+from datetime import date
+import numpy as np
+from project_db import get_project_db
+
+
+def _dia(valor=None):
+    """date, datetime ou 'YYYY-MM-DD' (None = hoje) em numpy.datetime64 de dias"""
+    return np.datetime64(date.today() if valor is None else valor, "D")
+
+
+class ColunasTarefas:
+    """Todas as tarefas da base em colunas (uma posição por tarefa):
+        projeto   int32          posição do projeto em projeto_ids/projeto_nomes
+        nome      object         nome da tarefa
+        aberta    bool
+        fim       datetime64[D]  data de fim (NaT quando não há ou não deu para ler)
+        tasklist  object         fase da tarefa
+    Os projetos também: projeto_ids, projeto_nomes e percent (int, 0 quando vazio)."""
+
+    def __init__(self, projetos, tarefas):
+        """`projetos` e `tarefas` no formato de ProjectDB.tarefas_em_colunas()"""
+        # Transpor centenas de milhares de tuplas dispara o coletor de lixo o tempo todo
+        # (e não há ciclo nenhum para achar): pausado só durante a montagem
+        coletor_ligado = gc.isenabled()
+        gc.disable()
+        try:
+            ids, nomes, percent = list(zip(*projetos)) or [()] * 3
+            projeto_id, nome, aberta, fim, tasklist = list(zip(*tarefas)) or [()] * 5
+        finally:
+            if coletor_ligado:
+                gc.enable()
+
+        self.projeto_ids = np.array(ids, dtype=object)
+        self.projeto_nomes = np.array(nomes, dtype=object)
+        self.percent = np.array([p or 0 for p in percent], dtype=np.int64)
+
+        posicao = {proj_id: i for i, proj_id in enumerate(ids)}
+        self.projeto = np.fromiter(map(posicao.__getitem__, projeto_id), dtype=np.int32, count=len(projeto_id))
+        self.nome = np.array(nome, dtype=object)
+        self.aberta = np.array(aberta, dtype=bool)
+        self.fim = np.array(fim, dtype="datetime64[D]")  # Já vem YYYY-MM-DD da sync; NULL vira NaT
+        self.tasklist = np.array(tasklist, dtype=object)
+
+    def __len__(self):
+        return len(self.aberta)
+
+    def vencidas(self, referencia=None):
+        """Índices das tarefas abertas vencidas em `referencia` (None = hoje): fim antes dessa
+        data, como em project_facts (a que vence no dia ainda não está vencida),
+        das mais atrasadas para as mais recentes"""
+        indices = np.flatnonzero(self.aberta & (self.fim < _dia(referencia)))  # NaT nunca é <
+        return indices[np.argsort(self.fim[indices], kind="stable")]
+
+    def dias_atraso(self, indices, referencia=None):
+        """Dias entre o fim de cada tarefa e a referência (negativo = ainda não venceu)"""
+        return (_dia(referencia) - self.fim[indices]).astype(np.int64)
+
+    def resumo_por_projeto(self, indices, referencia=None):
+        """Um resumo por projeto com tarefa em `indices` (ex.: vencidas()), do mais
+        atrasado para o menos:
+            {"projeto_id", "projeto", "vencidas", "dias_atraso", "lista_bloqueando", "tarefas"}
+        dias_atraso e lista_bloqueando vêm da tarefa mais antiga do projeto;
+        "tarefas" são os índices das tarefas dele, na ordem de `indices`."""
+        indices = np.asarray(indices, dtype=np.int64)
+        if not len(indices):
+            return []
+        projetos = self.projeto[indices]
+        # Agrupa sem perder a ordem de `indices`: o primeiro de cada grupo é o mais antigo
+        agrupados = np.argsort(projetos, kind="stable")
+        unicos, inicio, quantidade = np.unique(projetos[agrupados], return_index=True, return_counts=True)
+        mais_antiga = indices[agrupados[inicio]]
+        atraso = self.dias_atraso(mais_antiga, referencia)
+        agrupados = indices[agrupados]
+
+        ordem = np.lexsort((unicos, -atraso))  # Mais atrasado primeiro; empate na ordem do snapshot
+        projetos, mais_antiga = unicos[ordem], mais_antiga[ordem]
+        inicio, quantidade = inicio[ordem], quantidade[ordem]
+        colunas = zip(self.projeto_ids[projetos].tolist(), self.projeto_nomes[projetos].tolist(),
+                      quantidade.tolist(), atraso[ordem].tolist(), self.tasklist[mais_antiga].tolist(),
+                      inicio.tolist(), (inicio + quantidade).tolist())
+        resumo = [{"projeto_id": proj_id, "projeto": nome, "vencidas": vencidas, "dias_atraso": dias,
+                   "lista_bloqueando": lista, "tarefas": agrupados[de:ate]}
+                  for proj_id, nome, vencidas, dias, lista, de, ate in colunas]
+        return resumo
+
+
+def comparar_percentuais(projetos, historico):
+    """(estagnados, evoluiram) entre o % atual dos projetos e o histórico gravado pelo
+    tracker ({id: {"percent": ...}}); projeto sem histórico fica de fora dos dois.
+        estagnados = [{"nome", "percent"}]
+        evoluiram  = [{"nome", "antes", "agora", "delta"}]"""
+    projetos = list(projetos)
+    atual = np.fromiter((int(p.get("percent_complete") or 0) for p in projetos), dtype=np.int64, count=len(projetos))
+    anterior = np.fromiter((float((historico.get(str(p.get("id"))) or {}).get("percent", np.nan) or 0)
+                            for p in projetos), dtype=np.float64, count=len(projetos))
+    tem_historico = ~np.isnan(anterior)
+    anterior = np.where(tem_historico, anterior, 0).astype(np.int64)
+    delta = atual - anterior
+
+    # tolist(): ler escalares NumPy um a um custa mais que a própria comparação
+    parados = np.flatnonzero(tem_historico & (delta == 0)).tolist()
+    mudaram = np.flatnonzero(tem_historico & (delta != 0)).tolist()
+    estagnados = [{"nome": projetos[i].get("name"), "percent": percentual}
+                  for i, percentual in zip(parados, atual[parados].tolist())]
+    evoluiram = [{"nome": projetos[i].get("name"), "antes": antes, "agora": agora, "delta": agora - antes}
+                 for i, antes, agora in zip(mudaram, anterior[mudaram].tolist(), atual[mudaram].tolist())]
+    return estagnados, evoluiram
+
+
+# Colunas da base atual, remontadas só quando a sync troca o arquivo
+_colunas_instance = None
+_colunas_versao = None
+_colunas_trava = threading.Lock()
+
+def _versao_base(caminho):
+    try:
+        estado = os.stat(caminho)
+    except FileNotFoundError:
+        return None
+    return (estado.st_ino, estado.st_mtime_ns, estado.st_size)
+
+def get_colunas_tarefas():
+    """Retorna as colunas das tarefas da base de projetos do processo"""
+    global _colunas_instance, _colunas_versao
+    base = get_project_db()
+    with _colunas_trava:
+        versao = _versao_base(base.caminho)
+        if _colunas_instance is None or versao is None or versao != _colunas_versao:
+            _colunas_instance = ColunasTarefas(*base.tarefas_em_colunas())
+            _colunas_versao = versao or _versao_base(base.caminho)  # A base pode ter sido gerada agora
+    return _colunas_instance
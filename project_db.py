@@ -0,0 +1,196 @@
+"""
+Base SQLite de projetos e tarefas (db_projetos.sqlite)
+O ZohoSync grava esta base junto com o snapshot, a cada sync, com só o que
+as análises em lote precisam de cada tarefa (aberta, data de fim já em
+YYYY-MM-DD, fase). project_analytics lê tudo de uma vez e monta as colunas
+NumPy; quem pergunta de um projeto usa o repositório (índice de nomes e fatos).
+
+A base é só leitura para o resto do Apex: cada sync gera um arquivo novo
+e troca o antigo de uma vez (os.replace), como no snapshot.
+
+Uso direto:
+    python project_db.py     -> reconstrói a base a partir do snapshot atual
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from config import Config
+from snapshot import carregar_projetos
+
+# Status de tarefa que contam como encerrada (o resto está "aberta")
+STATUS_FECHADOS = ("completed", "concluído", "cancelled", "fechado")
+FORMATOS_DATA_ZOHO = ("%m-%d-%Y", "%Y-%m-%d", "%d/%m/%Y")
+
+ESQUEMA_TABELAS = """
+CREATE TABLE projetos (
+    id TEXT PRIMARY KEY,
+    ordem INTEGER NOT NULL,          -- posição no snapshot
+    nome TEXT NOT NULL,
+    percent INTEGER
+);
+CREATE TABLE tarefas (
+    projeto_id TEXT NOT NULL,
+    nome TEXT,
+    aberta INTEGER NOT NULL,         -- 0 se o status é de encerrada
+    data_fim TEXT,                   -- YYYY-MM-DD (NULL se não deu para ler)
+    tasklist TEXT
+);
+"""
+# Sem índices: a base só é lida inteira (tarefas_em_colunas), uma vez por sync
+
+
+def data_iso(data_str):
+    """Data do Zoho (MM-DD-YYYY, YYYY-MM-DD ou DD/MM/YYYY) em YYYY-MM-DD, ou None"""
+    if not data_str or not isinstance(data_str, str):
+        return None
+    for fmt in FORMATOS_DATA_ZOHO:
+        try:
+            return datetime.strptime(data_str, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
+
+class EscritorBaseProjetos:
+    """Grava a base projeto a projeto (mesma ideia do EscritorSnapshot):
+        with EscritorBaseProjetos("db_projetos.sqlite") as base:
+            base.escrever(projeto)
+    Se der exceção dentro do bloco, o temporário é apagado e a base antiga fica intacta."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.temporario = f"{caminho}.{os.getpid()}.tmp"
+        self.total = 0
+        self.total_tarefas = 0
+        self._conn = None
+        self._datas = {}  # end_date -> ISO (as datas se repetem muito)
+
+    def __enter__(self):
+        if os.path.exists(self.temporario):
+            os.remove(self.temporario)
+        self._conn = sqlite3.connect(self.temporario)
+        self._conn.execute("PRAGMA journal_mode = OFF")  # Arquivo temporário: se falhar, é jogado fora
+        self._conn.execute("PRAGMA synchronous = OFF")
+        self._conn.executescript(ESQUEMA_TABELAS)
+        return self
+
+    def _data(self, data_str):
+        if data_str not in self._datas:
+            self._datas[data_str] = data_iso(data_str)
+        return self._datas[data_str]
+
+    def escrever(self, projeto):
+        proj_id = str(projeto.get("id"))
+        nome = projeto.get("name") or ""
+        self._conn.execute("INSERT OR REPLACE INTO projetos VALUES (?, ?, ?, ?)",
+                           (proj_id, self.total, nome, projeto.get("percent_complete")))
+
+        linhas = [(proj_id, t.get("name"), int(str(t.get("status") or "").lower() not in STATUS_FECHADOS),
+                   self._data(t.get("end_date")), t.get("tasklist"))
+                  for t in projeto.get("tasks") or []]
+        self._conn.executemany("INSERT INTO tarefas VALUES (?, ?, ?, ?, ?)", linhas)
+        self.total += 1
+        self.total_tarefas += len(linhas)
+
+    def __exit__(self, tipo_erro, erro, tb):
+        try:
+            if tipo_erro is None:
+                self._conn.commit()
+        finally:
+            self._conn.close()
+
+        if tipo_erro is None:
+            os.replace(self.temporario, self.caminho)
+        elif os.path.exists(self.temporario):
+            os.remove(self.temporario)
+        return False
+
+
+class ProjectDB:
+    """Leitura da base de projetos. Uma conexão por thread, reaberta sozinha
+    quando a sync troca o arquivo."""
+
+    def __init__(self, caminho=None):
+        self.caminho = caminho or Config.SQLITE_PROJETOS
+        self._local = threading.local()
+
+    def escritor(self):
+        return EscritorBaseProjetos(self.caminho)
+
+    def reconstruir(self, projetos):
+        """Regrava a base inteira a partir de uma lista de projetos (ex.: o snapshot)"""
+        with self.escritor() as base:
+            for projeto in projetos:
+                base.escrever(projeto)
+        return base.total, base.total_tarefas
+
+    def _conexao(self):
+        """Conexão desta thread com a versão atual do arquivo. None se não há base nem snapshot."""
+        try:
+            estado = os.stat(self.caminho)
+        except FileNotFoundError:
+            if not self._gerar_do_snapshot():
+                return None
+            estado = os.stat(self.caminho)
+        versao = (estado.st_ino, estado.st_mtime_ns, estado.st_size)
+        if getattr(self._local, "versao", None) != versao:
+            if getattr(self._local, "conn", None) is not None:
+                self._local.conn.close()
+            uri = Path(os.path.abspath(self.caminho)).as_uri() + "?mode=ro"
+            self._local.conn = sqlite3.connect(uri, uri=True)
+            self._local.versao = versao
+        return self._local.conn
+
+    def _gerar_do_snapshot(self):
+        """Primeira vez sem a base (ex.: snapshot de antes dela existir): gera a partir do snapshot"""
+        with _geracao_trava:
+            if os.path.exists(self.caminho):
+                return True
+            try:
+                projetos = carregar_projetos()
+            except (FileNotFoundError, ValueError):
+                return False
+            self.reconstruir(projetos)
+            return True
+
+    def disponivel(self):
+        return self._conexao() is not None
+
+    def tarefas_em_colunas(self):
+        """(projetos, tarefas) em tuplas simples, para análises em lote (project_analytics):
+        projetos = [(id, nome, percent)] na ordem do snapshot
+        tarefas  = [(projeto_id, nome, aberta, data_fim, tasklist)]"""
+        conn = self._conexao()
+        if conn is None:
+            return [], []
+        projetos = conn.execute("SELECT id, nome, percent FROM projetos ORDER BY ordem").fetchall()
+        # Sem JOIN: quem monta as colunas troca o id pela posição do projeto (bem mais barato)
+        tarefas = conn.execute("SELECT projeto_id, nome, aberta, data_fim, tasklist FROM tarefas").fetchall()
+        return projetos, tarefas
+
+
+_geracao_trava = threading.Lock()
+
+
+# Singleton global, como o logger: todos os módulos dividem as conexões
+_project_db_instance = None
+_project_db_trava = threading.Lock()
+
+def get_project_db():
+    """Retorna a base de projetos do processo"""
+    global _project_db_instance
+    with _project_db_trava:
+        if _project_db_instance is None:
+            _project_db_instance = ProjectDB()
+    return _project_db_instance
+
+
+if __name__ == "__main__":
+    inicio = time.perf_counter()
+    projetos, tarefas = ProjectDB().reconstruir(carregar_projetos())
+    print(f"🗄️ Base '{Config.SQLITE_PROJETOS}' reconstruída: {projetos} projetos, {tarefas} tarefas "
+          f"em {time.perf_counter() - inicio:.1f}s.")
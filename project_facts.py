@@ -0,0 +1,173 @@
+"""
+Fatos derivados de cada projeto, calculados uma vez na sync
+Quem consome (visão helicóptero, prompt do brain, relatório semanal,
+dashboard) lê projeto["fatos"] pronto em vez de varrer as tarefas ou
+pedir para a IA deduzir a fase pelas datas dos custom_fields.
+
+    fase_atual          lista (tasklist) da primeira tarefa aberta, ou None
+    fase_cronograma     última etapa do cronograma (custom_fields) cuja data já passou
+    proximo_marco       {"marco", "data"} da próxima etapa do cronograma
+                        (sem cronograma: o marco da tarefa aberta que vence primeiro)
+    tarefas_abertas     quantidade de tarefas abertas
+    tarefas_vencidas    abertas com data de fim antes da referência
+    dias_atraso         atraso da tarefa vencida mais antiga (0 se nenhuma)
+    lista_bloqueando    lista da tarefa vencida mais antiga, ou None
+    referencia          data (YYYY-MM-DD) usada para "vencida"/"próximo"
+    a_vencer            [[data, quantidade, tasklist, milestone]] das abertas que ainda
+                        não tinham vencido, por data, até a_vencer_ate (+ a 1ª depois)
+    a_vencer_ate        referência + Config.FATOS_JANELA_DIAS
+    desatualizado       True só quando fatos_no_dia não conseguiu chegar até hoje
+
+Os fatos ficam no cabeçalho do projeto, então a carga só de cabeçalhos já os traz.
+Atrasos envelhecem com o calendário: fatos_no_dia() leva os de um dia anterior
+para hoje sem olhar as tarefas (o repositório faz isso ao carregar), a sync
+recalcula tudo, e `python project_facts.py` regrava snapshot e base SQLite.
+"""
+
+from datetime import date, timedelta
+from functools import lru_cache
+from config import Config
+from project_db import STATUS_FECHADOS, ProjectDB, data_iso
+from snapshot import abrir_escritor, carregar_projetos
+
+# Etapas do cronograma na ordem (campo do Zoho, nome da etapa)
+CRONOGRAMA = [
+    ("Data de Onboarding", "Onboarding"),
+    ("Data Liberação Servidor", "Liberação do Servidor"),
+    ("Data de Inicio da Implantação", "Implantação"),
+    ("Data de Homologação", "Homologação"),
+    ("Data de Virada", "Virada (Go-Live)"),
+    ("Data de Inicio da OA", "Operação Assistida"),
+]
+
+_data_em_cache = lru_cache(maxsize=4096)(data_iso)  # As mesmas datas se repetem em milhares de tarefas
+
+
+def _data(valor):
+    """data_iso com cache; o que não é texto (ex.: um dict vindo da API) não vai para o cache"""
+    return _data_em_cache(valor) if isinstance(valor, str) else None
+
+
+def _cronograma(campos, referencia):
+    """(fase_cronograma, proximo_marco) pelas datas do cronograma nos custom_fields"""
+    fase_cronograma = None
+    proximo_marco = None
+    for campo, etapa in CRONOGRAMA:
+        data_etapa = _data(campos.get(campo))
+        if data_etapa is None:
+            continue
+        if data_etapa <= referencia:
+            fase_cronograma = etapa
+        elif proximo_marco is None or data_etapa < proximo_marco["data"]:
+            proximo_marco = {"marco": etapa, "data": data_etapa}
+    return fase_cronograma, proximo_marco
+
+
+def derivar_fatos(projeto, hoje=None):
+    """Dict de fatos de um projeto completo (com tarefas). `hoje`: date ou 'YYYY-MM-DD'."""
+    if hoje is None:
+        hoje = date.today()
+    referencia = hoje if isinstance(hoje, str) else hoje.strftime("%Y-%m-%d")
+
+    fase_atual = None
+    abertas = vencidas = 0
+    mais_antiga = None   # (data_fim, tasklist) da vencida mais antiga
+    a_vencer = {}  # data_fim -> [data_fim, quantidade, tasklist, milestone] (da 1ª tarefa com essa data)
+    for t in projeto.get("tasks") or ():
+        if str(t.get("status") or "").lower() in STATUS_FECHADOS:
+            continue
+        abertas += 1
+        if abertas == 1:
+            fase_atual = t.get("tasklist")
+        data_fim = _data(t.get("end_date"))
+        if data_fim is None:
+            continue
+        if data_fim < referencia:
+            vencidas += 1
+            if mais_antiga is None or data_fim < mais_antiga[0]:
+                mais_antiga = (data_fim, t.get("tasklist"))
+        elif data_fim in a_vencer:
+            a_vencer[data_fim][1] += 1
+        else:
+            a_vencer[data_fim] = [data_fim, 1, t.get("tasklist"), t.get("milestone")]
+    # Só a janela de dias que dá para andar sem sync (+ a primeira depois dela, o próximo marco)
+    a_vencer_ate = (date.fromisoformat(referencia) + timedelta(days=Config.FATOS_JANELA_DIAS)).strftime("%Y-%m-%d")
+    a_vencer = sorted(a_vencer.values())
+    na_janela = sum(1 for v in a_vencer if v[0] < a_vencer_ate)
+    a_vencer = a_vencer[:na_janela + 1]
+
+    fase_cronograma, proximo_marco = _cronograma(projeto.get("custom_fields") or {}, referencia)
+    if proximo_marco is None and a_vencer:
+        # Sem cronograma: o marco da aberta que vence primeiro a partir de hoje
+        proximo_marco = {"marco": a_vencer[0][3], "data": a_vencer[0][0]}
+
+    dias_atraso = 0
+    if mais_antiga is not None:
+        dias_atraso = (date.fromisoformat(referencia) - date.fromisoformat(mais_antiga[0])).days
+
+    return {
+        "fase_atual": fase_atual,
+        "fase_cronograma": fase_cronograma,
+        "proximo_marco": proximo_marco,
+        "tarefas_abertas": abertas,
+        "tarefas_vencidas": vencidas,
+        "dias_atraso": dias_atraso,
+        "lista_bloqueando": mais_antiga[1] if mais_antiga else None,
+        "referencia": referencia,
+        "a_vencer": a_vencer,
+        "a_vencer_ate": a_vencer_ate,
+    }
+
+
+def fatos_no_dia(projeto, hoje=None):
+    """Fatos do projeto (cabeçalho basta) valendo para `hoje`: os de uma sync de dias
+    atrás andam no calendário com o a_vencer, sem olhar as tarefas. Devolve um dict
+    novo (ou os próprios fatos, se já são de hoje). Depois da janela (a_vencer_ate)
+    não dá para saber o que venceu: os fatos voltam como estão, com desatualizado=True.
+    Fatos gravados antes do a_vencer existir ficam como estão até a próxima sync."""
+    fatos = projeto.get("fatos")
+    if hoje is None:
+        hoje = date.today()
+    hoje = hoje if isinstance(hoje, str) else hoje.strftime("%Y-%m-%d")
+    if not isinstance(fatos, dict) or "a_vencer" not in fatos or (fatos.get("referencia") or hoje) >= hoje:
+        return fatos
+    if hoje > fatos.get("a_vencer_ate", hoje):
+        return dict(fatos, desatualizado=True)
+
+    a_vencer = [v for v in fatos["a_vencer"] if v[0] >= hoje]
+    venceram = fatos["a_vencer"][:len(fatos["a_vencer"]) - len(a_vencer)]  # Está ordenado por data
+    atualizados = dict(fatos, referencia=hoje, a_vencer=a_vencer)
+    atualizados["tarefas_vencidas"] = (fatos.get("tarefas_vencidas") or 0) + sum(v[1] for v in venceram)
+    if fatos.get("tarefas_vencidas"):
+        # A mais antiga continua sendo a mesma: só o atraso dela cresce
+        dias = (date.fromisoformat(hoje) - date.fromisoformat(fatos["referencia"])).days
+        atualizados["dias_atraso"] = (fatos.get("dias_atraso") or 0) + dias
+    elif venceram:
+        atualizados["dias_atraso"] = (date.fromisoformat(hoje) - date.fromisoformat(venceram[0][0])).days
+        atualizados["lista_bloqueando"] = venceram[0][2]
+
+    fase_cronograma, proximo_marco = _cronograma(projeto.get("custom_fields") or {}, hoje)
+    if proximo_marco is None and a_vencer:
+        proximo_marco = {"marco": a_vencer[0][3], "data": a_vencer[0][0]}
+    atualizados["fase_cronograma"] = fase_cronograma
+    atualizados["proximo_marco"] = proximo_marco
+    return atualizados
+
+
+def atualizar_snapshot(caminho=None, hoje=None):
+    """Recalcula os fatos do snapshot atual (ex.: virou o dia e não houve sync).
+    Regrava o snapshot e a base SQLite; devolve quantos projetos foram atualizados."""
+    caminho = caminho or Config.SNAPSHOT_PROJETOS
+    projetos = carregar_projetos(caminho)
+    for projeto in projetos:
+        projeto["fatos"] = derivar_fatos(projeto, hoje)
+    with abrir_escritor(caminho) as escritor:
+        for projeto in projetos:
+            escritor.escrever(projeto)
+    ProjectDB().reconstruir(projetos)
+    return escritor.total
+
+
+if __name__ == "__main__":
+    total = atualizar_snapshot()
+    print(f"🧮 Fatos recalculados para {total} projetos em '{Config.SNAPSHOT_PROJETOS}'.")
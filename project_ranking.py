@@ -0,0 +1,98 @@
+"""
+Ranking de criticidade dos projetos (o que vai para o prompt numa pergunta geral)
+Em vez de mandar para a IA os primeiros projetos do arquivo, cada projeto
+ganha uma nota de criticidade e só os k mais críticos entram no prompt
+(heapq.nlargest: O(n log k), sem ordenar a carteira inteira).
+
+A nota soma, com os pesos de PESOS:
+    atraso       dias de atraso da tarefa vencida mais antiga (fatos da sync)
+    vencidas     quantidade de tarefas vencidas (fatos da sync)
+    estagnado    % igual ao do último registro do tracker (db_historico_percentual.json)
+    virada       Go-Live chegando (Data de Virada nos próximos JANELA_VIRADA dias),
+                 pesando mais quanto mais perto e quanto menos pronto estiver o projeto
+Atraso e vencidas têm teto, para um único projeto esquecido não valer mais
+que vários problemas reais somados.
+"""
+
+import heapq
+import json
+import os
+import threading
+from datetime import date
+from functools import lru_cache
+from project_db import data_iso
+from tracker import ARQUIVO_HISTORICO
+
+PESOS = {
+    "atraso": 1.0,      # por dia, até TETO_ATRASO
+    "vencidas": 2.0,    # por tarefa, até TETO_VENCIDAS
+    "estagnado": 15.0,
+    "virada": 40.0,     # Go-Live amanhã com o projeto em 0%
+}
+TETO_ATRASO = 90
+TETO_VENCIDAS = 20
+JANELA_VIRADA = 30  # dias
+
+_data = lru_cache(maxsize=4096)(data_iso)  # A mesma Data de Virada é lida a cada pergunta geral
+
+
+def _percent(projeto):
+    try:
+        return int(projeto.get("percent_complete") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def nota_criticidade(projeto, historico=None, hoje=None):
+    """Nota (quanto maior, mais crítico) de um projeto a partir dos fatos da sync.
+    `historico`: {id: {"percent": ...}} do tracker; None = sem sinal de estagnação."""
+    fatos = projeto.get("fatos") or {}
+    percent = _percent(projeto)
+    nota = PESOS["atraso"] * min(fatos.get("dias_atraso") or 0, TETO_ATRASO)
+    nota += PESOS["vencidas"] * min(fatos.get("tarefas_vencidas") or 0, TETO_VENCIDAS)
+
+    anterior = (historico or {}).get(str(projeto.get("id")))
+    if anterior and percent < 100:
+        try:
+            if int(anterior.get("percent") or 0) == percent:
+                nota += PESOS["estagnado"]
+        except (TypeError, ValueError):
+            pass
+
+    virada = _data((projeto.get("custom_fields") or {}).get("Data de Virada"))
+    if virada is not None and percent < 100:
+        faltam = (date.fromisoformat(virada) - (hoje or date.today())).days
+        if 0 <= faltam <= JANELA_VIRADA:
+            nota += PESOS["virada"] * (1 - faltam / JANELA_VIRADA) * (1 - percent / 100)
+    return nota
+
+
+def mais_criticos(projetos, k, historico=None, hoje=None):
+    """Os k projetos mais críticos, do mais para o menos (empate: ordem do snapshot).
+    `historico` None usa o registro do tracker em disco."""
+    if historico is None:
+        historico = carregar_historico()
+    hoje = hoje or date.today()
+    notas = ((nota_criticidade(p, historico, hoje), -ordem, p) for ordem, p in enumerate(projetos))
+    return [p for _, _, p in heapq.nlargest(k, notas, key=lambda item: item[:2])]
+
+
+# Histórico do tracker em cache: a cada pergunta geral só confere o mtime do arquivo
+_historico_cache = (None, {})
+_historico_trava = threading.Lock()
+
+def carregar_historico():
+    """{id: {"percent": ...}} do último registro do tracker ({} se não há)"""
+    global _historico_cache
+    try:
+        versao = os.stat(ARQUIVO_HISTORICO).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    with _historico_trava:
+        if _historico_cache[0] != versao:
+            try:
+                with open(ARQUIVO_HISTORICO, "r", encoding="utf-8") as f:
+                    _historico_cache = (versao, json.load(f))
+            except (OSError, ValueError):
+                return {}
+        return _historico_cache[1]
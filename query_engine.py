@@ -0,0 +1,309 @@
+"""
+Motor de consultas locais: responde perguntas factuais sem chamar a IA
+"Qual o percentual do projeto 1234", "quantos projetos estão em
+homologação", "quais têm tarefas vencidas"... têm resposta exata nos
+dados da sync (percentual, fatos do project_facts, custom_fields).
+O motor reconhece esses padrões, consulta o repositório e devolve uma
+frase curta em milissegundos. Pergunta aberta (ou ambígua: projeto não
+identificado com certeza) devolve None e segue para o Gemini como antes.
+
+Cada pergunta é registrada em Config.CONSULTAS_REGISTRO (LOCAL ou MODELO,
+padrão e tempo; o texto dito não é gravado) para medir quanto do tráfego já sai daqui:
+    python query_engine.py relatorio          -> parcela respondida localmente
+    python query_engine.py "pergunta"         -> testa a resposta local
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime
+from pathlib import Path
+from config import Config
+from name_index import normalizar
+from project_db import data_iso
+from project_facts import CRONOGRAMA
+from repository import get_repositorio
+
+# Palavras das próprias perguntas: nunca são nome de projeto
+_VOCABULARIO = {
+    "qual", "quais", "quanto", "quantos", "quantas", "percentual", "porcentagem", "cento", "concluido",
+    "concluida", "pronto", "pronta", "completo", "fase", "etapa", "cronograma", "tarefa", "tarefas",
+    "vencida", "vencidas", "atrasada", "atrasadas", "atrasado", "atrasados", "atraso", "projeto",
+    "projetos", "esta", "estao", "temos", "tenho", "existem", "ativos", "total", "carteira", "cadastrados", "data", "quando", "virada", "live",
+    "golive", "proximo", "marco", "apex", "senhor", "ainda", "hoje", "dias", "agora", "cliente",
+    "clientes", "andamento", "status", "sobre", "mostre", "liste", "listar", "diga", "falta", "faltam",
+}
+# Pedido de anotação, em qualquer forma falada ("anota", "anote", "registra", "salva"...):
+# nunca é pergunta para o motor. Os brains usam o mesmo padrão para o modo escrita.
+GATILHO_ESCRITA = re.compile(r"\b(?:anot|lembr|registr|grav|salv|guard)\w*|\badicion\w* (?:uma )?nota")
+
+_VENCIDAS = re.compile(r"\b(vencid\w*|atrasad\w*|em atraso)\b")
+_PROJETOS_EM = re.compile(r"\b(quantos|quais)\b(?: sao os)? projetos?\b.*?\b(?:em|na|no|de)\s+(?P<fase>.+)$")
+_TOTAL = re.compile(r"\bquantos projetos\b")
+_PERCENTUAL = re.compile(r"\b(percentual|porcentagem|por cento|quanto\w* (?:ja )?(?:esta )?(?:pronto|concluido|completo))\b|%")
+_FASE = re.compile(r"\b(qual|que|em qual)\b.*\b(fase|etapa)\b")
+_VIRADA = re.compile(r"\b(virada|go ?live|go-live)\b")
+_PROXIMO_MARCO = re.compile(r"\bproximo marco\b")
+_NUMEROS = re.compile(r"\b\d{2,}\b")
+# Datas e anos ("18/10/2026", "2026-10-18", "em 2026") nunca são código de projeto
+_DATAS = re.compile(r"\b\d{1,4}[/.-]\d{1,2}(?:[/.-]\d{2,4})?\b")
+_ANO = re.compile(r"^(19|20)\d{2}$")
+
+_LISTA_MAXIMA = 10  # Nomes numa resposta falada
+
+
+def _nome_curto(projeto):
+    return projeto.get("name") or str(projeto.get("id"))
+
+
+def _data_br(data):
+    """'YYYY-MM-DD' -> 'DD/MM/YYYY'"""
+    return datetime.strptime(data, "%Y-%m-%d").strftime("%d/%m/%Y")
+
+
+def _projetos(n, verbo=None):
+    """'1 projeto está' / '3 projetos estão'"""
+    texto = f"{n} projeto" if n == 1 else f"{n} projetos"
+    if verbo:
+        texto += f" {verbo[0] if n == 1 else verbo[1]}"
+    return texto
+
+
+def _listar(nomes, total):
+    texto = ", ".join(nomes)
+    return f"{texto} e mais {total - len(nomes)}" if total > len(nomes) else texto
+
+
+class MotorConsultas:
+    """Reconhece perguntas factuais e responde direto dos dados do repositório"""
+
+    def __init__(self, registro=None):
+        self.registro = Path(registro or Config.CONSULTAS_REGISTRO)
+        self._trava = threading.Lock()
+        self.contagem = Counter()  # padrão (ou "MODELO") -> perguntas nesta execução
+
+    # --- Entrada ---
+    def responder(self, pergunta):
+        """Resposta pronta (str) ou None quando a pergunta precisa da IA"""
+        inicio = time.perf_counter()
+        padrao, resposta = None, None
+        texto = normalizar(pergunta).strip(" ?!.")
+        curta = len(texto.split()) <= Config.CONSULTAS_MAX_PALAVRAS  # Prompt longo (relatório etc.) é da IA
+        if Config.CONSULTAS_LOCAIS and curta and not e_escrita(texto):
+            try:
+                padrao, resposta = self._consultar(texto) or (None, None)
+            except ValueError:
+                padrao, resposta = None, None  # Snapshot ilegível: quem decide é o fluxo normal
+        self._registrar(padrao if resposta else None, (time.perf_counter() - inicio) * 1000)
+        return resposta
+
+    def _consultar(self, texto):
+        """(padrão, resposta) da primeira regra que sabe responder, ou None"""
+        repositorio = get_repositorio()
+        projetos = repositorio.projetos(com_tarefas=False)
+        if not projetos:
+            return None
+
+        if _VENCIDAS.search(texto):
+            return self._vencidas(texto, projetos)
+        em = _PROJETOS_EM.search(texto)
+        if em:
+            resposta = self._projetos_na_fase(em.group(1), em.group("fase"), projetos)
+            if resposta:
+                return "projetos_na_fase", resposta
+        if _TOTAL.search(texto) and not self._termos(texto):
+            return "total_projetos", f"São {_projetos(len(projetos))} na carteira."
+
+        projeto = self._projeto(texto)
+        if projeto is None:
+            return None
+        if _PERCENTUAL.search(texto):
+            return "percentual", f"O projeto {_nome_curto(projeto)} está com {projeto.get('percent_complete') or 0}% concluído."
+        if _PROXIMO_MARCO.search(texto):
+            return "proximo_marco", self._proximo_marco(projeto)
+        if _VIRADA.search(texto):
+            return "virada", self._virada(projeto)
+        if _FASE.search(texto):
+            return "fase", self._fase(projeto)
+        return None
+
+    # --- Projeto citado ---
+    @staticmethod
+    def _termos(texto):
+        return [p for p in re.findall(r"\w+", texto) if len(p) > 3 and p not in _VOCABULARIO and not p.isdigit()]
+
+    def _projeto(self, texto):
+        """O projeto citado, só quando não há dúvida (código exato ou nome resolvido para um só)"""
+        repositorio = get_repositorio()
+        indice = repositorio.indice_nomes()
+        for codigo in _NUMEROS.findall(_DATAS.sub(" ", texto)):
+            if _ANO.match(codigo):
+                continue
+            ids = indice.por_codigo(codigo)
+            if len(ids) == 1:
+                return repositorio.por_id(ids[0], com_tarefas=False)
+        termos = self._termos(texto)
+        if not termos:
+            return None
+        ids = indice.resolver(termos)
+        return repositorio.por_id(ids[0], com_tarefas=False) if len(ids) == 1 else None
+
+    # --- Regras ---
+    def _vencidas(self, texto, projetos):
+        projeto = self._projeto(texto)
+        if projeto is not None:
+            fatos = projeto.get("fatos") or {}
+            vencidas = fatos.get("tarefas_vencidas") or 0
+            if not vencidas:
+                return "vencidas_projeto", f"O projeto {_nome_curto(projeto)} não tem tarefas vencidas."
+            return "vencidas_projeto", (
+                f"O projeto {_nome_curto(projeto)} tem {vencidas} tarefa(s) vencida(s); a mais antiga está "
+                f"{fatos.get('dias_atraso', 0)} dias atrasada (fase {fatos.get('lista_bloqueando') or 'indefinida'}).")
+        if self._termos(texto):
+            return None  # Citou algo que não virou um projeto só: melhor a IA perguntar
+
+        atrasados = [p for p in projetos if (p.get("fatos") or {}).get("tarefas_vencidas")]
+        if "quantas tarefas" in texto:
+            total = sum(p["fatos"]["tarefas_vencidas"] for p in atrasados)
+            return "total_vencidas", f"São {total} tarefas vencidas em {_projetos(len(atrasados))}."
+        if "quantos" in texto:
+            return "projetos_atrasados", f"{_projetos(len(atrasados), ('tem', 'têm'))} tarefas vencidas."
+        if not atrasados:
+            return "projetos_atrasados", "Nenhum projeto tem tarefas vencidas."
+        atrasados.sort(key=lambda p: -(p["fatos"].get("dias_atraso") or 0))
+        nomes = [f"{_nome_curto(p)} ({p['fatos'].get('dias_atraso') or 0}d)" for p in atrasados[:_LISTA_MAXIMA]]
+        return "projetos_atrasados", (f"{_projetos(len(atrasados), ('tem', 'têm'))} tarefas vencidas. "
+                                      f"Os mais atrasados: {_listar(nomes, len(atrasados))}.")
+
+    def _projetos_na_fase(self, pergunta, trecho, projetos):
+        """Conta/lista pela etapa do cronograma; se não for etapa, pela fase atual (tasklist)"""
+        trecho = f" {trecho} "
+        etapa = next((nome for _, nome in CRONOGRAMA if f" {normalizar(nome).split(' (')[0]} " in trecho), None)
+        if etapa is None and re.search(r"\bgo ?live\b", trecho):
+            etapa = "Virada (Go-Live)"
+        if etapa is not None:
+            achados = [p for p in projetos if (p.get("fatos") or {}).get("fase_cronograma") == etapa]
+            rotulo = etapa
+        else:
+            fases = {normalizar(f): f for f in {(p.get("fatos") or {}).get("fase_atual") for p in projetos} if f}
+            chave = next((f for f in sorted(fases, key=len, reverse=True) if f" {f} " in trecho), None)
+            if chave is None:
+                return None
+            rotulo = fases[chave]
+            achados = [p for p in projetos if normalizar((p.get("fatos") or {}).get("fase_atual")) == chave]
+
+        if pergunta == "quantos":
+            return f"{_projetos(len(achados), ('está', 'estão'))} em {rotulo}."
+        if not achados:
+            return f"Nenhum projeto está em {rotulo}."
+        nomes = [_nome_curto(p) for p in achados[:_LISTA_MAXIMA]]
+        return f"{_projetos(len(achados))} em {rotulo}: {_listar(nomes, len(achados))}."
+
+    @staticmethod
+    def _fase(projeto):
+        fatos = projeto.get("fatos") or {}
+        etapa, fase = fatos.get("fase_cronograma"), fatos.get("fase_atual")
+        if not etapa and not fase:
+            return f"O projeto {_nome_curto(projeto)} não tem fase definida (sem cronograma e sem tarefas abertas)."
+        partes = []
+        if etapa:
+            partes.append(f"na etapa {etapa} do cronograma")
+        if fase:
+            partes.append(f"com tarefas abertas em {fase}")
+        return f"O projeto {_nome_curto(projeto)} está {' e '.join(partes)}."
+
+    @staticmethod
+    def _virada(projeto):
+        data = data_iso((projeto.get("custom_fields") or {}).get("Data de Virada"))
+        if data is None:
+            return f"O projeto {_nome_curto(projeto)} não tem Data de Virada cadastrada."
+        faltam = (date.fromisoformat(data) - date.today()).days
+        quando = f"daqui a {faltam} dias" if faltam > 0 else ("hoje" if faltam == 0 else f"há {-faltam} dias")
+        return f"A virada do projeto {_nome_curto(projeto)} é em {_data_br(data)} ({quando})."
+
+    @staticmethod
+    def _proximo_marco(projeto):
+        marco = (projeto.get("fatos") or {}).get("proximo_marco")
+        if not marco:
+            return f"O projeto {_nome_curto(projeto)} não tem próximo marco definido."
+        return f"O próximo marco do projeto {_nome_curto(projeto)} é {marco['marco']}, em {_data_br(marco['data'])}."
+
+    # --- Registro do tráfego ---
+    def _registrar(self, padrao, ms):
+        """Só o destino, o padrão e o tempo: o texto dito (notas, e-mails, WhatsApp) nunca vai para o disco"""
+        destino = f"LOCAL | {padrao}" if padrao else "MODELO | -"
+        linha = f"{datetime.now():%Y-%m-%d %H:%M:%S} | {destino} | {ms:.1f}ms\n"
+        with self._trava:
+            self.contagem[padrao or "MODELO"] += 1
+            try:
+                self.registro.parent.mkdir(parents=True, exist_ok=True)
+                if self.registro.exists() and self.registro.stat().st_size > Config.CONSULTAS_REGISTRO_MAX_KB * 1024:
+                    os.replace(self.registro, _anterior(self.registro))  # Guarda um arquivo antigo, não cresce sem fim
+                with open(self.registro, "a", encoding="utf-8") as f:
+                    f.write(linha)
+            except OSError:
+                pass  # Registro é só estatística: nunca atrapalha a resposta
+
+
+def e_escrita(texto):
+    """True se a frase pede para anotar/registrar algo (texto em qualquer caixa e acentuação)"""
+    return GATILHO_ESCRITA.search(normalizar(texto)) is not None
+
+
+def _anterior(caminho):
+    return Path(f"{caminho}.1")
+
+
+def relatorio_trafego(caminho=None):
+    """{"total", "locais", "por_padrao": Counter, "ms_local"} a partir do registro (e do arquivo anterior)"""
+    caminho = Path(caminho or Config.CONSULTAS_REGISTRO)
+    total, locais, por_padrao, tempos = 0, 0, Counter(), []
+    for arquivo in (_anterior(caminho), caminho):
+        try:
+            with open(arquivo, "r", encoding="utf-8") as f:
+                for linha in f:
+                    partes = linha.rstrip("\n").split(" | ", 4)  # Registros antigos ainda trazem a pergunta
+                    if len(partes) < 4:
+                        continue
+                    total += 1
+                    if partes[1] == "LOCAL":
+                        locais += 1
+                        por_padrao[partes[2]] += 1
+                        tempos.append(float(partes[3].rstrip("ms")))
+        except FileNotFoundError:
+            pass
+    return {"total": total, "locais": locais, "por_padrao": por_padrao,
+            "ms_local": sum(tempos) / len(tempos) if tempos else 0.0}
+
+
+# Singleton global: os brains e o dashboard dividem o mesmo registro
+_motor_instance = None
+_motor_trava = threading.Lock()
+
+def get_motor_consultas():
+    """Retorna o motor de consultas locais do processo"""
+    global _motor_instance
+    with _motor_trava:
+        if _motor_instance is None:
+            _motor_instance = MotorConsultas()
+    return _motor_instance
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "relatorio":
+        r = relatorio_trafego()
+        if not r["total"]:
+            print(f"📭 Nenhuma pergunta registrada em '{Config.CONSULTAS_REGISTRO}'.")
+        else:
+            print(f"📊 {r['locais']} de {r['total']} perguntas ({100 * r['locais'] / r['total']:.0f}%) "
+                  f"respondidas localmente, em média {r['ms_local']:.1f} ms")
+            for padrao, n in r["por_padrao"].most_common():
+                print(f"   - {padrao}: {n}")
+    elif len(sys.argv) > 1:
+        pergunta = " ".join(sys.argv[1:])
+        print(MotorConsultas(registro=Config.CONSULTAS_REGISTRO).responder(pergunta) or "🤖 Vai para a IA.")
+    else:
+        print(__doc__)
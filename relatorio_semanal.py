@@ -1,32 +1,20 @@
-import json
 import time
 from datetime import datetime, timedelta
 from brain import ApexBrain
 from correio import ApexEmail
 from tracker import obter_comparativo
 from config import Config
-
-def parse_data_zoho(data_str):
-    """Tenta converter datas do Zoho (MM-DD-YYYY ou YYYY-MM-DD)"""
-    if not data_str: return None
-    formatos = ["%m-%d-%Y", "%Y-%m-%d", "%d/%m/%Y"]
-    for fmt in formatos:
-        try:
-            return datetime.strptime(data_str, fmt)
-        except ValueError:
-            continue
-    return None
+from project_db import get_project_db
+from project_analytics import get_colunas_tarefas
 
 def gerar_relatorio_cobranca():
     print("="*50)
     print("   ROBÔ DE COBRANÇA SEMANAL (OTIMIZADO)")
     print("="*50)
     
-    # 1. Obter Dados Locais
-    try:
-        with open("db_projetos.json", "r", encoding="utf-8") as f:
-            projetos = json.load(f)
-    except:
+    # 1. Obter Dados Locais (base SQLite gerada pela sync)
+    base = get_project_db()
+    if not base.disponivel():
         print("Erro ao ler projetos.")
         return
 
@@ -44,27 +32,21 @@ def gerar_relatorio_cobranca():
     texto_estagnados = ""
     texto_evolucao = ""
     
-    # A. Filtra Tarefas Vencidas
-    count_vencidas = 0
-    for p in projetos:
-        nome_proj = p.get('name')
-        tem_atraso = False
-        tarefas_proj = []
-        
-        for t in p.get('tasks', []):
-            status = str(t.get('status', '')).lower()
-            data_fim_str = t.get('end_date')
-            
-            if status not in ['completed', 'concluído', 'fechado', 'cancelled']:
-                data_fim = parse_data_zoho(data_fim_str)
-                if data_fim and data_fim <= fim_semana:
-                    atraso = (hoje - data_fim).days
-                    # Adiciona à lista local
-                    tarefas_proj.append(f"   - {t.get('name')} (Vencia em {data_fim.strftime('%d/%m')}, {atraso}d atraso)")
-                    count_vencidas += 1
-        
-        if tarefas_proj:
-            texto_vencidas += f"\nPROJETO: {nome_proj}\n" + "\n".join(tarefas_proj) + "\n"
+    # A. Filtra Tarefas Vencidas (colunas NumPy: abertas com fim antes de hoje, já agrupadas por projeto)
+    colunas = get_colunas_tarefas()
+    vencidas = colunas.vencidas(hoje)
+    count_vencidas = len(vencidas)
+
+    # Os mais atrasados primeiro, com o resumo do projeto (quantas, atraso da mais antiga, fase travada)
+    for resumo_proj in colunas.resumo_por_projeto(vencidas, hoje):
+        tarefas = resumo_proj['tarefas']
+        datas_fim = colunas.fim[tarefas].astype(object)  # datetime.date
+        atrasos = colunas.dias_atraso(tarefas, hoje)
+        tarefas_proj = [f"   - {nome} (Vencia em {data_fim.strftime('%d/%m')}, {atraso}d atraso)"
+                        for nome, data_fim, atraso in zip(colunas.nome[tarefas], datas_fim, atrasos)]
+        resumo = (f" [{resumo_proj['vencidas']} vencidas, {resumo_proj['dias_atraso']}d de atraso, "
+                  f"travado em: {resumo_proj['lista_bloqueando']}]")
+        texto_vencidas += f"\nPROJETO: {resumo_proj['projeto']}{resumo}\n" + "\n".join(tarefas_proj) + "\n"
 
     if count_vencidas == 0:
         texto_vencidas = "Nenhuma atividade vencida nesta semana."
@@ -103,12 +85,12 @@ def gerar_relatorio_cobranca():
     # Retry simples caso ainda dê erro (mas é improvável agora)
     try:
         brain = ApexBrain()
-        corpo_email = brain.analisar(prompt)
+        corpo_email = brain.analisar(prompt, consulta_local=False)  # Prompt pronto: nada de resposta local
     except Exception as e:
         print(f"⚠️ Erro na IA: {e}. Tentando novamente em 5s...")
         time.sleep(5)
         brain = ApexBrain()
-        corpo_email = brain.analisar(prompt)
+        corpo_email = brain.analisar(prompt, consulta_local=False)  # Prompt pronto: nada de resposta local
 
     # Limpeza HTML
     corpo_email_html = corpo_email.replace("```html", "").replace("```", "")
@@ -0,0 +1,345 @@
+"""
+Repositório único dos projetos do Zoho (lê o snapshot gravado pelo zoho_sync)
+Todo mundo que precisa da lista de projetos (brains, dashboards, tracker,
+relatórios) pede para cá em vez de abrir o arquivo por conta própria.
+O arquivo só é relido quando muda (mtime/tamanho), então uma sync nova
+aparece sozinha, sem reiniciar nada, e quem chama de novo não paga parse.
+
+Os cabeçalhos dos projetos são carregados na hora; as tarefas de cada
+projeto só quando alguém pede aquele projeto com tarefas (por_id/tarefas),
+e só as dos últimos Config.TAREFAS_EM_MEMORIA projetos pedidos ficam em
+memória (o resto do arquivo fica comprimido, como está no disco).
+
+Cada versão carregada do snapshot é publicada inteira, de uma vez (número
+de geração + projetos + índices). Processos longos (voz, Streamlit) ligam
+o observador: ele prepara a versão nova em segundo plano e só então troca,
+então nenhuma pergunta espera a carga. Quem responde usa fixado() (ou o
+decorador com_snapshot_fixo) para ver uma única versão do começo ao fim.
+"""
+
+import functools
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date
+from config import Config
+from snapshot import SnapshotSobDemanda, caminho_snapshot, carregar_projetos
+from name_index import IndiceNomes
+from project_facts import fatos_no_dia
+
+
+class SomenteLeitura(dict):
+    """Dict que não aceita alteração. Continua sendo um dict para json.dumps,
+    pandas e afins; quem precisa mudar algo faz .copy() (que devolve um dict comum)."""
+    __slots__ = ()
+
+    def _bloquear(self, *args, **kwargs):
+        raise TypeError("Projeto do repositório é somente leitura; use .copy() para alterar")
+
+    __setitem__ = __delitem__ = __ior__ = _bloquear
+    pop = popitem = clear = update = setdefault = _bloquear
+
+    def __reduce__(self):
+        return (SomenteLeitura, (dict(self),))
+
+
+def _congelar_projeto(projeto):
+    """Cabeçalho, custom_fields e fatos ficam imutáveis; as tarefas viram tupla.
+    Os fatos saem valendo para hoje (fatos_no_dia), sem o a_vencer/a_vencer_ate.
+    Os dicts das tarefas não são copiados (seria tão caro quanto carregar o arquivo):
+    são compartilhados entre todos os leitores e não devem ser alterados."""
+    congelado = dict(projeto)
+    if isinstance(congelado.get("custom_fields"), dict):
+        congelado["custom_fields"] = SomenteLeitura(congelado["custom_fields"])
+    fatos = fatos_no_dia(congelado)
+    if isinstance(fatos, dict):
+        fatos = {k: v for k, v in fatos.items() if not k.startswith("a_vencer")}  # Só servem para andar no calendário
+        if isinstance(fatos.get("proximo_marco"), dict):
+            fatos["proximo_marco"] = SomenteLeitura(fatos["proximo_marco"])
+        congelado["fatos"] = SomenteLeitura(fatos)
+    if isinstance(congelado.get("tasks"), list):
+        congelado["tasks"] = tuple(congelado["tasks"])
+    return SomenteLeitura(congelado)
+
+
+class _Versao:
+    """Uma versão do snapshot. Depois de publicada só ganha o que ainda não
+    tinha sido pedido (ex.: o índice de nomes, as tarefas de um projeto);
+    o que já existe nunca muda (o cache de tarefas só descarta os mais antigos)."""
+
+    def __init__(self, caminho, assinatura):
+        self.caminho = caminho
+        self.assinatura = assinatura
+        self.geracao = 0
+        self.projetos = {}  # com_tarefas -> tupla de projetos
+        self.por_id = {}  # com_tarefas -> {id: projeto}
+        self.indice_nomes = None
+        self.leitor = None  # SnapshotSobDemanda: tarefas de um projeto sem carregar as dos outros
+        self.posicao = None  # id -> posição do projeto no snapshot
+        self.com_tarefas = OrderedDict()  # id -> projeto com tarefas, do menos para o mais recente
+
+
+class ProjectRepository:
+    """Cache em memória do snapshot, validado pelo mtime/tamanho do arquivo"""
+
+    def __init__(self, caminho=None):
+        self.caminho = caminho  # None = o snapshot mais recente (binário ou JSON)
+        self._versao = None  # Versão publicada
+        self._trava = threading.Lock()
+        self._fixada = threading.local()  # Versão presa pela thread em fixado()
+        self._observador = None
+        self._parar = threading.Event()
+        self.geracao = 0  # Sobe a cada versão publicada
+        self.total_cargas = 0
+        self.total_acertos = 0
+        self.total_cargas_tarefas = 0
+
+    @staticmethod
+    def _assinatura(caminho):
+        # O dia entra junto: na virada os fatos (atrasos, próximo marco) são refeitos para hoje
+        estado = os.stat(caminho)
+        return (os.path.abspath(caminho), estado.st_mtime_ns, estado.st_size, date.today())
+
+    def _ler_disco(self):
+        """(caminho, assinatura) do snapshot no disco agora. FileNotFoundError se não há."""
+        caminho = self.caminho or caminho_snapshot()
+        return caminho, self._assinatura(caminho)
+
+    def _publicar(self, versao):
+        """Troca a versão publicada (chamar com a trava)"""
+        self.geracao += 1
+        versao.geracao = self.geracao
+        self._versao = versao
+
+    def _atual(self):
+        """Versão para esta chamada: a fixada pela thread; com o observador ligado,
+        a publicada (as trocas são dele); senão, a do arquivo no disco agora.
+        None se não há snapshot."""
+        fixada = getattr(self._fixada, "versao", None)
+        if fixada is not None:
+            return fixada
+        if self._observador is not None and self._versao is not None:
+            return self._versao
+        try:
+            caminho, assinatura = self._ler_disco()
+        except FileNotFoundError:
+            with self._trava:
+                self._versao = None
+            return None
+        with self._trava:
+            if self._versao is None or self._versao.assinatura != assinatura:
+                self._publicar(_Versao(caminho, assinatura))
+            return self._versao
+
+    def _carregar(self, versao, com_tarefas):
+        """(projetos, leitor) da versão, sem publicar nada: a tupla congelada de projetos e,
+        se vieram só os cabeçalhos do arquivo, o leitor das tarefas sob demanda (senão None)"""
+        completo = versao.projetos.get(True)
+        if not com_tarefas and completo is not None:
+            # Já temos tudo em memória: só os cabeçalhos saem de graça
+            return tuple(SomenteLeitura((k, v) for k, v in p.items() if k != "tasks") for p in completo), None
+        with self._trava:
+            self.total_cargas += 1
+        if com_tarefas:
+            return tuple(map(_congelar_projeto, carregar_projetos(versao.caminho, com_tarefas=True))), None
+        # Só cabeçalhos: o leitor guarda o resto comprimido para as tarefas sob demanda
+        leitor = SnapshotSobDemanda(versao.caminho)
+        return tuple(map(_congelar_projeto, leitor.cabecalhos)), leitor
+
+    def _projetos_da(self, versao, com_tarefas):
+        with self._trava:
+            projetos = versao.projetos.get(com_tarefas)
+            if projetos is not None:
+                self.total_acertos += 1
+                return projetos
+        # Fora da trava: ler o snapshot inteiro não segura as consultas das outras threads.
+        # Se duas carregarem juntas, fica a primeira que publicar (e o leitor dela).
+        projetos, leitor = self._carregar(versao, com_tarefas)
+        with self._trava:
+            publicado = versao.projetos.setdefault(com_tarefas, projetos)
+            if publicado is projetos and leitor is not None:
+                versao.leitor = leitor
+            return publicado
+
+    def assinatura(self):
+        """Identifica a versão em uso (muda a cada sync). None se não há snapshot."""
+        versao = self._atual()
+        return versao.assinatura if versao else None
+
+    def projetos(self, com_tarefas=True):
+        """Tupla de projetos somente leitura. Vazia se ainda não houve sync.
+        com_tarefas=False dispensa as tarefas (bem mais rápido no snapshot binário);
+        com_tarefas=True põe as tarefas de todos os projetos em memória, então quem
+        só precisa de alguns deve preferir os cabeçalhos + por_id().
+        ValueError se o arquivo está corrompido."""
+        versao = self._atual()
+        if versao is None:
+            return ()
+        return self._projetos_da(versao, com_tarefas)
+
+    def _indexado(self, versao, com_tarefas):
+        indexado = versao.por_id.get(com_tarefas)
+        if indexado is None:
+            projetos = self._projetos_da(versao, com_tarefas)
+            with self._trava:
+                indexado = versao.por_id.setdefault(com_tarefas, {str(p.get("id")): p for p in projetos})
+        return indexado
+
+    def _com_tarefas(self, versao, proj_id):
+        """Projeto com as tarefas montadas só para ele. Os últimos pedidos ficam
+        em memória (LRU de Config.TAREFAS_EM_MEMORIA projetos)."""
+        with self._trava:
+            projeto = versao.com_tarefas.get(proj_id)
+            if projeto is not None:
+                versao.com_tarefas.move_to_end(proj_id)
+                self.total_acertos += 1
+                return projeto
+        cabecalho = self._indexado(versao, False).get(proj_id)
+        if cabecalho is None:
+            return None
+        if versao.leitor is None:
+            # A versão foi carregada inteira (projetos(com_tarefas=True)): já está tudo em memória
+            return self._indexado(versao, True).get(proj_id)
+        if versao.posicao is None:
+            versao.posicao = {str(p.get("id")): i for i, p in enumerate(versao.projetos[False])}
+
+        # Fora da trava: só o bloco deste projeto é descomprimido
+        tarefas = versao.leitor.tarefas(versao.posicao[proj_id])
+        projeto = dict(cabecalho)
+        if tarefas is not None:
+            projeto["tasks"] = tuple(tarefas)
+        projeto = SomenteLeitura(projeto)
+        with self._trava:
+            self.total_cargas_tarefas += 1
+            projeto = versao.com_tarefas.setdefault(proj_id, projeto)
+            versao.com_tarefas.move_to_end(proj_id)
+            while len(versao.com_tarefas) > Config.TAREFAS_EM_MEMORIA:
+                versao.com_tarefas.popitem(last=False)
+        return projeto
+
+    def por_id(self, proj_id, com_tarefas=True):
+        """Um projeto pelo id do Zoho, ou None. Com tarefas, só as desse projeto
+        são carregadas (a não ser que a versão já esteja inteira em memória)."""
+        versao = self._atual()
+        if versao is None:
+            return None
+        if com_tarefas and True not in versao.projetos:
+            return self._com_tarefas(versao, str(proj_id))
+        return self._indexado(versao, com_tarefas).get(str(proj_id))
+
+    def tarefas(self, proj_id):
+        """Tupla de tarefas de um projeto (carregadas sob demanda), ou None"""
+        projeto = self.por_id(proj_id, com_tarefas=True)
+        return None if projeto is None else projeto.get("tasks")
+
+    def indice_nomes(self):
+        """Índice invertido dos nomes (name_index.IndiceNomes) da versão em uso.
+        Só é remontado quando o snapshot muda (com o observador, em segundo plano)."""
+        versao = self._atual()
+        if versao is None:
+            return IndiceNomes(())
+        if versao.indice_nomes is None:
+            projetos = versao.projetos.get(False) or versao.projetos.get(True) or self._projetos_da(versao, False)
+            with self._trava:
+                if versao.indice_nomes is None:
+                    versao.indice_nomes = IndiceNomes(projetos)
+        return versao.indice_nomes
+
+    @contextmanager
+    def fixado(self):
+        """Dentro do bloco, esta thread vê sempre a mesma versão do snapshot:
+        uma resposta nunca mistura a versão antiga com a nova."""
+        anterior = getattr(self._fixada, "versao", None)
+        self._fixada.versao = anterior or self._atual()
+        try:
+            yield self
+        finally:
+            self._fixada.versao = anterior
+
+    def recarregar(self):
+        """Prepara a versão nova do snapshot (se houver) sem travar quem está lendo e
+        publica tudo de uma vez: os projetos nos formatos que já estavam em uso e o
+        índice de nomes. True se trocou de versão."""
+        try:
+            caminho, assinatura = self._ler_disco()
+        except FileNotFoundError:
+            return False
+        with self._trava:
+            atual = self._versao
+            if atual is not None and atual.assinatura == assinatura and atual.projetos:
+                return False
+            # Com tarefas primeiro: os cabeçalhos saem dele sem reler o arquivo
+            formatos = sorted(atual.projetos, reverse=True) if atual and atual.projetos else [False]
+
+        nova = _Versao(caminho, assinatura)
+        for com_tarefas in formatos:
+            nova.projetos[com_tarefas], leitor = self._carregar(nova, com_tarefas)
+            nova.leitor = leitor or nova.leitor
+        nova.indice_nomes = IndiceNomes(nova.projetos[False] if False in nova.projetos else nova.projetos[True])
+        if self._assinatura(caminho) != assinatura:
+            return False  # O arquivo trocou de novo durante a carga: fica para a próxima volta
+
+        with self._trava:
+            self._publicar(nova)
+        return True
+
+    def observar(self, intervalo=None):
+        """Liga a recarga em segundo plano (chamar de novo não faz nada).
+        A cada `intervalo` segundos confere o arquivo e, se mudou, chama recarregar()."""
+        with self._trava:
+            if self._observador is not None:
+                return
+            self._parar.clear()
+            self._observador = threading.Thread(
+                target=self._observar, args=(intervalo or Config.SNAPSHOT_OBSERVAR_SEGUNDOS,),
+                name="repositorio-observador", daemon=True)
+        try:
+            self.recarregar()  # Já começa com a versão atual pronta
+        except ValueError as e:
+            print(f"⚠️ Snapshot ilegível, aguardando a próxima sync: {e}")
+        self._observador.start()
+
+    def _observar(self, intervalo):
+        while not self._parar.wait(intervalo):
+            try:
+                self.recarregar()
+            except (OSError, ValueError) as e:
+                # Arquivo ilegível: segue respondendo com a versão que já está publicada
+                print(f"⚠️ Recarga do snapshot falhou, mantendo a geração {self.geracao}: {e}")
+
+    def parar_observador(self):
+        with self._trava:
+            observador, self._observador = self._observador, None
+        if observador is not None:
+            self._parar.set()
+            observador.join()
+
+    def estatisticas(self):
+        versao = self._versao
+        return {"cargas": self.total_cargas, "acertos": self.total_acertos, "geracao": self.geracao,
+                "cargas_tarefas": self.total_cargas_tarefas,
+                "tarefas_em_memoria": len(versao.com_tarefas) if versao else 0}
+
+
+# Singleton global: um cache por processo, dividido por todos os módulos
+_repositorio_instance = None
+_repositorio_trava = threading.Lock()
+
+def get_repositorio():
+    """Retorna o repositório de projetos do processo"""
+    global _repositorio_instance
+    with _repositorio_trava:
+        if _repositorio_instance is None:
+            _repositorio_instance = ProjectRepository()
+    return _repositorio_instance
+
+
+def com_snapshot_fixo(funcao):
+    """Decorador para a entrada de uma resposta (ex.: brain.analisar):
+    a chamada inteira enxerga uma única versão do snapshot."""
+    @functools.wraps(funcao)
+    def fixada(*args, **kwargs):
+        with get_repositorio().fixado():
+            return funcao(*args, **kwargs)
+    return fixada
@@ -26,7 +26,7 @@ def gerar_relatorio_semanal():
     )
     
     # O cérebro vai pensar e devolver o texto
-    relatorio_texto = brain.analisar(prompt_relatorio)
+    relatorio_texto = brain.analisar(prompt_relatorio, consulta_local=False)
     
     # Pequeno ajuste para garantir que o HTML fique bonito no e-mail
     # O Gemini às vezes devolve Markdown (**), vamos converter para HTML (<b>)
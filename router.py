@@ -17,10 +17,12 @@ CATEGORIAS PERMITIDAS:
 - "CONSULTA_ZOHO": Perguntas sobre status de projetos, cronogramas, atrasos ou resumo de clientes.
 - "ACAO_SISTEMA": Comandos imperativos para realizar ações (enviar whatsapp, enviar email, clicar, digitar, fechar app).
 - "MEMORIA": Comandos explícitos para guardar uma anotação ("anote que", "lembre-se de").
+- "BUSCA_MEMORIA": Perguntas para encontrar algo já anotado ("onde anotei sobre...", "o que eu anotei do servidor?").
 
 REGRAS:
 - Retorne APENAS um objeto JSON válido. Nenhuma palavra a mais.
 - Se identificar um nome de cliente ou projeto, coloque na lista "projetos_mencionados".
+- Em "BUSCA_MEMORIA", coloque em "termos_busca" as palavras do assunto procurado (ex.: "servidor Unimed").
 
 EXEMPLO DE SAÍDA ESPERADA:
 {
@@ -1,6 +1,6 @@
 import os
-import requests
 from dotenv import load_dotenv
+from zoho_http import get_http
 
 # Carrega suas chaves do arquivo .env
 load_dotenv()
@@ -31,7 +31,7 @@ def gerar_refresh_token():
     }
 
     try:
-        response = requests.post(TOKEN_URL, data=params)
+        response = get_http().post(TOKEN_URL, data=params)
         dados = response.json()
 
         if "refresh_token" in dados:
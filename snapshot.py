@@ -0,0 +1,376 @@
+"""
+Snapshot dos projetos (db_projetos.apx / db_projetos.json)
+O arquivo é escrito projeto a projeto num temporário e só substitui o
+oficial no final (os.replace é atômico). Quem lê nunca vê um arquivo pela metade.
+
+Dois formatos:
+- JSON (legado/exportação): uma lista de projetos, cada tarefa repetindo as chaves.
+- Binário compacto (.apx): as tarefas viram linhas de índices numa tabela de
+  valores únicos (status, fase, prioridade, datas... aparecem uma vez só).
+  Cada projeto tem o seu bloco, com a sua tabela, para que as tarefas de um
+  projeto possam ser lidas sem descomprimir as dos outros:
+      APXSNAP\\x02 | offset do índice (uint64) | blocos zlib | índice zlib
+  bloco   = tipo dos índices (H/I) | tamanho da tabela (uint32) | tabela JSON | índices uint16/uint32
+  índice  = JSON {"esquemas": [[chaves]], "projetos": [cabeçalhos]}
+  Cada cabeçalho guarda "_tarefas": [[esquema, quantidade], ...] no lugar de "tasks"
+  e "_bloco": [offset, tamanho] do seu bloco.
+  (Arquivos APXSNAP\\x01, com um corpo só para todas as tarefas, continuam legíveis.)
+
+Quem lê usa carregar_projetos(): detecta o formato pelo conteúdo do arquivo.
+Quem só quer as tarefas de alguns projetos usa SnapshotSobDemanda.
+
+Uso direto:
+    python snapshot.py exportar [destino.json]       -> binário atual para JSON
+    python snapshot.py converter origem [destino]     -> JSON <-> binário (pela extensão do destino)
+"""
+
+import json
+import os
+import struct
+import sys
+import zlib
+from array import array
+from config import Config
+
+MAGICO = b"APXSNAP\x01"  # Corpo único (legado, só leitura)
+MAGICO_BLOCOS = b"APXSNAP\x02"
+_CABECALHO = struct.Struct("<8sQQ")  # mágico, offset dos valores, offset do índice
+_CABECALHO_BLOCOS = struct.Struct("<8sQ")  # mágico, offset do índice
+_BLOCO = struct.Struct("<cI")  # tipo dos índices (H/I), tamanho da tabela
+_AUSENTE = object()  # Projeto gravado sem a chave "tasks"
+
+
+class SnapshotCorrompido(ValueError):
+    """O arquivo binário está truncado ou não é um snapshot"""
+
+
+class _EscritorAtomico:
+    """Base dos escritores: temporário + os.replace no final"""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.temporario = f"{caminho}.{os.getpid()}.tmp"
+        self.total = 0
+        self._arquivo = None
+
+    def __enter__(self):
+        self._arquivo = open(self.temporario, "wb")
+        self._abrir()
+        return self
+
+    def escrever(self, projeto):
+        """Grava um projeto já pronto. Devolve o JSON compacto dele (usado pelo checkpoint)."""
+        texto = json.dumps(projeto, ensure_ascii=False, separators=(",", ":"))
+        self._gravar(projeto, texto)
+        self.total += 1
+        return texto
+
+    def __exit__(self, tipo_erro, erro, tb):
+        try:
+            if tipo_erro is None:
+                self._fechar()
+                self._arquivo.flush()
+                os.fsync(self._arquivo.fileno())
+        finally:
+            self._arquivo.close()
+
+        if tipo_erro is None:
+            os.replace(self.temporario, self.caminho)
+        elif os.path.exists(self.temporario):
+            os.remove(self.temporario)
+        return False
+
+
+class EscritorSnapshot(_EscritorAtomico):
+    """Snapshot em JSON compacto. Uso:
+        with EscritorSnapshot("db_projetos.json") as escritor:
+            for projeto in projetos:
+                escritor.escrever(projeto)
+    Se der exceção dentro do bloco, o temporário é apagado e o arquivo antigo fica intacto."""
+
+    def _abrir(self):
+        self._arquivo.write(b"[")
+
+    def _gravar(self, projeto, texto):
+        if self.total:
+            self._arquivo.write(b",\n")
+        self._arquivo.write(texto.encode("utf-8"))
+
+    def _fechar(self):
+        self._arquivo.write(b"]\n")
+
+
+class EscritorSnapshotBinario(_EscritorAtomico):
+    """Snapshot no formato compacto (.apx), mesma interface do EscritorSnapshot.
+    As tarefas de cada projeto vão comprimidas para o disco num bloco próprio
+    conforme chegam; em memória só ficam os cabeçalhos dos projetos."""
+
+    def _abrir(self):
+        self._arquivo.write(_CABECALHO_BLOCOS.pack(MAGICO_BLOCOS, 0))  # Offset é preenchido no final
+        self._esquemas = []
+        self._id_esquema = {}
+        self._cabecalhos = []
+
+    def _gravar(self, projeto, texto):
+        cabecalho = {k: v for k, v in projeto.items() if k != "tasks"}
+        tarefas = projeto.get("tasks")
+        if "tasks" not in projeto or tarefas is None:
+            if "tasks" in projeto:
+                cabecalho["_tarefas"] = None
+        else:
+            grupos = []  # [[esquema, quantidade]] de tarefas seguidas com as mesmas chaves
+            valores = []
+            id_valor = {}
+            ids = []
+            for tarefa in tarefas:
+                chaves = tuple(tarefa)
+                esquema = self._id_esquema.get(chaves)
+                if esquema is None:
+                    esquema = self._id_esquema[chaves] = len(self._esquemas)
+                    self._esquemas.append(chaves)
+                if grupos and grupos[-1][0] == esquema:
+                    grupos[-1][1] += 1
+                else:
+                    grupos.append([esquema, 1])
+                for valor in tarefa.values():
+                    # A chave inclui o tipo: 1, 1.0 e True não podem virar o mesmo valor
+                    try:
+                        ids.append(id_valor[type(valor), valor])
+                    except KeyError:
+                        ids.append(id_valor.setdefault((type(valor), valor), len(valores)))
+                        valores.append(valor)
+                    except TypeError:
+                        # Lista/dict dentro da tarefa (raro) não é compartilhado: ganha uma entrada própria
+                        ids.append(len(valores))
+                        valores.append(valor)
+            tabela = json.dumps(valores, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            ids = array("H" if len(valores) <= 0xFFFF else "I", ids)  # A tabela de um projeto é pequena
+            if sys.byteorder == "big":
+                ids.byteswap()
+            bloco = zlib.compress(_BLOCO.pack(ids.typecode.encode(), len(tabela)) + tabela + ids.tobytes(), 6)
+            cabecalho["_tarefas"] = grupos
+            cabecalho["_bloco"] = [self._arquivo.tell(), len(bloco)]
+            self._arquivo.write(bloco)
+        self._cabecalhos.append(cabecalho)
+
+    def _fechar(self):
+        offset_indice = self._arquivo.tell()
+        self._arquivo.write(self._comprimir_json({"esquemas": self._esquemas, "projetos": self._cabecalhos}))
+        self._arquivo.seek(0)
+        self._arquivo.write(_CABECALHO_BLOCOS.pack(MAGICO_BLOCOS, offset_indice))
+        self._arquivo.seek(0, os.SEEK_END)
+
+    @staticmethod
+    def _comprimir_json(objeto):
+        texto = json.dumps(objeto, ensure_ascii=False, separators=(",", ":"))
+        return zlib.compress(texto.encode("utf-8"), 6)
+
+
+def abrir_escritor(caminho):
+    """Escritor certo para o caminho: .json -> JSON, qualquer outro -> binário"""
+    if caminho.lower().endswith(".json"):
+        return EscritorSnapshot(caminho)
+    return EscritorSnapshotBinario(caminho)
+
+
+def _construtor_tarefa(chaves):
+    """Função que monta o dict de uma tarefa a partir dos valores posicionais.
+    Um literal {chave: valor} gerado por esquema sai ~2x mais rápido que dict(zip(...)),
+    e é aqui que a carga gasta a maior parte do tempo."""
+    if not chaves:
+        return lambda: {}
+    parametros = ", ".join(f"v{i}" for i in range(len(chaves)))
+    corpo = ", ".join(f"{chave!r}: v{i}" for i, chave in enumerate(chaves))
+    return eval(f"lambda {parametros}: {{{corpo}}}", {})
+
+
+def _montar_tarefas(grupos, valores, esquemas, pos=0):
+    """Tarefas de um projeto a partir dos valores posicionais, começando em `pos`.
+    Devolve (tarefas, posição logo depois da última usada)."""
+    tarefas = []
+    for esquema, quantidade in grupos:
+        largura, construtor = esquemas[esquema]
+        if largura:
+            fim = pos + largura * quantidade
+            tarefas.extend(map(construtor, *[iter(valores[pos:fim])] * largura))
+            pos = fim
+        else:
+            tarefas.extend(construtor() for _ in range(quantidade))
+    return tarefas, pos
+
+
+def _construir_esquemas(indice):
+    return [(len(chaves), _construtor_tarefa([str(c) for c in chaves])) for chaves in indice["esquemas"]]
+
+
+def _ler_binario(dados, com_tarefas):
+    """Formato antigo (APXSNAP\\x01): um corpo e uma tabela de valores para todos os projetos"""
+    if len(dados) < _CABECALHO.size:
+        raise SnapshotCorrompido("arquivo menor que o cabeçalho")
+    _, offset_valores, offset_indice = _CABECALHO.unpack_from(dados)
+    dados = memoryview(dados)  # Fatias sem cópia
+    try:
+        indice = json.loads(zlib.decompress(dados[offset_indice:]))
+        if not com_tarefas:
+            # Só os cabeçalhos: corpo e tabela de valores (quase todo o arquivo) nem são lidos
+            for projeto in indice["projetos"]:
+                projeto.pop("_tarefas", None)
+            return indice["projetos"]
+        ids = array("I")
+        ids.frombytes(zlib.decompress(dados[_CABECALHO.size:offset_valores]))
+        if sys.byteorder == "big":
+            ids.byteswap()
+        tabela = json.loads(zlib.decompress(dados[offset_valores:offset_indice]))
+        valores = list(map(tabela.__getitem__, ids))
+        esquemas = _construir_esquemas(indice)
+    except (zlib.error, ValueError, IndexError, KeyError) as e:
+        raise SnapshotCorrompido(f"snapshot binário ilegível: {e}") from e
+
+    projetos = indice["projetos"]
+    pos = 0
+    for projeto in projetos:
+        if "_tarefas" not in projeto:
+            continue
+        grupos = projeto.pop("_tarefas")
+        if grupos is None:
+            projeto["tasks"] = None
+            continue
+        projeto["tasks"], pos = _montar_tarefas(grupos, valores, esquemas, pos)
+    if pos != len(valores):
+        raise SnapshotCorrompido("quantidade de tarefas não bate com o índice")
+    return projetos
+
+
+def _ler_indice_blocos(dados):
+    """(esquemas, cabeçalhos) de um snapshot em blocos, sem abrir nenhum bloco"""
+    if len(dados) < _CABECALHO_BLOCOS.size:
+        raise SnapshotCorrompido("arquivo menor que o cabeçalho")
+    _, offset_indice = _CABECALHO_BLOCOS.unpack_from(dados)
+    try:
+        indice = json.loads(zlib.decompress(dados[offset_indice:]))
+        return _construir_esquemas(indice), indice["projetos"]
+    except (zlib.error, ValueError, KeyError, TypeError) as e:
+        raise SnapshotCorrompido(f"snapshot binário ilegível: {e}") from e
+
+
+def _tarefas_do_bloco(dados, grupos, bloco, esquemas):
+    """Tarefas de um projeto: descomprime só o bloco dele"""
+    offset, tamanho = bloco
+    try:
+        bruto = zlib.decompress(dados[offset:offset + tamanho])
+        tipo, fim_tabela = _BLOCO.unpack_from(bruto)
+        fim_tabela += _BLOCO.size
+        tabela = json.loads(bruto[_BLOCO.size:fim_tabela])
+        ids = array(tipo.decode())
+        ids.frombytes(bruto[fim_tabela:])
+        if sys.byteorder == "big":
+            ids.byteswap()
+        tarefas, pos = _montar_tarefas(grupos, list(map(tabela.__getitem__, ids)), esquemas)
+    except (zlib.error, struct.error, ValueError, IndexError, TypeError) as e:
+        raise SnapshotCorrompido(f"bloco de tarefas ilegível: {e}") from e
+    if pos != len(ids):
+        raise SnapshotCorrompido("quantidade de tarefas não bate com o índice")
+    return tarefas
+
+
+def _ler_blocos(dados, com_tarefas):
+    dados = memoryview(dados)  # Fatias sem cópia
+    esquemas, projetos = _ler_indice_blocos(dados)
+    for projeto in projetos:
+        grupos = projeto.pop("_tarefas", _AUSENTE)
+        bloco = projeto.pop("_bloco", None)
+        if not com_tarefas or grupos is _AUSENTE:
+            continue
+        projeto["tasks"] = None if grupos is None else _tarefas_do_bloco(dados, grupos, bloco, esquemas)
+    return projetos
+
+
+def _decodificar(dados, com_tarefas):
+    if dados.startswith(MAGICO_BLOCOS):
+        return _ler_blocos(dados, com_tarefas)
+    if dados.startswith(MAGICO):
+        return _ler_binario(dados, com_tarefas)
+    projetos = json.loads(dados)
+    if not com_tarefas:
+        for projeto in projetos:
+            projeto.pop("tasks", None)
+    return projetos
+
+
+def caminho_snapshot():
+    """Snapshot mais recente entre o binário e o JSON configurados (o que existir).
+    Levanta FileNotFoundError se nenhum dos dois existe."""
+    candidatos = [c for c in (Config.SNAPSHOT_PROJETOS, Config.SNAPSHOT_JSON) if os.path.exists(c)]
+    if not candidatos:
+        raise FileNotFoundError(Config.SNAPSHOT_PROJETOS)
+    return max(candidatos, key=os.path.getmtime)
+
+
+def carregar_projetos(caminho=None, com_tarefas=True):
+    """Lista de projetos do snapshot, em qualquer dos formatos.
+    com_tarefas=False devolve só os cabeçalhos (sem a chave "tasks"), bem mais rápido no binário.
+    FileNotFoundError se não há snapshot; ValueError se o arquivo está corrompido."""
+    with open(caminho or caminho_snapshot(), "rb") as f:
+        dados = f.read()
+    return _decodificar(dados, com_tarefas)
+
+
+class SnapshotSobDemanda:
+    """Cabeçalhos carregados na hora; as tarefas de cada projeto só são montadas
+    quando pedidas (tarefas(posicao)). O arquivo fica em memória ainda comprimido,
+    então uma sync pode trocar o arquivo no disco sem afetar quem está lendo.
+    Snapshots sem blocos (JSON, APXSNAP\\x01) carregam todas as tarefas de uma vez
+    no primeiro pedido: rode uma sync (ou `converter`) para ganhar a carga sob demanda."""
+
+    def __init__(self, caminho=None):
+        self.caminho = caminho or caminho_snapshot()
+        with open(self.caminho, "rb") as f:
+            dados = f.read()
+        self.em_blocos = dados.startswith(MAGICO_BLOCOS)
+        self._prontas = None  # Formatos sem blocos: tarefas de todos, depois do primeiro pedido
+        if self.em_blocos:
+            self._dados = memoryview(dados)
+            self._esquemas, self.cabecalhos = _ler_indice_blocos(self._dados)
+            self._blocos = [(p.pop("_tarefas", None), p.pop("_bloco", None)) for p in self.cabecalhos]
+        else:
+            self._dados = dados
+            self.cabecalhos = _decodificar(dados, com_tarefas=False)
+
+    def __len__(self):
+        return len(self.cabecalhos)
+
+    def tarefas(self, posicao):
+        """Lista nova com as tarefas do projeto na posição `posicao` do snapshot,
+        ou None se ele não tem tarefas gravadas. ValueError se o bloco está corrompido."""
+        if not self.em_blocos:
+            if self._prontas is None:
+                self._prontas = [p.get("tasks") for p in _decodificar(self._dados, com_tarefas=True)]
+            tarefas = self._prontas[posicao]
+            return None if tarefas is None else list(tarefas)
+        grupos, bloco = self._blocos[posicao]
+        if grupos is None:
+            return None
+        return _tarefas_do_bloco(self._dados, grupos, bloco, self._esquemas)
+
+
+def converter(origem, destino):
+    """Regrava um snapshot no formato do destino. Devolve quantos projetos foram gravados."""
+    projetos = carregar_projetos(origem)
+    with abrir_escritor(destino) as escritor:
+        for projeto in projetos:
+            escritor.escrever(projeto)
+    return escritor.total
+
+
+if __name__ == "__main__":
+    comando = sys.argv[1] if len(sys.argv) > 1 else ""
+    if comando == "exportar":
+        destino = sys.argv[2] if len(sys.argv) > 2 else Config.SNAPSHOT_JSON
+        total = converter(Config.SNAPSHOT_PROJETOS, destino)
+        print(f"📤 {total} projetos exportados para '{destino}'.")
+    elif comando == "converter" and len(sys.argv) > 2:
+        destino = sys.argv[3] if len(sys.argv) > 3 else Config.SNAPSHOT_PROJETOS
+        total = converter(sys.argv[2], destino)
+        print(f"🔁 {total} projetos convertidos: '{sys.argv[2]}' -> '{destino}'.")
+    else:
+        print(__doc__)
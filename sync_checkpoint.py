@@ -0,0 +1,95 @@
+"""
+Checkpoint da sincronização com o Zoho
+Cada projeto baixado é anotado num diário (uma linha por projeto) assim que
+fica pronto. Se a sync morrer no meio, 'python zoho_sync.py --resume' continua
+a mesma geração e só baixa o que faltou.
+
+Formato do arquivo:
+    #geracao<TAB>id_da_geracao<TAB>criado_em(epoch)
+    id_projeto<TAB>versao<TAB>json_compacto_do_projeto
+"""
+
+import os
+import time
+import uuid
+
+
+class CheckpointSync:
+    def __init__(self, caminho, validade_horas):
+        self.caminho = caminho
+        self.validade_seg = validade_horas * 3600
+        self.geracao = None
+        self.criado_em = None
+        self.concluidos = {}  # id -> (versao, offset da linha no arquivo)
+        self._fim_valido = 0  # Onde termina a última linha inteira (o resto é sobra de um crash)
+        self._arquivo = None
+
+    def carregar(self):
+        """Lê o checkpoint de uma sync interrompida. True se dá para retomar."""
+        self.concluidos = {}
+        if not os.path.exists(self.caminho):
+            return False
+
+        with open(self.caminho, "rb") as f:
+            cabecalho = f.readline().decode("utf-8").rstrip("\n").split("\t")
+            if len(cabecalho) != 3 or cabecalho[0] != "#geracao":
+                return False
+            self.geracao, self.criado_em = cabecalho[1], float(cabecalho[2])
+            if time.time() - self.criado_em > self.validade_seg:
+                print(f"⌛ Checkpoint da geração {self.geracao[:8]} expirou; começando do zero.")
+                return False
+
+            while True:
+                offset = f.tell()
+                linha = f.readline()
+                if not linha.endswith(b"\n"):
+                    break  # Fim do arquivo ou linha cortada pelo crash: ignora
+                try:
+                    proj_id, versao, _ = linha.decode("utf-8").split("\t", 2)
+                except ValueError:
+                    break  # Linha ilegível: dela em diante é descartado
+                self.concluidos[proj_id] = (versao, offset)
+            self._fim_valido = offset
+        return True
+
+    def iniciar(self, retomar):
+        """Abre o diário: continua a geração carregada ou começa uma nova"""
+        if retomar and self.geracao:
+            # Corta a linha que o crash deixou pela metade: a próxima não pode ser colada nela
+            with open(self.caminho, "r+b") as f:
+                f.truncate(self._fim_valido)
+            self._arquivo = open(self.caminho, "a", encoding="utf-8")
+            return
+
+        self.geracao = uuid.uuid4().hex
+        self.criado_em = time.time()
+        self.concluidos = {}
+        self._arquivo = open(self.caminho, "w", encoding="utf-8")
+        self._arquivo.write(f"#geracao\t{self.geracao}\t{self.criado_em}\n")
+        self._arquivo.flush()
+
+    def ler_projeto(self, proj_id, versao):
+        """JSON do projeto já baixado nesta geração, ou None se precisa baixar (ou mudou)"""
+        registro = self.concluidos.get(str(proj_id))
+        if registro is None or registro[0] != str(versao):
+            return None
+        with open(self.caminho, "rb") as f:
+            f.seek(registro[1])
+            linha = f.readline().decode("utf-8").rstrip("\n")
+        return linha.split("\t", 2)[2]
+
+    def registrar(self, proj_id, versao, json_projeto):
+        """Anota um projeto concluído. O flush garante que sobrevive à morte do processo."""
+        self._arquivo.write(f"{proj_id}\t{versao}\t{json_projeto}\n")
+        self._arquivo.flush()
+
+    def fechar(self):
+        if self._arquivo:
+            self._arquivo.close()
+            self._arquivo = None
+
+    def concluir(self):
+        """Sync terminou e o snapshot foi gravado: o checkpoint não serve mais"""
+        self.fechar()
+        if os.path.exists(self.caminho):
+            os.remove(self.caminho)
@@ -1,28 +1,22 @@
-import requests
 import json
 from config import Config
+from zoho_http import get_http
+from zoho_token import get_token_cache
+from repository import get_repositorio
 
 def investigar_projeto(project_id):
     print(f"🔍 Investigando o projeto ID: {project_id}...")
     
-    # 1. Pegar o Token de acesso
-    url_token = "https://accounts.zoho.com/oauth/v2/token"
-    params = {
-        "refresh_token": Config.ZOHO_REFRESH_TOKEN,
-        "client_id": Config.ZOHO_CLIENT_ID,
-        "client_secret": Config.ZOHO_CLIENT_SECRET,
-        "grant_type": "refresh_token"
-    }
-    
-    res_token = requests.post(url_token, data=params)
-    access_token = res_token.json().get("access_token")
+    # 1. Pegar o Token de acesso (cache compartilhado com o zoho_sync)
+    http = get_http()
+    access_token = get_token_cache().obter()
     
     # 2. Buscar APENAS os detalhes deste projeto específico
     base_url = f"https://projectsapi.zoho.com/restapi/portal/{Config.ZOHO_PORTAL_ID}"
     url_projeto = f"{base_url}/projects/{project_id}/"
     
     headers = {"Authorization": f"Bearer {access_token}"}
-    res_projeto = requests.get(url_projeto, headers=headers)
+    res_projeto = http.get(url_projeto, headers=headers)
     
     if res_projeto.status_code == 200:
         dados = res_projeto.json()
@@ -34,6 +28,14 @@ def investigar_projeto(project_id):
         # Imprime ABSOLUTAMENTE TUDO formatado
         print(json.dumps(projeto, indent=4, ensure_ascii=False))
         print("="*50 + "\n")
+
+        # 3. Compara com o que a última sync gravou localmente
+        local = get_repositorio().por_id(project_id, com_tarefas=False)
+        if local:
+            print("💾 NO SNAPSHOT LOCAL (última sync):")
+            print(json.dumps(local, indent=4, ensure_ascii=False))
+        else:
+            print("💾 Projeto não está no snapshot local (filtrado ou sync antiga).")
         
     else:
         print(f"❌ Erro na busca: {res_projeto.status_code}")
@@ -0,0 +1,51 @@
+"""
+Testes do Apex (pytest). Os módulos ficam na raiz do projeto, então ela entra no
+sys.path; nada aqui toca o Zoho real, o Gemini nem os arquivos de dados da raiz.
+
+    python -m pytest -q
+"""
+
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from config import Config
+from zoho_fake import OWNER_FAKE, FakeZohoServer, gerar_portfolio
+from zoho_http import ZohoHTTP
+from zoho_scheduler import ZohoScheduler
+from zoho_sync import ZohoSync
+from zoho_token import ZohoTokenCache
+
+
+@pytest.fixture
+def zoho_fake(monkeypatch):
+    """Zoho falso em thread com 12 projetos (1 a 3 páginas de tarefas cada), sem latência"""
+    projetos, tarefas = gerar_portfolio(n_projetos=12, n_tarefas=150, variacao=0.4)
+    monkeypatch.setattr(Config, "ZOHO_MY_USER_ID", OWNER_FAKE)
+    monkeypatch.setattr(Config, "SNAPSHOT_EXPORTAR_JSON", False)
+    with FakeZohoServer(projetos, tarefas, latencia=0) as fake:
+        yield fake
+
+
+@pytest.fixture
+def nova_sync(zoho_fake, tmp_path):
+    """Fábrica de ZohoSync apontado para o fake, gravando em tmp_path/db_projetos.apx"""
+    abertas = []
+
+    def criar(max_workers=1, paginas_em_voo=1):
+        agenda = ZohoScheduler(taxa=10000, rajada=10000, max_concorrencia=4, backoff_base=0.01)
+        http = ZohoHTTP(pool_maxsize=4, scheduler=agenda)
+        abertas.append(http)
+        tokens = ZohoTokenCache(caminho=str(tmp_path / "token.json"), url_token=zoho_fake.url_token, http=http)
+        return ZohoSync(base_url=zoho_fake.base_url, max_workers=max_workers,
+                        caminho_saida=str(tmp_path / "db_projetos.apx"), http=http, tokens=tokens,
+                        paginas_em_voo=paginas_em_voo)
+
+    yield criar
+    for http in abertas:
+        http.fechar()
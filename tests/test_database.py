@@ -0,0 +1,42 @@
+import sqlite3
+
+import pytest
+
+import database
+from database import DatabaseManager
+
+
+@pytest.fixture
+def db(tmp_path):
+    banco = DatabaseManager(str(tmp_path / "apex_memoria.db"))  # Absoluto: fica fora da raiz
+    yield banco
+    banco.fechar()
+
+
+def test_busca_acha_nota_gravada(db):
+    db.salvar_notas([("1", "Hospital São Lucas", "Servidor do PACS trocado pela TI", "01/10/2026 10:00"),
+                     ("2", "Clínica Rivelare", "Treinamento da recepção remarcado", "02/10/2026 11:00")])
+    achados = db.buscar_nas_notas("onde anotei sobre o servidor?")
+    assert [a["projeto_id"] for a in achados] == ["1"]
+    assert db.buscar_nas_notas("servid pacs")[0]["projeto"] == "Hospital São Lucas"  # Prefixo
+    assert db.buscar_nas_notas("recepcao")[0]["projeto_id"] == "2"  # Sem acento
+    assert db.buscar_nas_notas("rivelare")[0]["projeto_id"] == "2"  # Pelo nome do projeto
+
+
+def test_gatilhos_acompanham_update_e_delete(db):
+    if db.db_path in database._sem_busca_textual:
+        pytest.skip("SQLite sem FTS5: a busca usa LIKE e não há gatilhos")
+    db.salvar_notas([("1", "Hospital São Lucas", "Servidor do PACS trocado", "01/10/2026 10:00")])
+
+    def executar(sql, *parametros):
+        conn = sqlite3.connect(db.db_path)  # Por fora do DatabaseManager, como um editor do banco
+        with conn:
+            conn.execute(sql, parametros)
+        conn.close()
+
+    executar("UPDATE memorias_projetos SET nota = ? WHERE projeto_id = ?", "Impressora da recepção", "1")
+    assert db.buscar_nas_notas("servidor") == []
+    assert db.buscar_nas_notas("impressora")[0]["projeto_id"] == "1"
+
+    executar("DELETE FROM memorias_projetos WHERE projeto_id = ?", "1")
+    assert db.buscar_nas_notas("impressora") == []
@@ -0,0 +1,45 @@
+from name_index import IndiceNomes
+
+PROJETOS = [
+    {"id": "1", "name": "1001 - Hospital São Lucas"},
+    {"id": "2", "name": "1002 - Clínica Rivelare"},
+    {"id": "3", "name": "1003 - Santa Casa de Marília"},
+    {"id": "4", "name": "1004 - Santa Casa de Franca"},
+    {"id": "5", "name": "1005 - Radiologia Norte"},
+    {"id": "6", "name": "1006 - Radiologia Sul"},
+    {"id": "7", "name": "1007 - Neurocenter"},
+]
+
+
+def test_um_exato_decide():
+    indice = IndiceNomes(PROJETOS)
+    assert indice.resolver(["lucas"]) == ["1"]
+    assert indice.resolver("sao paulo lucas") == ["1"]  # Sem acento acha "São"
+
+
+def test_nome_mal_ouvido_vai_para_a_aproximada():
+    indice = IndiceNomes(PROJETOS)
+    assert indice.buscar(["rivelari"]) == []
+    assert indice.resolver(["rivelari"]) == ["2"]
+    assert indice.resolver(["neuro", "senter"]) == ["7"]
+
+
+def test_varios_exatos_sem_desempate_pergunta():
+    indice = IndiceNomes(PROJETOS)
+    assert indice.resolver(["santa", "casa"]) == ["3", "4"]
+
+
+def test_aproximada_so_desempata_entre_os_exatos():
+    indice = IndiceNomes(PROJETOS)
+    # "radiologia" acha os dois; "norti" desempata a favor do Norte
+    assert indice.resolver(["radiologia", "norti"]) == ["5"]
+    # "franka" lembra Franca, mas "marilia" já restringiu aos exatos: não troca por um de fora
+    assert indice.resolver(["marilia", "franka"]) == ["3"]
+
+
+def test_minimo_na_escrita_prefere_perguntar():
+    indice = IndiceNomes(PROJETOS)
+    assert indice.resolver(["rebelare"]) == ["2"]  # Na leitura, o único parecido responde
+    assert indice.resolver(["rebelare"], minimo=0.9) == []  # Ao anotar, nota baixa não decide
+    assert indice.resolver(["rivelari"], minimo=0.9) == ["2"]
+    assert indice.resolver(["zzzzzz"]) == []
@@ -0,0 +1,51 @@
+import subprocess
+import sys
+import textwrap
+import threading
+
+from conftest import RAIZ
+from database import DatabaseManager
+from note_queue import FilaNotas
+
+
+def test_fila_grava_tudo_ao_sair_do_processo(tmp_path):
+    """O processo sai logo depois de anotar: o atexit esvazia a fila antes de morrer"""
+    banco = str(tmp_path / "apex_memoria.db")
+    script = tmp_path / "anotar.py"
+    script.write_text(textwrap.dedent(f"""
+        import sys
+        sys.path.insert(0, {RAIZ!r})
+        import note_queue
+        from config import Config
+        from database import DatabaseManager
+        Config.NOTAS_ESPERA_SEGUNDOS = 60  # Sem o atexit, ficariam esperando o lote encher
+        note_queue.DatabaseManager = lambda: DatabaseManager({banco!r})
+        fila = note_queue.get_fila_notas()
+        for i in range(3):
+            fila.anotar("7", "Neurocenter", f"nota {{i}}")
+        print(fila.pendentes())
+    """), encoding="utf-8")
+
+    saida = subprocess.run([sys.executable, str(script)], capture_output=True, text=True, timeout=60)
+    assert saida.returncode == 0, saida.stderr
+    assert saida.stdout.strip().splitlines()[-1] != "0"  # Ainda não gravadas ao sair do script
+    notas = DatabaseManager(banco).buscar_notas_projeto("7")
+    assert sorted(n.split("] ", 1)[1] for n in notas) == ["nota 0", "nota 1", "nota 2"]
+
+
+def test_nao_gravadas_aparecem_antes_da_gravacao(tmp_path):
+    db = DatabaseManager(str(tmp_path / "apex_memoria.db"))
+    fila = FilaNotas(db=db, espera=60)
+    liberar = threading.Event()
+    fila.anotar("1", "Hospital", "primeira", preparar=lambda t: liberar.wait(10) and t)
+    fila.anotar("1", "Hospital", "segunda")
+
+    marca, nao_gravadas = fila.nao_gravadas()
+    assert marca == 0
+    assert [n[2] for n in nao_gravadas] == ["segunda", "primeira"]  # Mais novas primeiro
+    assert fila.pendentes() == 2
+
+    liberar.set()
+    assert fila.fechar(timeout=10)
+    assert fila.nao_gravadas() == (fila.lotes_gravados, [])
+    assert len(db.buscar_notas_projeto("1")) == 2
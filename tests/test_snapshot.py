@@ -0,0 +1,58 @@
+import pytest
+
+from snapshot import SnapshotCorrompido, SnapshotSobDemanda, abrir_escritor, carregar_projetos
+
+PROJETOS = [
+    {"id": "1", "name": "1001 - Hospital São Lucas", "percent_complete": "40",
+     "tasks": [{"name": "Kickoff", "status": "Fechado", "end_date": "01-10-2026"},
+               {"name": "Go-Live", "status": "Aberto", "end_date": "12-20-2026", "priority": "Alta"}]},
+    {"id": "2", "name": "1002 - Clínica Rivelare", "percent_complete": "0", "tasks": []},
+    {"id": "3", "name": "1003 - Sem tarefas gravadas", "percent_complete": "10"},
+    {"id": "4", "name": "1004 - Muitas", "percent_complete": "90",
+     "tasks": [{"name": f"T{i}", "status": "Aberto" if i % 3 else "Fechado"} for i in range(70000)]},
+]
+
+
+def _gravar(caminho):
+    with abrir_escritor(str(caminho)) as escritor:
+        for projeto in PROJETOS:
+            escritor.escrever(projeto)
+    return str(caminho)
+
+
+@pytest.mark.parametrize("nome", ["db_projetos.json", "db_projetos.apx"])
+def test_ida_e_volta(tmp_path, nome):
+    caminho = _gravar(tmp_path / nome)
+    assert carregar_projetos(caminho) == PROJETOS
+    cabecalhos = carregar_projetos(caminho, com_tarefas=False)
+    assert cabecalhos == [{k: v for k, v in p.items() if k != "tasks"} for p in PROJETOS]
+
+
+@pytest.mark.parametrize("nome", ["db_projetos.json", "db_projetos.apx"])
+def test_tarefas_sob_demanda(tmp_path, nome):
+    sob_demanda = SnapshotSobDemanda(_gravar(tmp_path / nome))
+    assert len(sob_demanda) == len(PROJETOS)
+    assert sob_demanda.em_blocos == nome.endswith(".apx")
+    assert sob_demanda.tarefas(1) == []
+    assert sob_demanda.tarefas(2) is None
+    assert sob_demanda.tarefas(0) == PROJETOS[0]["tasks"]
+    sob_demanda.tarefas(0).clear()  # Cada pedido devolve uma lista nova
+    assert sob_demanda.tarefas(0) == PROJETOS[0]["tasks"]
+
+
+def test_erro_no_meio_mantem_o_arquivo_anterior(tmp_path):
+    caminho = _gravar(tmp_path / "db_projetos.apx")
+    with pytest.raises(RuntimeError):
+        with abrir_escritor(caminho) as escritor:
+            escritor.escrever(PROJETOS[0])
+            raise RuntimeError("sync caiu")
+    assert carregar_projetos(caminho) == PROJETOS
+    assert [p.name for p in tmp_path.iterdir()] == ["db_projetos.apx"]
+
+
+def test_binario_truncado(tmp_path):
+    caminho = _gravar(tmp_path / "db_projetos.apx")
+    with open(caminho, "r+b") as f:
+        f.truncate(40)
+    with pytest.raises(SnapshotCorrompido):
+        carregar_projetos(caminho)
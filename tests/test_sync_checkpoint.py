@@ -0,0 +1,59 @@
+from sync_checkpoint import CheckpointSync
+
+
+def _diario(tmp_path):
+    return CheckpointSync(str(tmp_path / "db_projetos.apx.checkpoint"), validade_horas=1)
+
+
+def test_carregar_ignora_a_ultima_linha_cortada(tmp_path):
+    ck = _diario(tmp_path)
+    ck.iniciar(retomar=False)
+    ck.registrar("1", "v1", '{"id":"1"}')
+    ck.registrar("2", "v2", '{"id":"2"}')
+    ck.fechar()
+    with open(ck.caminho, "ab") as f:
+        f.write(b'3\tv3\t{"id":')  # Crash no meio da gravação
+
+    retomado = _diario(tmp_path)
+    assert retomado.carregar()
+    assert set(retomado.concluidos) == {"1", "2"}
+    assert retomado.ler_projeto("2", "v2") == '{"id":"2"}'
+    assert retomado.ler_projeto("2", "outra") is None  # Mudou desde então: baixa de novo
+
+
+def test_retomar_corta_a_sobra_antes_de_anotar(tmp_path):
+    ck = _diario(tmp_path)
+    ck.iniciar(retomar=False)
+    ck.registrar("1", "v1", '{"id":"1"}')
+    ck.fechar()
+    with open(ck.caminho, "ab") as f:
+        f.write(b"3\tv3\t{")
+
+    retomado = _diario(tmp_path)
+    assert retomado.carregar()
+    retomado.iniciar(retomar=True)
+    retomado.registrar("3", "v3", '{"id":"3"}')
+    retomado.fechar()
+
+    de_novo = _diario(tmp_path)
+    assert de_novo.carregar()
+    assert de_novo.geracao == retomado.geracao
+    assert {i: de_novo.ler_projeto(i, v) for i, v in (("1", "v1"), ("3", "v3"))} == {
+        "1": '{"id":"1"}', "3": '{"id":"3"}'}
+
+
+def test_checkpoint_expirado_nao_retoma(tmp_path):
+    ck = _diario(tmp_path)
+    ck.iniciar(retomar=False)
+    ck.registrar("1", "v1", '{"id":"1"}')
+    ck.fechar()
+
+    vencido = CheckpointSync(ck.caminho, validade_horas=0)
+    assert not vencido.carregar()
+
+
+def test_concluir_apaga_o_diario(tmp_path):
+    ck = _diario(tmp_path)
+    ck.iniciar(retomar=False)
+    ck.concluir()
+    assert not _diario(tmp_path).carregar()
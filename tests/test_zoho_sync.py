@@ -0,0 +1,124 @@
+import json
+import os
+
+from config import Config
+from snapshot import carregar_projetos
+from zoho_sync import ZohoSync
+
+
+def _tarefas_por_projeto(caminho):
+    return {p["id"]: len(p["tasks"]) for p in carregar_projetos(caminho)}
+
+
+def test_caminhos_padrao():
+    """ZohoSync() sem argumentos (o que zoho_sync.py e o botão do dashboard usam) monta os caminhos do Config"""
+    bot = ZohoSync()
+    assert bot.caminho_saida == Config.SNAPSHOT_PROJETOS
+    assert bot.caminho_sqlite == Config.SQLITE_PROJETOS
+    assert bot.caminho_estado == os.path.join(os.path.dirname(Config.SNAPSHOT_PROJETOS), "db_sync_estado.json")
+    assert bot.caminho_checkpoint == Config.SNAPSHOT_PROJETOS + ".checkpoint"
+
+
+def test_sync_completa_grava_todos_os_projetos(zoho_fake, nova_sync):
+    bot = nova_sync(max_workers=4, paginas_em_voo=2)
+    bot.sync_my_data()
+
+    esperado = {p["id"]: len(zoho_fake.tarefas[p["id"]]) for p in zoho_fake.projetos}
+    assert _tarefas_por_projeto(bot.caminho_saida) == esperado
+    assert os.path.exists(bot.caminho_sqlite)
+    assert not os.path.exists(bot.caminho_checkpoint)  # Sync concluída não deixa checkpoint
+
+
+def test_paginas_adiantadas_nao_passam_do_fim(zoho_fake, nova_sync):
+    """Com o task_count da listagem, adiantar páginas não pede nenhuma além da última"""
+    nova_sync(paginas_em_voo=1).sync_my_data()
+    serial = zoho_fake.estatisticas()["por_rota"]["tasks"]
+    zoho_fake.zerar_estatisticas()
+    nova_sync(paginas_em_voo=3).sync_my_data()
+    assert zoho_fake.estatisticas()["por_rota"]["tasks"] <= serial
+
+
+def test_incremental_so_baixa_projetos_alterados(zoho_fake, nova_sync):
+    nova_sync().sync_my_data()
+
+    zoho_fake.zerar_estatisticas()
+    bot = nova_sync()
+    bot.sync_my_data(incremental=True)
+    assert zoho_fake.estatisticas()["por_rota"]["tasks"] == 0
+    antes = carregar_projetos(bot.caminho_saida)
+
+    editados = zoho_fake.tocar(2)
+    zoho_fake.zerar_estatisticas()
+    bot = nova_sync()
+    bot.sync_my_data(incremental=True)
+    paginas = sum(-(-len(zoho_fake.tarefas[i]) // 100) for i in editados)
+    assert zoho_fake.estatisticas()["por_rota"]["tasks"] <= paginas + len(editados)
+
+    depois = {p["id"]: p for p in carregar_projetos(bot.caminho_saida)}
+    for proj in antes:
+        nome_1a = depois[proj["id"]]["tasks"][0]["name"]
+        assert nome_1a.endswith("(editada)") == (proj["id"] in editados)
+
+
+def test_erro_na_paginacao_mantem_o_snapshot_anterior(zoho_fake, nova_sync):
+    bot = nova_sync()
+    bot.sync_my_data()
+    with open(bot.caminho_saida, "rb") as f:
+        anterior = f.read()
+
+    del zoho_fake.tarefas[zoho_fake.projetos[5]["id"]]  # O fake responde 404 para ele
+    bot = nova_sync()
+    bot.sync_my_data()
+    with open(bot.caminho_saida, "rb") as f:
+        assert f.read() == anterior
+    assert os.path.exists(bot.caminho_checkpoint)  # Os 5 primeiros ficam para o --resume
+
+
+def test_retomar_do_checkpoint_com_ultima_linha_cortada(zoho_fake, nova_sync):
+    falho = zoho_fake.projetos[8]["id"]
+    tarefas_falho = zoho_fake.tarefas.pop(falho)
+    bot = nova_sync()
+    bot.sync_my_data()  # Aborta no 9º projeto (404)
+
+    with open(bot.caminho_checkpoint, "rb") as f:
+        linhas = f.read().splitlines()
+    salvos = [linha.split(b"\t", 1)[0].decode() for linha in linhas[1:]]
+    assert salvos == [p["id"] for p in zoho_fake.projetos[:8]]
+    with open(bot.caminho_checkpoint, "ab") as f:
+        f.write(b'9000099\t123\t{"id": "9000099", "na')  # Crash no meio de uma linha
+
+    zoho_fake.tarefas[falho] = tarefas_falho
+    zoho_fake.zerar_estatisticas()
+    bot = nova_sync()
+    bot.sync_my_data(retomar=True)
+
+    # Só os que faltavam foram baixados; a linha cortada não quebrou nada
+    baixados = zoho_fake.estatisticas()["por_rota"]["tasks"]
+    faltavam = zoho_fake.projetos[8:]
+    assert len(faltavam) <= baixados <= sum(-(-len(zoho_fake.tarefas[p["id"]]) // 100) + 1 for p in faltavam)
+    esperado = {p["id"]: len(zoho_fake.tarefas[p["id"]]) for p in zoho_fake.projetos}
+    assert _tarefas_por_projeto(bot.caminho_saida) == esperado
+    assert not os.path.exists(bot.caminho_checkpoint)
+
+
+def test_retomar_trunca_a_linha_cortada_antes_de_continuar(zoho_fake, nova_sync):
+    """A retomada que morre de novo deixa um diário legível (sem linha colada na cortada)"""
+    falho = zoho_fake.projetos[4]["id"]
+    tarefas_falho = zoho_fake.tarefas.pop(falho)
+    bot = nova_sync()
+    bot.sync_my_data()
+    with open(bot.caminho_checkpoint, "ab") as f:
+        f.write(b"9000099\t123\t{\"id\"")
+
+    zoho_fake.tarefas[falho] = tarefas_falho
+    del zoho_fake.tarefas[zoho_fake.projetos[9]["id"]]  # A retomada também aborta, mais adiante
+    bot = nova_sync()
+    bot.sync_my_data(retomar=True)
+
+    with open(bot.caminho_checkpoint, "rb") as f:
+        linhas = f.read().split(b"\n")
+    assert linhas[-1] == b""  # Termina numa linha inteira
+    for linha in linhas[1:-1]:
+        proj_id, _, corpo = linha.decode("utf-8").split("\t", 2)
+        assert json.loads(corpo)["id"] == proj_id
+    assert len(linhas[1:-1]) == 9
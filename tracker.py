@@ -1,15 +1,14 @@
 import json
 import os
 from datetime import datetime
+from repository import get_repositorio
+from project_analytics import comparar_percentuais
 
 ARQUIVO_HISTORICO = "db_historico_percentual.json"
-ARQUIVO_PROJETOS = "db_projetos.json"
 
-def carregar_projetos():
-    if not os.path.exists(ARQUIVO_PROJETOS):
-        return []
-    with open(ARQUIVO_PROJETOS, "r", encoding="utf-8") as f:
-        return json.load(f)
+def carregar_cabecalhos():
+    """Só nome e percentual interessam aqui: pula as tarefas"""
+    return get_repositorio().projetos(com_tarefas=False)
 
 def carregar_historico():
     if not os.path.exists(ARQUIVO_HISTORICO):
@@ -19,7 +18,7 @@ def carregar_historico():
 
 def salvar_snapshot():
     """Grava o % atual de todos os projetos para comparação futura"""
-    projetos = carregar_projetos()
+    projetos = carregar_cabecalhos()
     historico = carregar_historico()
     
     data_hoje = datetime.now().strftime("%d/%m/%Y")
@@ -45,41 +44,8 @@ def salvar_snapshot():
     print("✅ Histórico atualizado com sucesso!")
 
 def obter_comparativo():
-    """Retorna quem evoluiu e quem estagnou"""
-    projetos_atuais = carregar_projetos()
-    historico_antigo = carregar_historico()
-    
-    estagnados = []
-    evoluiram = []
-    
-    for p in projetos_atuais:
-        p_id = str(p.get('id'))
-        percent_atual = int(p.get('percent_complete', 0))
-        
-        # Busca dados antigos
-        dados_antigos = historico_antigo.get(p_id)
-        
-        if dados_antigos:
-            percent_anterior = int(dados_antigos.get('percent', 0))
-            delta = percent_atual - percent_anterior
-            
-            if delta == 0:
-                estagnados.append({
-                    "nome": p.get('name'),
-                    "percent": percent_atual
-                })
-            else:
-                evoluiram.append({
-                    "nome": p.get('name'),
-                    "antes": percent_anterior,
-                    "agora": percent_atual,
-                    "delta": delta
-                })
-        else:
-            # Projeto novo (não tinha histórico)
-            pass
-            
-    return estagnados, evoluiram
+    """Retorna quem evoluiu e quem estagnou (comparação vetorizada em project_analytics)"""
+    return comparar_percentuais(carregar_cabecalhos(), carregar_historico())
 
 if __name__ == "__main__":
     # Se rodar este arquivo direto, ele salva o estado atual
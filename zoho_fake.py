@@ -0,0 +1,339 @@
+"""
+Servidor Zoho Projects de mentira (local)
+Implementa o que o ZohoSync usa: OAuth (refresh_token), paginação de
+projetos e de tarefas. Latência, taxa de erro e cota (429) configuráveis,
+para medir a sync sem tocar no portal real.
+
+Uso direto (processo separado, como no benchmark_sync.py):
+    python zoho_fake.py --projetos 200 --tarefas 300 --latencia 0.03 --taxa-erro 0.02
+
+Rotas auxiliares (só do fake):
+    GET  /__stats          contadores de requests
+    POST /__reset_stats    zera os contadores
+    POST /__tocar?n=5      "edita" n projetos (muda last_modified e 1 tarefa)
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+PORTAL_FAKE = "portal-fake"
+OWNER_FAKE = "fake-owner"
+
+STATUS_PROJETO = ["Implantação", "Infra", "Homologação", "Virada", "Operação Assistida", "DEIP"]
+STATUS_TAREFA = ["Open", "In Progress", "Completed", "Closed", "Cancelled"]
+FASES = ["DEIP", "Infra", "Implantação netRIS", "Implantação PACS", "Homologação", "Virada", "OA"]
+CLIENTES = ["Unimed", "Hospital São Lucas", "Rivelare", "Clínica Vida", "Santa Casa", "Imagem Total",
+            "Diagnóstico Sul", "Radiologia Norte", "Cardio Center", "Hospital Regional"]
+
+
+def gerar_portfolio(n_projetos=50, n_tarefas=150, semente=42, variacao=0.0,
+                    fracao_outros_donos=0.0, fracao_encerrados=0.0):
+    """Gera projetos/tarefas no formato cru da API do Zoho.
+    variacao: 0.5 faz cada projeto ter entre 50% e 150% de n_tarefas.
+    As frações criam projetos de outro dono/encerrados, que a sync deve filtrar."""
+    rnd = random.Random(semente)
+    projetos = []
+    tarefas = {}
+    for i in range(n_projetos):
+        proj_id = str(9000000 + i)
+        if rnd.random() < fracao_encerrados:
+            status = rnd.choice(["Completed", "Cancelado", "Arquivado"])
+        else:
+            status = STATUS_PROJETO[i % len(STATUS_PROJETO)]
+        projetos.append({
+            "id": proj_id,
+            "name": f"{1000 + i} - {CLIENTES[i % len(CLIENTES)]} {i}",
+            "owner_id": "outro-gestor" if rnd.random() < fracao_outros_donos else OWNER_FAKE,
+            "custom_status_name": status,
+            "project_percent": rnd.randint(0, 100),
+            "last_modified_time_long": 1700000000000 + i,
+            "custom_fields": [
+                {"Data de Onboarding": f"{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}-2025"},
+                {"Data de Virada": f"{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}-2026"},
+            ],
+        })
+
+        quantidade = n_tarefas
+        if variacao:
+            quantidade = rnd.randint(int(n_tarefas * (1 - variacao)), int(n_tarefas * (1 + variacao)))
+        tarefas[proj_id] = [
+            {
+                "name": f"Tarefa {j} do projeto {i}",
+                "status": {"name": rnd.choice(STATUS_TAREFA)},
+                "percent_complete": rnd.choice([0, 10, 50, 90, 100]),
+                "end_date": f"{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}-2025",
+                "priority": rnd.choice(["Normal", "High", "Low"]),
+                "tasklist": {"name": FASES[j % len(FASES)]},
+                "milestone": {"name": f"Marco {j % 3}"},
+            }
+            for j in range(quantidade)
+        ]
+        # Contagem da listagem, como o Zoho manda ("open"/"closed"): a sync usa o total para paginar
+        fechadas = sum(1 for t in tarefas[proj_id] if t["status"]["name"] in ("Completed", "Closed", "Cancelled"))
+        projetos[-1]["task_count"] = {"open": quantidade - fechadas, "closed": fechadas}
+    return projetos, tarefas
+
+
+class _FakeZohoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, como o Zoho real
+    disable_nagle_algorithm = True  # Sem isso o keep-alive sofre o atraso de 40ms do delayed ACK
+
+    def log_message(self, *args):
+        pass  # Silencioso: o benchmark não quer 1 linha por request
+
+    def _responder(self, status, corpo=None, cabecalhos=None):
+        dados = json.dumps(corpo).encode("utf-8") if corpo is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_POST(self):
+        servidor = self.server.fake
+        url = urlparse(self.path)
+        tamanho = int(self.headers.get("Content-Length", 0))
+        corpo = self.rfile.read(tamanho).decode("utf-8") if tamanho else ""
+
+        if url.path == "/__reset_stats":
+            servidor.zerar_estatisticas()
+            self._responder(200, {"ok": True})
+        elif url.path == "/__tocar":
+            n = int(parse_qs(url.query).get("n", ["1"])[0])
+            self._responder(200, {"tocados": servidor.tocar(n)})
+        elif url.path.endswith("/oauth/v2/token"):
+            servidor.contar("oauth")
+            time.sleep(servidor.latencia)
+            if "grant_type=refresh_token" not in corpo:
+                self._responder(400, {"error": "invalid_request"})
+                return
+            self._responder(200, {
+                "access_token": servidor.emitir_token(),
+                "expires_in": servidor.validade_token,
+                "token_type": "Bearer",
+            })
+        else:
+            self._responder(404, {"error": "rota desconhecida"})
+
+    def do_GET(self):
+        servidor = self.server.fake
+        url = urlparse(self.path)
+
+        if url.path == "/__stats":
+            self._responder(200, servidor.estatisticas())
+            return
+
+        partes = [p for p in url.path.split("/") if p]
+        # /restapi/portal/{portal}/projects/  ou  .../projects/{id}/tasks/
+        if "projects" not in partes:
+            self._responder(404, {"error": "rota desconhecida"})
+            return
+        resto = partes[partes.index("projects") + 1:]
+        if not resto:
+            rota = "projects"
+        elif len(resto) == 2 and resto[1] == "tasks":
+            rota = "tasks"
+        else:
+            self._responder(404, {"error": "rota desconhecida"})
+            return
+
+        servidor.contar(rota)
+        time.sleep(servidor.latencia)
+
+        if not servidor.token_valido(self.headers.get("Authorization", "")):
+            servidor.contar("401")
+            self._responder(401, {"error": {"code": 6401, "message": "Invalid OAuth access token."}})
+            return
+        if not servidor.dentro_da_cota():
+            self._responder(429, {"error": "rate limit"}, {"Retry-After": "1"})
+            return
+        if servidor.sortear_erro():
+            self._responder(503, {"error": "erro injetado"})
+            return
+
+        query = parse_qs(url.query)
+        index = int(query.get("index", ["0"])[0])
+        range_val = int(query.get("range", ["100"])[0])
+        if rota == "projects":
+            itens = servidor.projetos
+        else:
+            itens = servidor.tarefas.get(resto[0])
+            if itens is None:
+                self._responder(404, {"error": "projeto não existe"})
+                return
+
+        pagina = itens[index:index + range_val]
+        if not pagina:
+            self._responder(204)  # O Zoho real responde 204 quando acaba
+            return
+        self._responder(200, {rota: pagina})
+
+
+class _ServidorSilencioso(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Cliente fechando conexão keep-alive com página adiantada não lida: esperado
+        pass
+
+
+class FakeZohoServer:
+    """Servidor HTTP em thread. Use com 'with FakeZohoServer(...) as srv:'
+    exigir_token=False aceita qualquer Authorization (testes rápidos sem OAuth)."""
+
+    def __init__(self, projetos, tarefas, latencia=0.05, cota_por_segundo=None, taxa_erro=0.0,
+                 validade_token=3600, exigir_token=False, semente=42, porta=0):
+        self.projetos = projetos
+        self.tarefas = tarefas
+        self.latencia = latencia
+        # Simula o throttling do Zoho: acima de N requests no mesmo segundo -> 429
+        self.cota_por_segundo = cota_por_segundo
+        self.taxa_erro = taxa_erro
+        self.validade_token = validade_token
+        self.exigir_token = exigir_token
+        self._rnd = random.Random(semente)
+        self._tokens = {}  # token -> expira_em
+        self._janela = (0, 0)  # (segundo, requests nesse segundo)
+        self._trava = threading.Lock()
+        self.zerar_estatisticas()
+        self._httpd = _ServidorSilencioso(("127.0.0.1", porta), _FakeZohoHandler)
+        self._httpd.fake = self
+        self._thread = None
+
+    @property
+    def raiz(self):
+        host, porta = self._httpd.server_address
+        return f"http://{host}:{porta}"
+
+    @property
+    def base_url(self):
+        return f"{self.raiz}/restapi/portal/{PORTAL_FAKE}"
+
+    @property
+    def url_token(self):
+        return f"{self.raiz}/oauth/v2/token"
+
+    # --- Contadores ---
+    def zerar_estatisticas(self):
+        with self._trava:
+            self.total_requests = 0
+            self.por_rota = {"oauth": 0, "projects": 0, "tasks": 0, "401": 0}
+            self.total_429 = 0
+            self.total_erros = 0
+
+    def contar(self, rota):
+        with self._trava:
+            self.por_rota[rota] = self.por_rota.get(rota, 0) + 1
+            if rota != "401":
+                self.total_requests += 1
+
+    def estatisticas(self):
+        with self._trava:
+            return {"requests": self.total_requests, "por_rota": dict(self.por_rota),
+                    "429": self.total_429, "erros_injetados": self.total_erros}
+
+    # --- Comportamentos do Zoho ---
+    def emitir_token(self):
+        with self._trava:
+            token = f"fake-{len(self._tokens) + 1}-{self._rnd.getrandbits(32):08x}"
+            self._tokens[token] = time.time() + self.validade_token
+            return token
+
+    def token_valido(self, authorization):
+        if not self.exigir_token:
+            return True
+        token = authorization.replace("Bearer ", "", 1)
+        with self._trava:
+            return self._tokens.get(token, 0) > time.time()
+
+    def dentro_da_cota(self):
+        if not self.cota_por_segundo:
+            return True
+        with self._trava:
+            segundo = int(time.monotonic())
+            inicio, contagem = self._janela
+            contagem = contagem + 1 if inicio == segundo else 1
+            self._janela = (segundo, contagem)
+            if contagem > self.cota_por_segundo:
+                self.total_429 += 1
+                return False
+            return True
+
+    def sortear_erro(self):
+        if not self.taxa_erro:
+            return False
+        with self._trava:
+            if self._rnd.random() < self.taxa_erro:
+                self.total_erros += 1
+                return True
+            return False
+
+    def tocar(self, n):
+        """Simula edição no portal: n projetos mudam (last_modified + nome de 1 tarefa)"""
+        with self._trava:
+            escolhidos = self._rnd.sample(self.projetos, min(n, len(self.projetos)))
+            for proj in escolhidos:
+                proj["last_modified_time_long"] += 1000
+                lista = self.tarefas.get(proj["id"]) or []
+                if lista:
+                    lista[0] = dict(lista[0], name=lista[0]["name"] + " (editada)")
+            return [p["id"] for p in escolhidos]
+
+    # --- Ciclo de vida ---
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.parar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zoho Projects falso para testes e benchmarks")
+    parser.add_argument("--projetos", type=int, default=50)
+    parser.add_argument("--tarefas", type=int, default=150)
+    parser.add_argument("--variacao", type=float, default=0.0, help="0.5 = tarefas entre 50%% e 150%% do valor")
+    parser.add_argument("--latencia", type=float, default=0.05, help="segundos por request")
+    parser.add_argument("--taxa-erro", type=float, default=0.0, help="fração de GETs que respondem 503")
+    parser.add_argument("--cota", type=int, default=None, help="requests/segundo antes de responder 429")
+    parser.add_argument("--validade-token", type=int, default=3600)
+    parser.add_argument("--sem-oauth", action="store_true", help="aceita qualquer token")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--porta", type=int, default=0)
+    args = parser.parse_args()
+
+    projetos, tarefas = gerar_portfolio(args.projetos, args.tarefas, args.semente, args.variacao,
+                                        fracao_outros_donos=0.1, fracao_encerrados=0.1)
+    srv = FakeZohoServer(projetos, tarefas, args.latencia, args.cota, args.taxa_erro,
+                         args.validade_token, exigir_token=not args.sem_oauth,
+                         semente=args.semente, porta=args.porta)
+    with srv:
+        # Linhas lidas pelo benchmark_sync.py para descobrir onde o fake subiu
+        print(f"BASE_URL={srv.base_url}", flush=True)
+        print(f"TOKEN_URL={srv.url_token}", flush=True)
+        print(f"OWNER_ID={OWNER_FAKE}", flush=True)
+        print(f"🧪 Zoho falso no ar ({len(projetos)} projetos). Ctrl+C para parar.", flush=True)
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Camada HTTP compartilhada para todas as chamadas ao Zoho
+Sessão única com pool de conexões (keep-alive), gzip e timeouts configuráveis.
+Todo request passa pelo ZohoScheduler (cota, retentativas e concorrência adaptativa).
+"""
+
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from config import Config
+from zoho_scheduler import ZohoScheduler
+
+
+class ZohoHTTP:
+    """Sessão HTTP reaproveitável. Conta conexões abertas vs reutilizadas."""
+
+    def __init__(self, timeout=None, pool_maxsize=None, scheduler=None):
+        self.scheduler = scheduler or ZohoScheduler()
+        self.timeout = timeout or (Config.ZOHO_HTTP_TIMEOUT_CONEXAO, Config.ZOHO_HTTP_TIMEOUT_LEITURA)
+
+        # O pool precisa de 1 conexão por pedido simultâneo da sync (workers x páginas
+        # em voo), senão as threads excedentes abrem (e jogam fora) conexões novas.
+        tamanho_pool = pool_maxsize or max(10, Config.ZOHO_SYNC_WORKERS * Config.ZOHO_PAGINAS_EM_VOO)
+        self._adapter = HTTPAdapter(pool_connections=4, pool_maxsize=tamanho_pool)
+
+        self.sessao = requests.Session()
+        self.sessao.mount("https://", self._adapter)
+        self.sessao.mount("http://", self._adapter)
+        self.sessao.headers.update({
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        })
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return self.scheduler.executar(lambda: self.sessao.get(url, **kwargs), f"GET {url}")
+
+    def post(self, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return self.scheduler.executar(lambda: self.sessao.post(url, **kwargs), f"POST {url}")
+
+    def estatisticas(self):
+        """Requests feitos, conexões TCP/TLS abertas e quantas vezes uma conexão foi reaproveitada"""
+        total_requests = 0
+        conexoes_abertas = 0
+        for chave in list(self._adapter.poolmanager.pools.keys()):
+            pool = self._adapter.poolmanager.pools.get(chave)
+            if pool is None:
+                continue
+            total_requests += pool.num_requests
+            conexoes_abertas += pool.num_connections
+        return {
+            "requests": total_requests,
+            "conexoes_abertas": conexoes_abertas,
+            "conexoes_reutilizadas": max(0, total_requests - conexoes_abertas),
+        }
+
+    def resumo(self):
+        est = self.estatisticas()
+        agenda = self.scheduler.estatisticas()
+        return (f"🔌 HTTP: {est['requests']} requests, {est['conexoes_abertas']} conexões abertas, "
+                f"{est['conexoes_reutilizadas']} reutilizadas | {agenda['throttling']} throttling (429), "
+                f"{agenda['retentativas']} retentativas")
+
+    def fechar(self):
+        self.sessao.close()
+
+
+# Singleton global: todas as chamadas ao Zoho no mesmo processo dividem o pool
+_http_instance = None
+_http_trava = threading.Lock()
+
+def get_http():
+    """Retorna a sessão HTTP única do processo"""
+    global _http_instance
+    with _http_trava:
+        if _http_instance is None:
+            _http_instance = ZohoHTTP()
+    return _http_instance
@@ -0,0 +1,168 @@
+"""
+Agendador de requests ao Zoho com controle de limite (rate limit)
+- Token bucket: nunca passa da cota configurada (req/s + rajada)
+- 429: respeita o Retry-After (pausa global) e reduz a concorrência pela metade
+- 429/5xx/falha de rede: tenta de novo com backoff exponencial + jitter
+- Sem throttling por um tempo: volta a aumentar a concorrência aos poucos
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import requests
+from config import Config
+
+STATUS_REPETIVEIS = {429, 500, 502, 503, 504}
+
+
+class ZohoIndisponivel(Exception):
+    """O Zoho continuou recusando (429/5xx/rede) depois de todas as tentativas,
+    ou respondeu um erro que não adianta repetir (ex.: 403/404 no meio da paginação)"""
+
+
+class TokenBucket:
+    def __init__(self, taxa, capacidade):
+        self.taxa = float(taxa)            # fichas por segundo
+        self.capacidade = float(capacidade)
+        self.fichas = float(capacidade)
+        self.ultimo = time.monotonic()
+        self.pausa_ate = 0.0
+        self._trava = threading.Lock()
+
+    def pausar(self, segundos):
+        """Ninguém consome até passar `segundos` (Retry-After do servidor)"""
+        with self._trava:
+            self.pausa_ate = max(self.pausa_ate, time.monotonic() + segundos)
+            self.fichas = 0.0
+
+    def consumir(self):
+        """Bloqueia até haver uma ficha disponível"""
+        while True:
+            with self._trava:
+                agora = time.monotonic()
+                if agora < self.pausa_ate:
+                    espera = self.pausa_ate - agora
+                else:
+                    self.fichas = min(self.capacidade, self.fichas + (agora - self.ultimo) * self.taxa)
+                    self.ultimo = agora
+                    if self.fichas >= 1:
+                        self.fichas -= 1
+                        return
+                    espera = (1 - self.fichas) / self.taxa
+            time.sleep(espera)
+
+
+class ZohoScheduler:
+    """Porteiro de todos os requests: cota, concorrência adaptativa e retentativas"""
+
+    def __init__(self, taxa=None, rajada=None, max_concorrencia=None, max_tentativas=None,
+                 backoff_base=None, backoff_max=None):
+        self.bucket = TokenBucket(taxa or Config.ZOHO_REQ_POR_SEGUNDO, rajada or Config.ZOHO_REQ_RAJADA)
+        self.max_concorrencia = max_concorrencia or Config.ZOHO_SYNC_WORKERS * Config.ZOHO_PAGINAS_EM_VOO
+        self.max_tentativas = max_tentativas or Config.ZOHO_MAX_TENTATIVAS
+        self.backoff_base = Config.ZOHO_BACKOFF_BASE if backoff_base is None else backoff_base
+        self.backoff_max = Config.ZOHO_BACKOFF_MAX if backoff_max is None else backoff_max
+
+        # Concorrência adaptativa (AIMD): começa no máximo, cai pela metade a cada 429
+        self.limite = self.max_concorrencia
+        self._em_uso = 0
+        self._sucessos_seguidos = 0
+        self._cond = threading.Condition()
+
+        self.total_throttling = 0
+        self.total_retentativas = 0
+
+    # --- Concorrência ---
+    def _entrar(self):
+        with self._cond:
+            while self._em_uso >= self.limite:
+                self._cond.wait()
+            self._em_uso += 1
+
+    def _sair(self):
+        with self._cond:
+            self._em_uso -= 1
+            self._cond.notify_all()
+
+    def _registrar_sucesso(self):
+        with self._cond:
+            self._sucessos_seguidos += 1
+            # Aumento aditivo: +1 a cada "rodada" completa sem throttling
+            if self.limite < self.max_concorrencia and self._sucessos_seguidos >= self.limite:
+                self.limite += 1
+                self._sucessos_seguidos = 0
+                self._cond.notify_all()
+
+    def _registrar_throttling(self, espera):
+        self.bucket.pausar(espera)
+        with self._cond:
+            self.total_throttling += 1
+            self._sucessos_seguidos = 0
+            self.limite = max(1, self.limite // 2)
+
+    # --- Espera entre tentativas ---
+    @staticmethod
+    def _retry_after(res):
+        """Retry-After em segundos (aceita número ou data HTTP). None se não veio."""
+        valor = res.headers.get("Retry-After") if res is not None else None
+        if not valor:
+            return None
+        try:
+            return max(0.0, float(valor))
+        except ValueError:
+            pass
+        try:
+            data = parsedate_to_datetime(valor)
+            return max(0.0, (data - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+    def _calcular_espera(self, res, tentativa):
+        retry_after = self._retry_after(res)
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        # Backoff exponencial com "full jitter": espalha as threads que falharam juntas
+        teto = min(self.backoff_max, self.backoff_base * (2 ** tentativa))
+        return random.uniform(0, teto)
+
+    # --- API ---
+    def executar(self, fazer_request, descricao=""):
+        """Roda fazer_request() sob a cota. Devolve a Response final (qualquer status
+        não repetível) ou levanta ZohoIndisponivel quando as tentativas acabam."""
+        ultimo_problema = None
+        for tentativa in range(self.max_tentativas):
+            res = None
+            self._entrar()
+            try:
+                self.bucket.consumir()
+                res = fazer_request()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                ultimo_problema = f"{type(e).__name__}: {e}"
+            finally:
+                self._sair()
+
+            if res is not None and res.status_code not in STATUS_REPETIVEIS:
+                self._registrar_sucesso()
+                return res
+
+            espera = self._calcular_espera(res, tentativa)
+            if res is not None:
+                ultimo_problema = f"HTTP {res.status_code}"
+                if res.status_code == 429:
+                    self._registrar_throttling(espera)
+                    print(f"   🐢 Zoho pediu calma (429). Pausa de {espera:.1f}s, concorrência agora {self.limite}.")
+
+            if tentativa < self.max_tentativas - 1:
+                self.total_retentativas += 1
+                time.sleep(espera)
+
+        raise ZohoIndisponivel(f"{descricao or 'request'} falhou após {self.max_tentativas} tentativas ({ultimo_problema})")
+
+    def estatisticas(self):
+        return {
+            "throttling": self.total_throttling,
+            "retentativas": self.total_retentativas,
+            "concorrencia": self.limite,
+        }
@@ -1,63 +1,259 @@
-import requests
 import json
+import os
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 from config import Config
+from zoho_http import get_http
+from zoho_scheduler import ZohoIndisponivel
+from snapshot import abrir_escritor, carregar_projetos, converter
+from sync_checkpoint import CheckpointSync
+from project_db import EscritorBaseProjetos
+from project_facts import derivar_fatos
+from zoho_token import get_token_cache
 
 class ZohoSync:
-    def __init__(self):
+    def __init__(self, base_url=None, max_workers=None, caminho_saida=None, http=None, tokens=None,
+                 paginas_em_voo=None):
         self.access_token = None
-        self.base_url = f"https://projectsapi.zoho.com/restapi/portal/{Config.ZOHO_PORTAL_ID}"
-
-    def get_access_token(self):
-        url = "https://accounts.zoho.com/oauth/v2/token"
-        params = {
-            "refresh_token": Config.ZOHO_REFRESH_TOKEN,
-            "client_id": Config.ZOHO_CLIENT_ID,
-            "client_secret": Config.ZOHO_CLIENT_SECRET,
-            "grant_type": "refresh_token"
-        }
+        self.http = http or get_http()  # Sessão com keep-alive compartilhada por todas as threads
+        self.tokens = tokens or get_token_cache()
+        self.base_url = base_url or f"https://projectsapi.zoho.com/restapi/portal/{Config.ZOHO_PORTAL_ID}"
+        # Quantos projetos baixam tarefas ao mesmo tempo (1 = modo serial antigo)
+        self.max_workers = max(1, max_workers or Config.ZOHO_SYNC_WORKERS)
+        # Páginas pedidas em paralelo dentro de um mesmo endpoint (1 = uma de cada vez)
+        self.paginas_em_voo = max(1, paginas_em_voo or Config.ZOHO_PAGINAS_EM_VOO)
+        self.caminho_saida = caminho_saida or Config.SNAPSHOT_PROJETOS  # .apx = binário compacto
+        pasta_saida = os.path.dirname(self.caminho_saida)
+        # Base SQLite indexada gerada junto com o snapshot (fica ao lado dele se o caminho for outro)
+        self.caminho_sqlite = (Config.SQLITE_PROJETOS if caminho_saida is None
+                               else os.path.join(pasta_saida, "db_projetos.sqlite"))
+        # Versões (last_modified) de cada projeto na última sync, para o modo incremental
+        self.caminho_estado = os.path.join(pasta_saida, "db_sync_estado.json")
+        # Diário dos projetos já baixados na sync em curso (para o --resume)
+        self.caminho_checkpoint = self.caminho_saida + ".checkpoint"
+        self._checkpoint = None
+        self._pool_paginas = None
+        self._pool_trava = threading.Lock()
+
+    def get_access_token(self, token_recusado=None):
+        """Pega o token do cache em disco; só fala com o OAuth do Zoho se estiver vencido/recusado"""
         try:
-            response = requests.post(url, data=params)
-            if response.status_code == 200:
-                self.access_token = response.json().get("access_token")
-                return True
-            else:
-                print(f"❌ Erro ao renovar token: {response.text}")
-                return False
+            self.access_token = self.tokens.obter(token_recusado)
+            return self.access_token is not None
         except Exception as e:
             print(f"❌ Erro de ligação: {e}")
             return False
 
-    def get_paginated_data(self, endpoint, key_name):
-        """Busca todos os registos lidando com a paginação do Zoho"""
+    def _buscar_pagina(self, endpoint, index, range_val):
+        """Pede uma página ao Zoho, renovando o token uma vez se levar 401"""
+        separator = "&" if "?" in endpoint else "?"
+        url = f"{self.base_url}{endpoint}{separator}index={index}&range={range_val}"
+        
+        token_usado = self.access_token
+        res = self.http.get(url, headers={"Authorization": f"Bearer {token_usado}"})
+        if res.status_code == 401 and self.get_access_token(token_recusado=token_usado):
+            # Token expirou/foi revogado no meio da sync: renova uma vez e repete a página
+            res = self.http.get(url, headers={"Authorization": f"Bearer {self.access_token}"})
+        return res
+
+    def _pool(self):
+        """Pool das páginas adiantadas, criado uma vez e dividido por todos os endpoints da sync"""
+        with self._pool_trava:
+            if self._pool_paginas is None:
+                self._pool_paginas = ThreadPoolExecutor(max_workers=self.max_workers * self.paginas_em_voo)
+            return self._pool_paginas
+
+    def _fechar_pool(self):
+        with self._pool_trava:
+            pool, self._pool_paginas = self._pool_paginas, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def get_paginated_data(self, endpoint, key_name, total=None):
+        """Busca todos os registos lidando com a paginação do Zoho.
+        A 1ª página vai sozinha (a maioria dos projetos cabe nela). Se vier cheia e o
+        `total` de registos for conhecido (task_count da listagem), as páginas que faltam
+        seguem em pipeline: até `paginas_em_voo` pedidos ficam a caminho enquanto a página
+        atual é processada. Sem o total, uma de cada vez: adiantar às cegas gasta cota
+        com páginas além do fim."""
         all_items = []
-        index = 0
         range_val = 100 
+        em_voo = deque()
+        proximo_index = range_val
         
-        while True:
-            separator = "&" if "?" in endpoint else "?"
-            url = f"{self.base_url}{endpoint}{separator}index={index}&range={range_val}"
-            
-            res = requests.get(url, headers={"Authorization": f"Bearer {self.access_token}"})
-            if res.status_code != 200:
-                print(f"❌ Erro na busca ({endpoint}): {res.status_code}")
-                break
+        res = self._buscar_pagina(endpoint, 0, range_val)
+        try:
+            while True:
+                if res.status_code == 204:
+                    break  # Zoho: "não há mais registos"
+                if res.status_code != 200:
+                    # Sem as páginas que faltam o projeto sairia truncado: aborta a sync inteira
+                    raise ZohoIndisponivel(f"{endpoint} respondeu {res.status_code}")
                 
-            data = res.json()
-            items = data.get(key_name, [])
-            all_items.extend(items)
-            
-            if len(items) < range_val:
-                break
-            
-            index += range_val
+                data = res.json()
+                items = data.get(key_name, [])
+                all_items.extend(items)
+                
+                if len(items) < range_val:
+                    break
+                
+                # Página cheia: adianta só as páginas que o total garante que existem
+                while total is not None and proximo_index < total and len(em_voo) < self.paginas_em_voo:
+                    em_voo.append(self._pool().submit(self._buscar_pagina, endpoint, proximo_index, range_val))
+                    proximo_index += range_val
+                if em_voo:
+                    res = em_voo.popleft().result()
+                else:
+                    # Sem total (ou ele já acabou e a página veio cheia): pede a próxima para conferir
+                    res = self._buscar_pagina(endpoint, proximo_index, range_val)
+                    proximo_index += range_val
+        finally:
+            for futuro in em_voo:
+                futuro.cancel()  # Saiu no meio (erro): as adiantadas que nem começaram ficam por pedir
             
         return all_items
 
-    def sync_my_data(self):
-        """Faz a extração utilizando o Custom Status do Zoho"""
+    @staticmethod
+    def _total_tarefas(proj):
+        """Tarefas do projeto segundo a listagem (task_count: abertas + fechadas), ou None"""
+        contagem = proj.get("task_count")
+        if not isinstance(contagem, dict):
+            return None
+        try:
+            return sum(int(valor) for valor in contagem.values())
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _versao_projeto(proj):
+        """Marca de modificação do projeto no Zoho (muda sempre que algo no projeto muda)"""
+        versao = proj.get("last_modified_time_long", proj.get("last_modified_time"))
+        return str(versao) if versao is not None else None
+
+    def _carregar_sync_anterior(self):
+        """Lê o snapshot e as versões da última sync. Devolve ({id: projeto}, {id: versao})"""
+        try:
+            anteriores = {str(p.get("id")): p for p in carregar_projetos(self.caminho_saida)}
+            with open(self.caminho_estado, "r", encoding="utf-8") as f:
+                versoes = json.load(f).get("versoes", {})
+            return anteriores, versoes
+        except (FileNotFoundError, ValueError):
+            return {}, {}
+
+    def _salvar_estado(self, projetos_ativos):
+        versoes = {str(p.get("id")): self._versao_projeto(p) for p in projetos_ativos}
+        temporario = f"{self.caminho_estado}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({"versoes": versoes}, f, ensure_ascii=False)
+        os.replace(temporario, self.caminho_estado)
+
+    def _baixar_projeto(self, proj, tarefas_anteriores=None):
+        """Baixa as tarefas de um projeto ativo e monta o registo limpo (roda nas threads).
+        Se receber as tarefas da sync anterior (projeto sem mudanças), não chama a API."""
+        proj_id = proj.get("id")
+        proj_name = proj.get("name")
+        
+        if tarefas_anteriores is not None:
+            project_data = self._montar_projeto(proj)
+            project_data["tasks"] = tarefas_anteriores
+            return project_data
+        
+        print(f"📥 A descarregar tarefas do projeto ATIVO: {proj_name}")
+        
+        tasks_endpoint = f"/projects/{proj_id}/tasks/"
+        all_tasks = self.get_paginated_data(tasks_endpoint, "tasks", total=self._total_tarefas(proj))
+        
+        project_data = self._montar_projeto(proj)
+        project_data["tasks"] = [self._limpar_tarefa(t) for t in all_tasks]
+        return project_data
+
+    @staticmethod
+    def _limpar_tarefa(t):
+        """Só os campos da tarefa que o Apex usa"""
+        return {
+            "name": t.get("name"),
+            "status": t.get("status", {}).get("name") if isinstance(t.get("status"), dict) else "Sem status",
+            "percent": t.get("percent_complete", 0),
+            "end_date": t.get("end_date", "Sem data"),
+            "priority": t.get("priority", "Normal"),
+            "tasklist": t.get("tasklist", {}).get("name", "Sem lista"),
+            "milestone": t.get("milestone", {}).get("name", "Sem Phase")
+        }
+
+    def _montar_projeto(self, proj):
+        """Cabeçalho limpo do projeto (sem tarefas) a partir do payload da listagem"""
+        # --- NOVO: Achatar os Custom Fields para facilitar a leitura da IA ---
+        raw_custom_fields = proj.get("custom_fields", [])
+        custom_fields_dict = {}
+        if isinstance(raw_custom_fields, list):
+            for field in raw_custom_fields:
+                if isinstance(field, dict):
+                    for key, val in field.items():
+                        custom_fields_dict[key] = val
+        
+        project_data = {
+            "id": proj.get("id"),
+            "name": proj.get("name"),
+            "status": proj.get("custom_status_name", "Ativo"),
+            "percent_complete": proj.get("project_percent", proj.get("percent_complete", 0)),
+            "custom_fields": custom_fields_dict, # <--- CAMPOS CUSTOMIZADOS ADICIONADOS AQUI
+            "tasks": []
+        }
+        return project_data
+
+    def _preparar_projeto(self, proj, tarefas_anteriores):
+        """Projeto pronto para o snapshot: JSON já salvo no checkpoint (str) ou dict recém-montado"""
+        if self._checkpoint is not None:
+            json_salvo = self._checkpoint.ler_projeto(proj.get("id"), self._versao_projeto(proj))
+            if json_salvo is not None:
+                return json_salvo
+        return self._baixar_projeto(proj, tarefas_anteriores)
+
+    def _baixar_em_ordem(self, projetos, tarefas_reaproveitadas):
+        """Gera (proj, pronto) na ordem de entrada. No máximo 2x workers ficam
+        em memória ao mesmo tempo (os adiantados esperam o mais lento da fila)."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pendentes = deque()
+            for proj, tarefas in zip(projetos, tarefas_reaproveitadas):
+                pendentes.append((proj, pool.submit(self._preparar_projeto, proj, tarefas)))
+                if len(pendentes) >= self.max_workers * 2:
+                    proj_pronto, futuro = pendentes.popleft()
+                    yield proj_pronto, futuro.result()
+            while pendentes:
+                proj_pronto, futuro = pendentes.popleft()
+                yield proj_pronto, futuro.result()
+
+    def sync_my_data(self, incremental=False, retomar=False):
+        """Faz a extração utilizando o Custom Status do Zoho.
+        incremental=True só rebaixa tarefas dos projetos cujo last_modified mudou desde a última sync.
+        retomar=True continua uma sync interrompida, pulando os projetos já salvos no checkpoint."""
         if not self.access_token and not self.get_access_token():
             return
 
+        self._checkpoint = CheckpointSync(self.caminho_checkpoint, Config.ZOHO_CHECKPOINT_VALIDADE_HORAS)
+        retomando = retomar and self._checkpoint.carregar()
+        if retomar and not retomando:
+            print("ℹ️ Nenhum checkpoint válido para retomar; fazendo a sync completa.")
+        self._checkpoint.iniciar(retomando)
+
+        try:
+            self._sincronizar(incremental)
+            self._checkpoint.concluir()
+        except ZohoIndisponivel as e:
+            # Melhor manter o snapshot anterior inteiro do que gravar um pela metade
+            print(f"❌ Sync abortada, o Zoho falhou: {e}")
+            print(f"   O '{self.caminho_saida}' anterior foi mantido.")
+            print("   👉 Rode 'python zoho_sync.py --resume' para continuar de onde parou.")
+            print(self.http.resumo())
+        finally:
+            self._checkpoint.fechar()
+            self._checkpoint = None
+            self._fechar_pool()
+
+    def _sincronizar(self, incremental):
         print("⏳ A descarregar a lista inicial de projetos...")
         all_projects = self.get_paginated_data("/projects/", "projects")
         
@@ -68,65 +264,66 @@ class ZohoSync:
         # Lista letal de palavras que indicam que o projeto acabou
         PALAVRAS_BLOQUEADAS = ["completed", "cancelled", "concluído", "cancelado", "finalizado", "arquivado"]
         
-        dados_completos = []
-        
         print("🔍 Aplicando filtro por Custom Status...")
+        projetos_ativos = []
         for proj in meus_projetos:
-            proj_id = proj.get("id")
-            proj_name = proj.get("name")
-            
             # Pega o Custom Status Name (se não existir, fica vazio)
             custom_status = str(proj.get("custom_status_name", "")).lower()
             
             # FILTRO NÍVEL 2: A Mágica do Custom Status
             if custom_status in PALAVRAS_BLOQUEADAS:
-                print(f"   🚫 Ignorando projeto ({custom_status}): {proj_name}")
+                print(f"   🚫 Ignorando projeto ({custom_status}): {proj.get('name')}")
                 continue # Pula imediatamente!
+            projetos_ativos.append(proj)
+        
+        # MODO INCREMENTAL: reaproveita as tarefas de quem não mudou desde a última sync
+        tarefas_reaproveitadas = [None] * len(projetos_ativos)
+        if incremental:
+            anteriores, versoes = self._carregar_sync_anterior()
+            for i, proj in enumerate(projetos_ativos):
+                proj_id = str(proj.get("id"))
+                versao = self._versao_projeto(proj)
+                if versao is not None and proj_id in anteriores and versoes.get(proj_id) == versao:
+                    tarefas_reaproveitadas[i] = anteriores[proj_id].get("tasks", [])
+            inalterados = sum(1 for t in tarefas_reaproveitadas if t is not None)
+            print(f"♻️ Incremental: {inalterados} projetos sem mudanças, {len(projetos_ativos) - inalterados} a atualizar.")
+        
+        # Download paralelo das tarefas. Cada projeto vai para o disco assim que fica
+        # pronto (na ordem original do Zoho), então a memória não cresce com o portfólio.
+        a_baixar = sum(1 for proj, t in zip(projetos_ativos, tarefas_reaproveitadas)
+                       if t is None and str(proj.get("id")) not in self._checkpoint.concluidos)
+        print(f"⚡ A descarregar tarefas de {a_baixar} projetos ({self.max_workers} em paralelo)...")
+        pulados = 0
+        hoje = date.today()
+        # A base SQLite fecha por último: fica sempre tão nova quanto o snapshot
+        with EscritorBaseProjetos(self.caminho_sqlite) as base, abrir_escritor(self.caminho_saida) as escritor:
+            for proj, pronto in self._baixar_em_ordem(projetos_ativos, tarefas_reaproveitadas):
+                do_checkpoint = isinstance(pronto, str)
+                if do_checkpoint:
+                    pronto = json.loads(pronto)  # Já estava no checkpoint (os fatos são refeitos para hoje)
+                    pulados += 1
+                # Fase, atrasos e próximo marco calculados uma vez aqui, não a cada consulta
+                pronto["fatos"] = derivar_fatos(pronto, hoje)
+                json_projeto = escritor.escrever(pronto)
+                base.escrever(pronto)
+                if not do_checkpoint:
+                    self._checkpoint.registrar(proj.get("id"), self._versao_projeto(proj), json_projeto)
+        self._salvar_estado(projetos_ativos)
+        if Config.SNAPSHOT_EXPORTAR_JSON and not self.caminho_saida.lower().endswith(".json"):
+            converter(self.caminho_saida, Config.SNAPSHOT_JSON)
+            print(f"📤 Cópia em JSON exportada para '{Config.SNAPSHOT_JSON}'.")
+        
+        if self._checkpoint.concluidos:
+            percentual = 100 * pulados / max(1, len(projetos_ativos))
+            print(f"⏭️ Retomada: {pulados} de {len(projetos_ativos)} projetos ({percentual:.0f}%) "
+                  f"vieram do checkpoint da geração {self._checkpoint.geracao[:8]}, sem chamar a API.")
             
-            print(f"📥 A descarregar tarefas do projeto ATIVO: {proj_name}")
-            
-            # Só descarrega tarefas se o projeto for realmente ativo
-            tasks_endpoint = f"/projects/{proj_id}/tasks/"
-            all_tasks = self.get_paginated_data(tasks_endpoint, "tasks")
-            
-            # --- NOVO: Achatar os Custom Fields para facilitar a leitura da IA ---
-            raw_custom_fields = proj.get("custom_fields", [])
-            custom_fields_dict = {}
-            if isinstance(raw_custom_fields, list):
-                for field in raw_custom_fields:
-                    if isinstance(field, dict):
-                        for key, val in field.items():
-                            custom_fields_dict[key] = val
-            
-            project_data = {
-                "id": proj_id,
-                "name": proj_name,
-                "status": proj.get("custom_status_name", "Ativo"),
-                "percent_complete": proj.get("project_percent", proj.get("percent_complete", 0)),
-                "custom_fields": custom_fields_dict, # <--- CAMPOS CUSTOMIZADOS ADICIONADOS AQUI
-                "tasks": []
-            }
-            
-            for t in all_tasks:
-                task_info = {
-                    "name": t.get("name"),
-                    "status": t.get("status", {}).get("name") if isinstance(t.get("status"), dict) else "Sem status",
-                    "percent": t.get("percent_complete", 0),
-                    "end_date": t.get("end_date", "Sem data"),
-                    "priority": t.get("priority", "Normal"),
-                    "tasklist": t.get("tasklist", {}).get("name", "Sem lista"),
-                    "milestone": t.get("milestone", {}).get("name", "Sem Phase")
-                }
-                project_data["tasks"].append(task_info)
-                
-            dados_completos.append(project_data)
-            
-        # Gravar a "memória" limpa
-        with open("db_projetos.json", "w", encoding="utf-8") as f:
-            json.dump(dados_completos, f, indent=4, ensure_ascii=False)
-            
-        print(f"\n🚀 SPRINT 1 CONCLUÍDA! Ficaram {len(dados_completos)} projetos reais no 'db_projetos.json'.")
+        print(self.http.resumo())
+        print(f"\n🚀 SPRINT 1 CONCLUÍDA! Ficaram {escritor.total} projetos reais no '{self.caminho_saida}'.")
+        print(f"🗂️  Base de consultas: '{self.caminho_sqlite}' ({base.total_tarefas} tarefas).")
 
 if __name__ == "__main__":
+    # python zoho_sync.py --incremental  -> só atualiza os projetos que mudaram
+    # python zoho_sync.py --resume       -> continua uma sync que morreu no meio
     bot = ZohoSync()
-    bot.sync_my_data()
\ No newline at end of file
+    bot.sync_my_data(incremental="--incremental" in sys.argv, retomar="--resume" in sys.argv)
@@ -0,0 +1,137 @@
+"""
+Cache persistente do access token OAuth do Zoho
+Um único arquivo em disco, protegido por trava de arquivo, compartilhado
+por todos os processos (brain, relatórios, sync, cron). O refresh token só é
+trocado quando o token guardado está perto de expirar ou foi recusado (401).
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from config import Config
+from zoho_http import get_http
+
+
+@contextmanager
+def trava_arquivo(caminho):
+    """Trava exclusiva entre processos (fcntl no Linux/Mac, msvcrt no Windows)"""
+    with open(caminho, "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK desiste após ~10s; continua esperando
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class ZohoTokenCache:
+    def __init__(self, caminho=None, margem=None, url_token=None, http=None):
+        self.caminho = caminho or Config.ZOHO_TOKEN_CACHE
+        self.caminho_trava = self.caminho + ".lock"
+        # Renova o token X segundos antes de expirar, para não morrer no meio de uma sync
+        self.margem = Config.ZOHO_TOKEN_MARGEM if margem is None else margem
+        self.url_token = url_token or Config.ZOHO_TOKEN_URL
+        self.http = http or get_http()
+        # Identifica a conta: um cache de outra credencial nunca é reaproveitado
+        self.conta = hashlib.sha256(
+            f"{Config.ZOHO_CLIENT_ID}:{Config.ZOHO_REFRESH_TOKEN}".encode("utf-8")
+        ).hexdigest()[:16]
+        self.total_renovacoes = 0
+        self._memoria = None  # Cópia em memória para não ler o disco a cada request
+        self._trava_local = threading.Lock()
+
+    def _valido(self, dados):
+        return (
+            dados is not None
+            and dados.get("conta") == self.conta
+            and dados.get("access_token")
+            and dados.get("expira_em", 0) - self.margem > time.time()
+        )
+
+    def _ler_disco(self):
+        try:
+            with open(self.caminho, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _gravar_disco(self, dados):
+        temporario = f"{self.caminho}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(dados, f)
+        if os.name != "nt":
+            os.chmod(temporario, 0o600)  # É uma credencial
+        os.replace(temporario, self.caminho)
+
+    def _renovar(self):
+        """Troca o refresh token por um access token novo (1 round trip OAuth)"""
+        params = {
+            "refresh_token": Config.ZOHO_REFRESH_TOKEN,
+            "client_id": Config.ZOHO_CLIENT_ID,
+            "client_secret": Config.ZOHO_CLIENT_SECRET,
+            "grant_type": "refresh_token"
+        }
+        response = self.http.post(self.url_token, data=params)
+        corpo = response.json() if response.status_code == 200 else {}
+        if not corpo.get("access_token"):
+            print(f"❌ Erro ao renovar token: {response.text}")
+            return None
+
+        self.total_renovacoes += 1
+        expira_em_seg = int(corpo.get("expires_in", corpo.get("expires_in_sec", 3600)))
+        return {
+            "conta": self.conta,
+            "access_token": corpo["access_token"],
+            "expira_em": time.time() + expira_em_seg,
+        }
+
+    def obter(self, token_recusado=None):
+        """Devolve um access token válido, renovando só se necessário.
+        token_recusado: token que levou 401; força renovação se ainda for o do cache."""
+        with self._trava_local:
+            memoria = self._memoria
+            if self._valido(memoria) and memoria["access_token"] != token_recusado:
+                return memoria["access_token"]
+
+            with trava_arquivo(self.caminho_trava):
+                # Outro processo pode ter renovado enquanto esperávamos a trava
+                dados = self._ler_disco()
+                if not self._valido(dados) or dados["access_token"] == token_recusado:
+                    dados = self._renovar()
+                    if dados is None:
+                        return None
+                    self._gravar_disco(dados)
+
+            self._memoria = dados
+            return dados["access_token"]
+
+
+# Singleton global para fácil acesso
+_cache_instance = None
+_cache_trava = threading.Lock()
+
+def get_token_cache():
+    """Retorna o cache de token único do processo"""
+    global _cache_instance
+    with _cache_trava:
+        if _cache_instance is None:
+            _cache_instance = ZohoTokenCache()
+    return _cache_instance